@@ -0,0 +1,111 @@
+# ai_model/annotation_journal.py
+import os
+import json
+import argparse
+
+COMPACT = (',', ':')
+
+def journal_path_for(output_file):
+    """Journal kept next to an output file: results.json -> results.jsonl"""
+    return os.path.splitext(output_file)[0] + '.jsonl'
+
+class AnnotationJournal:
+    """JSON Lines journal of detection results, one line per audio file, written as each file finishes
+
+    The first line holds the document's info and categories, every later line one audio entry with
+    its annotations. Lines are flushed as they are written, so finished files survive a crash, and
+    assemble() turns the journal into the audios/categories/annotations document. With a
+    detection_store.DetectionStore every file is also written to the store as it is journaled.
+    """
+
+    def __init__(self, path, info, categories, store=None):
+        self.path = path
+        self.store = store
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'w')
+        self._write({'info': info, 'categories': categories})
+        if store is not None:
+            store.set_categories(categories)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=COMPACT) + '\n')
+        self._file.flush()
+
+    def write(self, audio, annotations):
+        """Journal one audio entry and its annotations; a failed file is journaled but kept out of the store"""
+        self._write({'audio': audio, 'annotations': annotations})
+        if self.store is not None and not audio.get('failed'):
+            self.store.add_file(audio, annotations)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def read_journal(path):
+    """(byte offset, record) for every complete line; a line cut short by a crash is skipped"""
+    with open(path, 'rb') as f:
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                return
+            try:
+                yield offset, json.loads(line)
+            except ValueError:
+                continue
+
+def _record_at(journal, offset):
+    journal.seek(offset)
+    return json.loads(journal.readline())
+
+def assemble(journal_path, output_path):
+    """Write a journal out as one compact JSON document, audios in id order followed by their annotations
+
+    Only line offsets are held in memory; each record is read back from the journal as it is
+    written. An audio journaled twice keeps its last entry. Returns {'audios': n, 'annotations': n}.
+    """
+    header = None
+    offsets = {}
+    for offset, record in read_journal(journal_path):
+        if 'info' in record:
+            header = record
+        else:
+            offsets[record['audio']['id']] = offset
+    if header is None:
+        raise ValueError(f"{journal_path} has no header line")
+    order = [offsets[audio_id] for audio_id in sorted(offsets)]
+
+    # Written beside the output and renamed, so a reader never sees half a document
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = output_path + '.tmp'
+    annotations = 0
+    with open(journal_path, 'rb') as journal, open(tmp_path, 'w') as out:
+        out.write('{"info":' + json.dumps(header['info'], separators=COMPACT) + ',"audios":[')
+        for i, offset in enumerate(order):
+            out.write((',' if i else '') + json.dumps(_record_at(journal, offset)['audio'], separators=COMPACT))
+        out.write('],"categories":' + json.dumps(header['categories'], separators=COMPACT) + ',"annotations":[')
+        for offset in order:
+            for annotation in _record_at(journal, offset)['annotations']:
+                out.write((',' if annotations else '') + json.dumps(annotation, separators=COMPACT))
+                annotations += 1
+        out.write(']}')
+    os.replace(tmp_path, output_path)
+    return {'audios': len(order), 'annotations': annotations}
+
+def main():
+    parser = argparse.ArgumentParser(description='Assemble a detection journal into the results JSON document')
+    parser.add_argument('journal', help='JSON Lines journal written during detection')
+    parser.add_argument('--output_file', help='Output JSON file (default: the journal path with .json)')
+    args = parser.parse_args()
+
+    output_file = args.output_file or os.path.splitext(args.journal)[0] + '.json'
+    summary = assemble(args.journal, output_file)
+    print(f"Assembled {summary['audios']} audios and {summary['annotations']} annotations into {output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# ai_model/audio_source.py
+import os
+import time
+from functools import lru_cache
+from math import gcd
+import numpy as np
+import soundfile as sf
+import soxr
+
+# Selectable resamplers, fastest last; soxr_hq is what librosa.load uses by default
+RESAMPLE_ENGINES = {
+    'soxr_vhq': 'soxr very high quality',
+    'soxr_hq': 'soxr high quality (librosa default)',
+    'soxr_mq': 'soxr medium quality',
+    'soxr_lq': 'soxr low quality',
+    'polyphase': 'Kaiser-windowed polyphase FIR (scipy resample_poly)'
+}
+DEFAULT_RESAMPLE_ENGINE = 'soxr_hq'
+
+_SOXR_QUALITY = {'soxr_vhq': 'VHQ', 'soxr_hq': 'HQ', 'soxr_mq': 'MQ', 'soxr_lq': 'LQ'}
+
+@lru_cache(maxsize=None)
+def _polyphase_filter(up, down):
+    """Low-pass FIR for one rate pair, designed once like scipy's resample_poly default"""
+    from scipy.signal import firwin
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    return firwin(2 * half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)).astype(np.float32)
+
+def resample(y, orig_sr, target_sr, engine=DEFAULT_RESAMPLE_ENGINE):
+    """Resample a mono signal; returns y unchanged when the rates already match"""
+    if orig_sr == target_sr:
+        return y
+    if engine in _SOXR_QUALITY:
+        return soxr.resample(y, orig_sr, target_sr, quality=_SOXR_QUALITY[engine]).astype(np.float32)
+    if engine == 'polyphase':
+        from scipy.signal import resample_poly
+        divisor = gcd(int(orig_sr), int(target_sr))
+        up, down = int(target_sr) // divisor, int(orig_sr) // divisor
+        return resample_poly(y, up, down, window=_polyphase_filter(up, down)).astype(np.float32)
+    raise ValueError(f"Unknown resample engine '{engine}', expected one of {sorted(RESAMPLE_ENGINES)}")
+
+def load_audio(audio_path, sample_rate=22050, engine=DEFAULT_RESAMPLE_ENGINE):
+    """Decode at the native rate, downmix and resample; returns (y, stats) with per-stage timings"""
+    start = time.perf_counter()
+    try:
+        y, native_sr = sf.read(audio_path, dtype='float32', always_2d=True)
+        y = y.mean(axis=1)
+    except RuntimeError:
+        # Formats libsndfile cannot read (e.g. mp3) go through librosa/audioread at the native rate
+        import librosa
+        y, native_sr = librosa.load(audio_path, sr=None)
+    decoded = time.perf_counter()
+    
+    y = resample(y, native_sr, sample_rate, engine)
+    resampled = time.perf_counter()
+    
+    stats = {
+        'native_sample_rate': native_sr,
+        'sample_rate': sample_rate,
+        'engine': engine if native_sr != sample_rate else 'skipped (native rate)',
+        'decode_seconds': decoded - start,
+        'resample_seconds': resampled - decoded,
+        'audio_seconds': len(y) / sample_rate
+    }
+    return y, stats
+
+def peak_normalize(y):
+    """Scale to unit peak amplitude, like librosa.util.normalize; silent input is returned as is"""
+    peak = np.max(np.abs(y)) if len(y) else 0.0
+    if peak < np.finfo(y.dtype).tiny:
+        return y
+    return y / peak
+
+def describe_resampling(audio_path, stats):
+    """One-line per-file resampling report"""
+    line = f"{os.path.basename(audio_path)}: {stats['native_sample_rate']} Hz -> {stats['sample_rate']} Hz, "
+    if stats['native_sample_rate'] == stats['sample_rate']:
+        line += "resampling skipped (native rate)"
+    else:
+        speed = stats['audio_seconds'] / max(stats['resample_seconds'], 1e-9)
+        line += f"{stats['engine']}, resample {stats['resample_seconds'] * 1000:.1f} ms ({speed:.0f}x realtime)"
+    return line + f", decode {stats['decode_seconds'] * 1000:.1f} ms"
+
+class AudioSource:
+    """Decoded, normalized PCM for one audio file, shared by every processing stage"""
+    
+    def __init__(self, audio_path, sample_rate=22050, normalize=True, resample_engine=DEFAULT_RESAMPLE_ENGINE):
+        self.audio_path = audio_path
+        self.sample_rate = sample_rate
+        self.normalize = normalize
+        self.resample_engine = resample_engine
+        self.resample_stats = None
+        self.error = None
+        self._y = None
+        self._loaded = False
+        self._closed = False
+    
+    def load(self):
+        """Decode and resample the file on first use; later calls reuse the same buffer"""
+        if self._closed:
+            raise ValueError(f"AudioSource for {self.audio_path} has been closed")
+        
+        if not self._loaded:
+            self._loaded = True
+            try:
+                y, self.resample_stats = load_audio(self.audio_path, self.sample_rate, self.resample_engine)
+                if self.normalize:
+                    y = peak_normalize(y)
+                self._y = y
+            except Exception as e:
+                self.error = e
+                print(f"Error loading audio: {e}")
+        
+        return self._y
+    
+    @property
+    def y(self):
+        return self.load()
+    
+    @property
+    def duration(self):
+        """Duration in seconds, or None if the file could not be decoded"""
+        y = self.load()
+        if y is None:
+            return None
+        return len(y) / self.sample_rate
+    
+    def close(self):
+        """Release the decoded samples"""
+        self._y = None
+        self._closed = True
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def stream_pcm(audio_path, sample_rate=22050, block_seconds=60.0, engine=DEFAULT_RESAMPLE_ENGINE, stats=None):
+    """Yield mono float32 blocks resampled to sample_rate, holding only block_seconds of audio at a time
+    
+    A stats dict, if given, is filled with the same per-stage timings load_audio reports.
+    """
+    if engine not in _SOXR_QUALITY:
+        raise ValueError(f"Streaming supports only the soxr engines, not '{engine}'")
+    
+    info = sf.info(audio_path)
+    blocksize = max(1, int(block_seconds * info.samplerate))
+    if stats is not None:
+        stats.update({
+            'native_sample_rate': info.samplerate,
+            'sample_rate': sample_rate,
+            'engine': engine if info.samplerate != sample_rate else 'skipped (native rate)',
+            'decode_seconds': 0.0,
+            'resample_seconds': 0.0,
+            'audio_seconds': 0.0
+        })
+    
+    # Stateful soxr stream, so block boundaries do not restart the filter
+    resampler = None
+    if info.samplerate != sample_rate:
+        resampler = soxr.ResampleStream(info.samplerate, sample_rate, 1, dtype='float32', quality=_SOXR_QUALITY[engine])
+    
+    blocks = sf.blocks(audio_path, blocksize=blocksize, dtype='float32', always_2d=True)
+    while True:
+        start = time.perf_counter()
+        block = next(blocks, None)
+        if block is None:
+            y = np.zeros(0, dtype=np.float32)
+        else:
+            y = block.mean(axis=1)
+        decoded = time.perf_counter()
+        if resampler is not None:
+            y = resampler.resample_chunk(y, last=block is None)
+        if stats is not None:
+            stats['decode_seconds'] += decoded - start
+            stats['resample_seconds'] += time.perf_counter() - decoded
+            stats['audio_seconds'] += len(y) / sample_rate
+        if len(y):
+            yield y
+        if block is None:
+            return
+
+def pcm_blocks(audio_path, sample_rate=22050, block_seconds=60.0, engine=DEFAULT_RESAMPLE_ENGINE, stats=None):
+    """stream_pcm where possible; the polyphase engine and formats libsndfile cannot read are decoded as one block"""
+    streamable = engine in _SOXR_QUALITY
+    if streamable:
+        try:
+            sf.info(audio_path)
+        except RuntimeError:
+            streamable = False
+    
+    if streamable:
+        for y in stream_pcm(audio_path, sample_rate, block_seconds, engine, stats):
+            yield y
+        return
+    
+    y, file_stats = load_audio(audio_path, sample_rate, engine)
+    if stats is not None:
+        stats.update(file_stats)
+    if len(y):
+        yield y
@@ -0,0 +1,184 @@
+# ai_model/augment.py
+import os
+import threading
+import numpy as np
+
+from ai_model.manifest import Manifest
+from ai_model.mel_frontend import get_mel_frontend
+from ai_model.audio_source import load_audio, peak_normalize
+
+DEFAULT_BACKGROUND_DIR = "data/dosits_synthetic/background"
+
+class Augmenter:
+    """Batched augmentation of log-mel feature batches or waveform batches, applied as data is read
+
+    Features are the repo's max-referenced log-mel dB, (N, n_mels, T, 1) in [-top_db, 0]. A batch is
+    circularly time-shifted, mixed with a random background patch at a random SNR (in the mel power
+    domain, then re-referenced to its max like the frontend does), and SpecAugment-masked to the
+    floor. Gain only changes waveforms: max-referenced features carry no absolute level, so for
+    them the level against the background is what the SNR draw varies.
+    """
+
+    def __init__(self, background=None, noise_prob=0.5, snr_db=(0.0, 20.0), gain_db=(-6.0, 6.0), max_shift=0.2,
+                 time_masks=2, time_mask_frames=8, freq_masks=2, freq_mask_bins=16, top_db=80.0,
+                 sample_rate=22050, seed=None):
+        self.background = background or []
+        self.noise_prob = noise_prob if self.background else 0.0
+        self.snr_db = snr_db
+        self.gain_db = gain_db
+        self.max_shift = max_shift
+        self.time_masks = time_masks
+        self.time_mask_frames = time_mask_frames
+        self.freq_masks = freq_masks
+        self.freq_mask_bins = freq_mask_bins
+        self.top_db = top_db
+        self.seed = seed
+        self.sample_rate = sample_rate
+        self._calls = 0
+        self._lock = threading.Lock()
+        self._background_mel = None
+
+    @classmethod
+    def from_background_dir(cls, background_dir=DEFAULT_BACKGROUND_DIR, sample_rate=22050, **kwargs):
+        """Augmenter mixing in the readable WAVs under background_dir; without any, no noise is mixed"""
+        background = []
+        if os.path.isdir(background_dir):
+            for path in Manifest.for_directory(background_dir).paths():
+                y, _ = load_audio(path, sample_rate)
+                if len(y):
+                    background.append(peak_normalize(y).astype(np.float32))
+        if background:
+            print(f"Augmenting with {len(background)} background files from {background_dir}")
+        else:
+            print(f"No background audio in {background_dir}; augmenting without noise mixing")
+        return cls(background, sample_rate=sample_rate, **kwargs)
+
+    def _rng(self):
+        # One generator per call, so parallel tf.data map calls never share generator state
+        with self._lock:
+            self._calls += 1
+            calls = self._calls
+        return np.random.default_rng(None if self.seed is None else [self.seed, calls])
+
+    def _background_power_mel(self):
+        # Whole-file mel power of every background clip, computed once on first use
+        if self._background_mel is None:
+            frontend = get_mel_frontend(self.sample_rate)
+            self._background_mel = [frontend.power_mel(y) for y in self.background]
+        return self._background_mel
+
+    @staticmethod
+    def _crops(sources, lengths, n, rng):
+        """n random windows of the given length (last axis) from sources, tiling sources that are too short"""
+        picks = rng.integers(0, len(sources), n)
+        crops = []
+        for pick in picks:
+            source = sources[pick]
+            if source.shape[-1] < lengths:
+                source = np.tile(source, (1,) * (source.ndim - 1) + (-(-lengths // source.shape[-1]),))
+            start = rng.integers(0, source.shape[-1] - lengths + 1)
+            crops.append(source[..., start:start + lengths])
+        return np.stack(crops)
+
+    @staticmethod
+    def _shift(x, max_shift, rng, lengths=None):
+        """Circular shift of each row along the last axis by up to max_shift of its own length
+
+        lengths gives each row's own length in a zero-padded batch; padding stays in place.
+        """
+        size = x.shape[-1]
+        lengths = np.full(len(x), size) if lengths is None else np.asarray(lengths)
+        limits = (max_shift * lengths).astype(np.int64)
+        if not limits.any():
+            return x
+        shifts = rng.integers(-limits, limits + 1)
+        positions = np.arange(size)[None, :]
+        wrapped = (positions - shifts[:, None]) % np.maximum(lengths[:, None], 1)
+        index = np.where(positions < lengths[:, None], wrapped, positions)
+        return np.take_along_axis(x, index.reshape((len(x),) + (1,) * (x.ndim - 2) + (size,)), axis=-1)
+
+    def _bands(self, n, size, count, width, rng):
+        """(n, size) boolean mask of count random bands per row, each up to width wide"""
+        mask = np.zeros((n, size), dtype=bool)
+        if count == 0 or width == 0:
+            return mask
+        widths = rng.integers(0, min(width, size) + 1, (n, count))
+        starts = rng.integers(0, size, (n, count))
+        positions = np.arange(size)[None, None, :]
+        return ((positions >= starts[..., None]) & (positions < (starts + widths)[..., None])).any(axis=1)
+
+    def augment_features(self, features, rng=None):
+        """Augmented copy of a (N, n_mels, T, 1) log-mel batch"""
+        rng = rng or self._rng()
+        x = np.asarray(features, dtype=np.float32)[..., 0]
+        n, n_mels, n_frames = x.shape
+
+        x = self._shift(x, self.max_shift, rng)
+
+        mix = rng.random(n) < self.noise_prob
+        if mix.any():
+            rows = np.flatnonzero(mix)
+            signal = 10.0 ** (x[rows] / 10.0)
+            noise = self._crops(self._background_power_mel(), n_frames, len(rows), rng)
+            snr = rng.uniform(self.snr_db[0], self.snr_db[1], len(rows))
+            scale = signal.mean(axis=(1, 2)) / np.maximum(noise.mean(axis=(1, 2)), 1e-20) / 10.0 ** (snr / 10.0)
+            mixed = 10.0 * np.log10(np.maximum(signal + scale[:, None, None] * noise, 1e-10))
+            mixed -= mixed.max(axis=(1, 2), keepdims=True)
+            x[rows] = np.maximum(mixed, -self.top_db)
+
+        return self.mask_features(x[..., np.newaxis], rng)
+
+    def mask_features(self, features, rng=None):
+        """SpecAugment time and frequency masks on a (N, n_mels, T, 1) batch; masked cells drop to the floor"""
+        rng = rng or self._rng()
+        x = np.asarray(features, dtype=np.float32)[..., 0]
+        n, n_mels, n_frames = x.shape
+        time_mask = self._bands(n, n_frames, self.time_masks, self.time_mask_frames, rng)
+        freq_mask = self._bands(n, n_mels, self.freq_masks, self.freq_mask_bins, rng)
+        x = np.where(time_mask[:, None, :] | freq_mask[:, :, None], np.float32(-self.top_db), x)
+        return x[..., np.newaxis]
+
+    def augment_waveforms(self, audio, lengths=None, rng=None):
+        """Augmented copy of a (N, samples) waveform batch: gain, circular shift, background at an SNR
+
+        With lengths (a zero-padded batch, as synthetic.synthesize returns) each clip is shifted and
+        mixed over its own length only.
+        """
+        rng = rng or self._rng()
+        audio = np.asarray(audio, dtype=np.float32)
+        lengths = np.full(len(audio), audio.shape[1]) if lengths is None else np.asarray(lengths)
+        gain = 10.0 ** (rng.uniform(self.gain_db[0], self.gain_db[1], (len(audio), 1)) / 20.0)
+        audio = self._shift(audio * gain.astype(np.float32), self.max_shift, rng, lengths)
+
+        mix = rng.random(len(audio)) < self.noise_prob
+        if mix.any():
+            rows = np.flatnonzero(mix)
+            inside = np.arange(audio.shape[1])[None, :] < lengths[rows, None]
+            noise = self._crops(self.background, audio.shape[1], len(rows), rng) * inside
+            snr = rng.uniform(self.snr_db[0], self.snr_db[1], len(rows))
+            own = np.maximum(lengths[rows], 1)
+            signal_rms = np.sqrt(np.sum(audio[rows] ** 2, axis=1) / own)
+            noise_rms = np.maximum(np.sqrt(np.sum(noise ** 2, axis=1) / own), 1e-12)
+            audio[rows] += (signal_rms / noise_rms / 10.0 ** (snr / 20.0))[:, None].astype(np.float32) * noise
+        return audio
+
+    def map_features(self, features, labels):
+        """tf.data map function augmenting a batched (features, labels) pair"""
+        import tensorflow as tf
+        augmented = tf.numpy_function(self.augment_features, [features], tf.float32, stateful=True)
+        augmented.set_shape(features.shape)
+        return augmented, labels
+
+    def apply(self, dataset):
+        """Augment every batch of a batched (features, labels) dataset in parallel map calls"""
+        import tensorflow as tf
+        return dataset.map(self.map_features, num_parallel_calls=tf.data.AUTOTUNE)
+
+def add_augment_arguments(parser):
+    parser.add_argument('--augment', action='store_true',
+                        help='Augment training batches (shift, background noise, SpecAugment masks)')
+    parser.add_argument('--background_dir', default=DEFAULT_BACKGROUND_DIR,
+                        help='Background WAVs mixed in by --augment')
+
+def augmenter_from_args(args):
+    return Augmenter.from_background_dir(args.background_dir) if args.augment else None
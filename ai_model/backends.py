@@ -0,0 +1,32 @@
+# ai_model/backends.py
+import os
+
+from ai_model.tflite_model import TFLiteModel, tflite_path_for
+from ai_model.numpy_runtime import NumpyModel, weights_path_for
+
+BACKENDS = ('keras', 'tflite', 'numpy')
+DEFAULT_BACKEND = 'keras'
+
+def load_model(model_path, backend=DEFAULT_BACKEND, num_threads=None):
+    """Load a trained model for inference; every backend exposes predict(features, batch_size, verbose)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+    if backend == 'tflite':
+        tflite_path = tflite_path_for(model_path)
+        if not os.path.exists(tflite_path):
+            raise FileNotFoundError(
+                f"{tflite_path} not found; export it with: python -m ai_model.tflite_model --model_path {model_path}"
+            )
+        return TFLiteModel(tflite_path, num_threads=num_threads)
+
+    if backend == 'numpy':
+        weights_path = weights_path_for(model_path)
+        if not os.path.exists(weights_path):
+            raise FileNotFoundError(
+                f"{weights_path} not found; export it with: python -m ai_model.numpy_runtime --model_path {model_path}"
+            )
+        return NumpyModel(weights_path)
+
+    import tensorflow as tf
+    return tf.keras.models.load_model(model_path)
@@ -1,71 +1,90 @@
 # ai_model/data_loader.py
 import os
 import numpy as np
-import librosa
-import tensorflow as tf
 from sklearn.model_selection import train_test_split
 
+from ai_model.manifest import Manifest
+from ai_model.featurizer import featurize_files
+from ai_model.mel_frontend import get_config_frontend
+from ai_model.audio_source import DEFAULT_RESAMPLE_ENGINE, pcm_blocks, describe_resampling
+
 class UnderwaterDataLoader:
-    def __init__(self, sample_rate=22050, segment_duration=2.0, n_mels=128):
-        self.sample_rate = sample_rate
-        self.segment_duration = segment_duration
-        self.segment_samples = int(sample_rate * segment_duration)
-        self.n_mels = n_mels
-        self.hop_length = 512
-        self.n_fft = 2048
+    def __init__(self, sample_rate=None, segment_duration=None, n_mels=None, feature_store=None,
+                 resample_engine=DEFAULT_RESAMPLE_ENGINE, report_resampling=False, block_seconds=60.0):
+        # Settings left as None come from model/config.json
+        self.frontend = get_config_frontend(sample_rate=sample_rate, segment_duration=segment_duration, n_mels=n_mels)
+        self.sample_rate = self.frontend.sample_rate
+        self.segment_duration = self.frontend.segment_duration
+        self.segment_samples = self.frontend.segment_samples
+        self.n_mels = self.frontend.n_mels
+        self.hop_length = self.frontend.hop_length
+        self.n_fft = self.frontend.n_fft
+        self.feature_store = feature_store
+        self.resample_engine = resample_engine
+        self.report_resampling = report_resampling
+        self.block_seconds = block_seconds  # audio decoded at a time
         
+    def feature_params(self):
+        """Parameters that identify these features in the feature store"""
+        return {
+            "kind": "segments",
+            "sample_rate": self.sample_rate,
+            "segment_duration": self.segment_duration,
+            "n_fft": self.n_fft,
+            "hop_length": self.hop_length,
+            "n_mels": self.n_mels,
+            "resample_engine": self.resample_engine,
+            "n_frames": None
+        }
+    
     def extract_features(self, audio_path):
-        """Extract mel-spectrogram features from audio file"""
+        """Extract mel-spectrogram features from audio file, through the feature store if configured"""
+        if self.feature_store is None:
+            return self._compute_features(audio_path)
         try:
-            y, sr = librosa.load(audio_path, sr=self.sample_rate)
-            y = librosa.util.normalize(y)
-            
-            # Process in segments
-            features = []
-            for start_idx in range(0, len(y), self.segment_samples):
-                end_idx = min(start_idx + self.segment_samples, len(y))
-                segment = y[start_idx:end_idx]
-                
-                if len(segment) < self.segment_samples:
-                    segment = np.pad(segment, (0, self.segment_samples - len(segment)), 'constant')
-                
-                # Extract mel-spectrogram
-                mel_spec = librosa.feature.melspectrogram(
-                    y=segment, sr=sr, n_fft=self.n_fft,
-                    hop_length=self.hop_length, n_mels=self.n_mels
-                )
-                log_mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
-                
-                # Reshape for CNN (add channel dimension)
-                log_mel_spec = log_mel_spec.reshape(log_mel_spec.shape[0], log_mel_spec.shape[1], 1)
-                features.append(log_mel_spec)
-                
-            return np.array(features)
+            return self.feature_store.get_or_compute(audio_path, self.feature_params(), self._compute_features)
+        except OSError as e:
+            print(f"Error processing {audio_path}: {e}")
+            return None
+    
+    def _compute_features(self, audio_path):
+        try:
+            # Decoded block by block; each block's segments go through one batched STFT and filterbank matmul.
+            # Peak normalization is skipped since every segment is scaled to its own maximum anyway.
+            stats = {}
+            blocks = pcm_blocks(audio_path, self.sample_rate, self.block_seconds, self.resample_engine, stats)
+            batches = list(self.frontend.stream_segment_features(blocks))
+            if self.report_resampling:
+                print(describe_resampling(audio_path, stats))
+            if not batches:
+                return self.frontend.segment_features(np.zeros(0, dtype=np.float32))
+            return np.concatenate(batches)
             
         except Exception as e:
             print(f"Error processing {audio_path}: {e}")
             return None
     
-    def load_dataset(self, data_dir, annotations=None, test_size=0.2, val_size=0.1):
-        """Load and preprocess entire dataset"""
+    def load_dataset(self, data_dir, annotations=None, test_size=0.2, val_size=0.1, manifest=None, workers=None):
+        """Load and preprocess entire dataset, featurizing files in parallel in sorted-path order"""
         features = []
         labels = []
         file_paths = []
         
-        # Walk through data directory
-        for root, dirs, files in os.walk(data_dir):
-            for file in files:
-                if file.endswith('.wav'):
-                    file_path = os.path.join(root, file)
-                    file_features = self.extract_features(file_path)
-                    
-                    if file_features is not None:
-                        # Determine label from directory structure or annotations
-                        label = self._get_label_from_path(file_path, annotations)
-                        if label is not None:
-                            features.extend(file_features)
-                            labels.extend([label] * len(file_features))
-                            file_paths.extend([file_path] * len(file_features))
+        # File list comes from header probing, so empty/corrupt files are skipped before decoding
+        if manifest is None:
+            manifest = Manifest.for_directory(data_dir)
+        
+        # Determine labels from directory structure or annotations; unlabelled files are never decoded
+        file_labels = {}
+        for file_path in manifest.paths():
+            label = self._get_label_from_path(file_path, annotations)
+            if label is not None:
+                file_labels[file_path] = label
+        
+        for file_path, file_features in featurize_files(file_labels, self.extract_features, workers):
+            features.extend(file_features)
+            labels.extend([file_labels[file_path]] * len(file_features))
+            file_paths.extend([file_path] * len(file_features))
         
         features = np.array(features)
         labels = np.array(labels)
@@ -82,6 +101,16 @@ class UnderwaterDataLoader:
         
         return (X_train, y_train), (X_val, y_val), (X_test, y_test), file_paths
     
+    def load_streaming_dataset(self, data_dir, annotations=None, test_size=0.2, val_size=0.1, manifest=None,
+                               batch_size=32, workers=None, augmenter=None):
+        """Like load_dataset, but returns tf.data datasets streaming from feature shards instead of arrays"""
+        from ai_model.tf_dataset import load_streaming_datasets
+        return load_streaming_datasets(
+            self, data_dir, test_size, val_size, manifest, batch_size,
+            label_fn=lambda file_path: self._get_label_from_path(file_path, annotations), workers=workers,
+            augmenter=augmenter
+        )
+    
     def _get_label_from_path(self, file_path, annotations):
         """Extract label from file path or annotations"""
         # Default mapping based on directory names
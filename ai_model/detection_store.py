@@ -0,0 +1,250 @@
+# ai_model/detection_store.py
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_model.annotation_journal import read_journal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS audios (
+    id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL UNIQUE,
+    file_name TEXT NOT NULL,
+    duration REAL,
+    detection_count INTEGER NOT NULL DEFAULT 0,
+    max_score REAL
+);
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    audio_id INTEGER NOT NULL REFERENCES audios (id),
+    category_id INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    score REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS detections_audio_start ON detections (audio_id, start_time);
+CREATE INDEX IF NOT EXISTS detections_category ON detections (category_id, score);
+CREATE INDEX IF NOT EXISTS detections_start ON detections (start_time);
+
+-- Per-class totals kept current by triggers, so unfiltered class counts never scan detections
+CREATE TABLE IF NOT EXISTS category_counts (
+    category_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS detections_counted AFTER INSERT ON detections BEGIN
+    INSERT OR IGNORE INTO category_counts (category_id, count) VALUES (NEW.category_id, 0);
+    UPDATE category_counts SET count = count + 1 WHERE category_id = NEW.category_id;
+END;
+CREATE TRIGGER IF NOT EXISTS detections_uncounted AFTER DELETE ON detections BEGIN
+    UPDATE category_counts SET count = count - 1 WHERE category_id = OLD.category_id;
+END;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+
+class DetectionStore:
+    """SQLite store of detections, indexed for per-class counts, per-file summaries and time-range queries
+
+    Detections are keyed by file path: writing a file again replaces its detections, so reruns and
+    incremental runs never double count. Overlap queries use the (audio_id, start_time) and
+    start_time indexes: a detection overlapping [t0, t1] starts in [t0 - longest detection, t1),
+    and the longest duration ever stored is kept in meta.
+    """
+
+    def __init__(self, path="outputs/detections.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Writing
+
+    def set_categories(self, categories):
+        """Store [{'id', 'name'}] category names"""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO categories (id, name) VALUES (?, ?)",
+            [(category['id'], category['name']) for category in categories]
+        )
+        self.connection.commit()
+
+    def add_file(self, audio, annotations):
+        """Replace one audio file's entry and detections; audio needs file_path, annotations the result fields"""
+        rows = [
+            (float(a['start_time']), float(a['end_time']), int(a['category_id']), float(a['score']))
+            for a in annotations
+        ]
+        max_score = max((row[3] for row in rows), default=None)
+        longest = max((row[1] - row[0] for row in rows), default=0.0)
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO audios (file_path, file_name, duration, detection_count, max_score) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (file_path) DO UPDATE SET file_name = excluded.file_name, duration = excluded.duration, "
+                "detection_count = excluded.detection_count, max_score = excluded.max_score",
+                (audio['file_path'], audio.get('file_name') or os.path.basename(audio['file_path']),
+                 audio.get('duration'), len(rows), max_score)
+            )
+            audio_id = self.connection.execute(
+                "SELECT id FROM audios WHERE file_path = ?", (audio['file_path'],)
+            ).fetchone()[0]
+            self.connection.execute("DELETE FROM detections WHERE audio_id = ?", (audio_id,))
+            self.connection.executemany(
+                "INSERT INTO detections (audio_id, start_time, end_time, category_id, score) VALUES (?, ?, ?, ?, ?)",
+                [(audio_id,) + row for row in rows]
+            )
+            if longest > self._max_duration():
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('max_duration', ?)", (longest,)
+                )
+        return audio_id
+
+    def import_results(self, results_path):
+        """Load a results document (info/audios/categories/annotations JSON) or its JSON Lines journal"""
+        if results_path.endswith('.jsonl'):
+            files = 0
+            for _, record in read_journal(results_path):
+                if 'categories' in record:
+                    self.set_categories(record['categories'])
+                else:
+                    self.add_file(record['audio'], record['annotations'])
+                    files += 1
+            return files
+
+        with open(results_path, 'r') as f:
+            data = json.load(f)
+        self.set_categories(data.get('categories', []))
+        by_audio = {audio['id']: [] for audio in data.get('audios', [])}
+        for annotation in data.get('annotations', []):
+            by_audio.setdefault(annotation['audio_id'], []).append(annotation)
+        for audio in data.get('audios', []):
+            self.add_file(audio, by_audio[audio['id']])
+        return len(by_audio)
+
+    def _max_duration(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'max_duration'").fetchone()
+        return row[0] if row else 0.0
+
+    # Queries
+
+    def totals(self):
+        """{'audios', 'detections', 'files_with_detections'}"""
+        row = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(detection_count), 0), COALESCE(SUM(detection_count > 0), 0) FROM audios"
+        ).fetchone()
+        return {'audios': row[0], 'detections': row[1], 'files_with_detections': row[2]}
+
+    def class_counts(self, min_score=None):
+        """[(category_id, name, count)] per detected class, optionally only detections scoring >= min_score"""
+        if min_score is None:
+            query = ("SELECT c.category_id, n.name, c.count FROM category_counts c "
+                     "LEFT JOIN categories n ON n.id = c.category_id WHERE c.count > 0 ORDER BY c.category_id")
+            rows = self.connection.execute(query)
+        else:
+            query = ("SELECT d.category_id, n.name, COUNT(*) FROM detections d "
+                     "LEFT JOIN categories n ON n.id = d.category_id WHERE d.score >= ? "
+                     "GROUP BY d.category_id ORDER BY d.category_id")
+            rows = self.connection.execute(query, (min_score,))
+        return [tuple(row) for row in rows]
+
+    def file_summaries(self, with_detections=False, limit=None):
+        """Per-file dicts: audio_id, file_name, file_path, duration, detection_count, max_score"""
+        query = ("SELECT id AS audio_id, file_name, file_path, duration, detection_count, max_score FROM audios"
+                 + (" WHERE detection_count > 0" if with_detections else "") + " ORDER BY file_path")
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.connection.execute(query)]
+
+    def file_detections(self, audio_id):
+        """Detections of one file in start_time order"""
+        return [dict(row) for row in self.connection.execute(
+            "SELECT * FROM detections WHERE audio_id = ? ORDER BY start_time", (audio_id,)
+        )]
+
+    def overlapping(self, t0, t1, audio_id=None, category_id=None):
+        """Detections overlapping [t0, t1] seconds, in one file or across all files"""
+        conditions = ["d.start_time < ?", "d.start_time >= ?", "d.end_time > ?"]
+        params = [t1, t0 - self._max_duration(), t0]
+        if audio_id is not None:
+            conditions.append("d.audio_id = ?")
+            params.append(audio_id)
+        if category_id is not None:
+            conditions.append("d.category_id = ?")
+            params.append(category_id)
+        query = ("SELECT d.*, a.file_name FROM detections d JOIN audios a ON a.id = d.audio_id WHERE "
+                 + " AND ".join(conditions) + " ORDER BY d.audio_id, d.start_time")
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Load and query the detection store')
+    parser.add_argument('--db', default='outputs/detections.db', help='SQLite detection store')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    load = commands.add_parser('import', help='Load results JSON documents or journals')
+    load.add_argument('results', nargs='+', help='Results .json or .jsonl journal files')
+
+    counts = commands.add_parser('counts', help='Totals and per-class detection counts')
+    counts.add_argument('--min_score', type=float, help='Only count detections scoring at least this')
+
+    files = commands.add_parser('files', help='Per-file summaries')
+    files.add_argument('--with_detections', action='store_true', help='Only files with detections')
+    files.add_argument('--limit', type=int, default=20, help='Files to list')
+
+    overlaps = commands.add_parser('overlaps', help='Detections overlapping a time range')
+    overlaps.add_argument('t0', type=float, help='Range start (seconds)')
+    overlaps.add_argument('t1', type=float, help='Range end (seconds)')
+    overlaps.add_argument('--audio_id', type=int, help='Only this file')
+    overlaps.add_argument('--category_id', type=int, help='Only this class')
+    args = parser.parse_args()
+
+    with DetectionStore(args.db) as store:
+        start = time.perf_counter()
+        if args.command == 'import':
+            for results_path in args.results:
+                print(f"Imported {store.import_results(results_path)} files from {results_path}")
+        elif args.command == 'counts':
+            totals = store.totals()
+            print(f"Files: {totals['audios']} ({totals['files_with_detections']} with detections)")
+            print(f"Detections: {totals['detections']}")
+            for category_id, name, count in store.class_counts(args.min_score):
+                print(f"  {category_id} {name or ''}: {count}")
+        elif args.command == 'files':
+            for summary in store.file_summaries(args.with_detections, args.limit):
+                max_score = f"{summary['max_score']:.3f}" if summary['max_score'] is not None else '-'
+                print(f"  {summary['audio_id']:>6} {summary['file_name']}: {summary['detection_count']} detections, "
+                      f"max score {max_score}")
+        else:
+            detections = store.overlapping(args.t0, args.t1, args.audio_id, args.category_id)
+            for detection in detections[:20]:
+                print(f"  {detection['file_name']} {detection['start_time']:.2f}-{detection['end_time']:.2f}s "
+                      f"class {detection['category_id']} score {detection['score']:.3f}")
+            print(f"{len(detections)} detections overlap [{args.t0}, {args.t1}]")
+        print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
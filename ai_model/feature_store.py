@@ -0,0 +1,107 @@
+# ai_model/feature_store.py
+import os
+import json
+import hashlib
+import tempfile
+from datetime import datetime
+import numpy as np
+
+from ai_model.manifest import file_content_hash
+
+class FeatureStore:
+    """Content-addressed on-disk cache of feature arrays, stored as memory-mappable .npy shards
+    
+    A shard is keyed by the SHA-1 of the source file bytes plus the feature parameters, so renamed
+    or copied files hit the cache and any parameter change (sr, n_fft, hop, n_mels, segment length,
+    frame crop) misses it. index.jsonl records one line per shard for listing.
+    """
+    
+    def __init__(self, root="data/feature_store", manifest=None):
+        self.root = root
+        self.manifest = manifest
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._hashes = {}
+        os.makedirs(root, exist_ok=True)
+    
+    @staticmethod
+    def feature_key(content_hash, params):
+        """Cache key for one file's features under one parameter set"""
+        payload = content_hash + json.dumps(params, sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
+    def content_hash(self, file_path):
+        """SHA-1 of the file bytes, taken from the manifest when its size/mtime still match"""
+        stat = os.stat(file_path)
+        cache_key = (file_path, stat.st_size, stat.st_mtime)
+        if cache_key in self._hashes:
+            return self._hashes[cache_key]
+        
+        entry = self.manifest.get(file_path) if self.manifest is not None else None
+        if entry and entry.get("sha1") and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            digest = entry["sha1"]
+        else:
+            digest = file_content_hash(file_path)
+        
+        self._hashes[cache_key] = digest
+        return digest
+    
+    def shard_path(self, key):
+        return os.path.join(self.root, key[:2], key + ".npy")
+    
+    def shard_for(self, file_path, params):
+        """Shard path holding (or that would hold) file_path's features under params"""
+        return self.shard_path(self.feature_key(self.content_hash(file_path), params))
+    
+    def get(self, file_path, params):
+        """Memory-mapped features for file_path, or None on a cache miss"""
+        shard = self.shard_for(file_path, params)
+        if not os.path.exists(shard):
+            return None
+        return np.load(shard, mmap_mode="r")
+    
+    def put(self, file_path, params, features):
+        """Store features atomically and append an index line"""
+        key = self.feature_key(self.content_hash(file_path), params)
+        shard = self.shard_path(key)
+        os.makedirs(os.path.dirname(shard), exist_ok=True)
+        
+        # Write to a temp file and rename so concurrent readers never see a partial shard
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(shard), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(features, dtype=np.float32))
+        os.replace(tmp_path, shard)
+        
+        entry = {
+            "key": key,
+            "shard": os.path.relpath(shard, self.root),
+            "source": file_path,
+            "shape": list(np.shape(features)),
+            "params": params,
+            "created": datetime.now().isoformat()
+        }
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        return key
+    
+    def get_or_compute(self, file_path, params, compute_fn):
+        """Return cached features, computing and storing them with compute_fn(file_path) on a miss"""
+        features = self.get(file_path, params)
+        if features is not None:
+            return features
+        
+        features = compute_fn(file_path)
+        if features is not None:
+            self.put(file_path, params, features)
+        return features
+    
+    def entries(self):
+        """Index entries whose shard still exists, latest entry per key"""
+        if not os.path.exists(self.index_path):
+            return []
+        by_key = {}
+        with open(self.index_path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    by_key[entry["key"]] = entry
+        return [e for e in by_key.values() if os.path.exists(os.path.join(self.root, e["shard"]))]
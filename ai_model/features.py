@@ -0,0 +1,41 @@
+# ai_model/features.py
+import numpy as np
+
+from ai_model.mel_frontend import get_mel_frontend
+from ai_model.audio_source import load_audio, peak_normalize
+
+def clip_feature_params(n_frames=44, sample_rate=22050, n_fft=2048, hop_length=512, n_mels=128):
+    """Parameters that identify clip features in the feature store"""
+    return {
+        "kind": "clip",
+        "sample_rate": sample_rate,
+        "n_fft": n_fft,
+        "hop_length": hop_length,
+        "n_mels": n_mels,
+        "n_frames": n_frames
+    }
+
+def clip_features(file_path, n_frames=44, sample_rate=22050, n_fft=2048, hop_length=512, n_mels=128):
+    """Log-mel spectrogram of a whole clip, truncated or zero-padded to (n_mels, n_frames, 1)"""
+    y, _ = load_audio(file_path, sample_rate)
+    y = peak_normalize(y)
+    
+    log_mel_spec = get_mel_frontend(sample_rate, n_fft, hop_length, n_mels).log_mel(y)
+    
+    # Reshape and pad/truncate to fixed size
+    log_mel_spec = log_mel_spec.reshape(n_mels, -1, 1)
+    if log_mel_spec.shape[1] > n_frames:
+        log_mel_spec = log_mel_spec[:, :n_frames, :]
+    elif log_mel_spec.shape[1] < n_frames:
+        log_mel_spec = np.pad(log_mel_spec, ((0, 0), (0, n_frames - log_mel_spec.shape[1]), (0, 0)), 'constant')
+    
+    return log_mel_spec
+
+def load_clip_features(file_path, feature_store=None, n_frames=44):
+    """clip_features, served from the feature store when one is given"""
+    if feature_store is None:
+        return clip_features(file_path, n_frames=n_frames)
+    return feature_store.get_or_compute(
+        file_path, clip_feature_params(n_frames=n_frames),
+        lambda path: clip_features(path, n_frames=n_frames)
+    )
@@ -0,0 +1,65 @@
+# ai_model/featurizer.py
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+def print_progress(done, total):
+    """Default progress callback: a line roughly every 10% of files"""
+    step = max(1, total // 10)
+    if done == total or done % step == 0:
+        print(f"Featurized {done}/{total} files...")
+
+def _featurize_chunk(featurize_fn, paths):
+    """Featurize one work unit; errors are returned rather than raised so one bad file cannot stop the pool"""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, featurize_fn(path), None))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    return results
+
+def store_features(data_loader, path):
+    """Featurize path into data_loader's feature store; returns (shard path, shape), never the array itself"""
+    features = data_loader.extract_features(path)
+    if features is None:
+        return None
+    return data_loader.feature_store.shard_for(path, data_loader.feature_params()), tuple(features.shape)
+
+def featurize_files(file_paths, featurize_fn, workers=None, chunk_size=8, progress=print_progress):
+    """Run featurize_fn(path) over every file in a process pool
+
+    Returns [(path, features)] sorted by path, whatever order the workers finish in, so dataset
+    splits with a fixed random_state stay reproducible. Files whose features are None or that
+    raised are reported and left out. featurize_fn must be picklable (a module-level function,
+    functools.partial of one, or a bound method of a picklable loader).
+    """
+    paths = sorted(file_paths)
+    workers = workers or os.cpu_count() or 1
+    chunks = [paths[start:start + chunk_size] for start in range(0, len(paths), chunk_size)]
+    features = {}
+    done = 0
+
+    def collect(results):
+        nonlocal done
+        for path, file_features, error in results:
+            done += 1
+            if error is not None:
+                print(f"Error processing {path}: {error}")
+            elif file_features is not None:
+                features[path] = file_features
+        if progress is not None:
+            progress(done, len(paths))
+
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            collect(_featurize_chunk(featurize_fn, chunk))
+    else:
+        # Spawn rather than fork: training scripts import TensorFlow before loading data
+        context = mp.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as pool:
+            futures = [pool.submit(_featurize_chunk, featurize_fn, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    return [(path, features[path]) for path in paths if path in features]
@@ -0,0 +1,136 @@
+# ai_model/ledger.py
+import os
+import json
+import hashlib
+import tempfile
+from datetime import datetime
+
+from ai_model.manifest import file_content_hash
+from ai_model.annotation_journal import journal_path_for, read_journal
+
+class PredictionLedger:
+    """Durable record of the files a model has processed and the detections it found in them
+
+    One JSON line per processed file, appended and fsynced as soon as the file is done, so a crashed
+    run loses at most the files in flight. A file is current while its path, size and mtime are
+    unchanged and it was processed by the same model (content hash) under the same parameters;
+    the latest line for a path wins.
+    """
+
+    def __init__(self, path, model_hash, params):
+        self.path = path
+        self.model_hash = model_hash
+        self.params = params
+        self.params_key = hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+        self.records = self._load()
+
+    @classmethod
+    def for_model(cls, path, model_path, params):
+        """Ledger for the model file at model_path; any change to its bytes invalidates every record"""
+        return cls(path, file_content_hash(model_path), params)
+
+    def _load(self):
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash; its file is simply processed again
+                    continue
+                records[record["path"]] = record
+        return records
+
+    def is_current(self, file_path):
+        """True if file_path was processed by this model and these parameters and is unchanged since"""
+        record = self.records.get(file_path)
+        if record is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return (record["size"] == stat.st_size and record["mtime"] == stat.st_mtime
+                and record["model_hash"] == self.model_hash and record["params_key"] == self.params_key)
+
+    def pending(self, file_paths):
+        """The files that still need processing, in the given order"""
+        return [path for path in file_paths if not self.is_current(path)]
+
+    def detections(self, file_path):
+        return self.records[file_path]["detections"]
+
+    def carried_over(self, file_paths, processed, previous):
+        """(path, detections, duration) for every result kept from earlier runs rather than recomputed
+
+        Files of file_paths not in processed come from the ledger, with duration None; previous is
+        previous_results() for files no longer in the corpus.
+        """
+        for path in file_paths:
+            if path not in processed:
+                yield path, self.detections(path), None
+        for path, entry in previous.items():
+            yield path, entry["annotations"], entry["duration"]
+
+    def record(self, file_path, detections):
+        """Append and flush to disk the detections for one processed file"""
+        stat = os.stat(file_path)
+        record = {
+            "path": file_path,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "model_hash": self.model_hash,
+            "params_key": self.params_key,
+            "processed_on": datetime.now().isoformat(),
+            "detections": detections
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.records[file_path] = record
+
+    def compact(self):
+        """Rewrite the ledger with only the latest line per file, atomically"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            for path in sorted(self.records):
+                f.write(json.dumps(self.records[path]) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.records)
+
+def previous_results(output_file, exclude):
+    """{file_path: {'duration', 'annotations'}} of earlier results for files not in exclude
+
+    Read from the previous run's journal when it is still there, otherwise from output_file.
+    """
+    journal_path = journal_path_for(output_file)
+    previous = {}
+    if os.path.exists(journal_path):
+        for _, record in read_journal(journal_path):
+            audio = record.get("audio")
+            if audio is not None and audio["file_path"] not in exclude:
+                previous[audio["file_path"]] = {"duration": audio["duration"], "annotations": record["annotations"]}
+        return previous
+
+    if not os.path.exists(output_file):
+        return {}
+    try:
+        with open(output_file, "r") as f:
+            output_data = json.load(f)
+    except ValueError as e:
+        print(f"Could not read previous results from {output_file}: {e}")
+        return {}
+
+    for audio in output_data.get("audios", []):
+        if audio["file_path"] not in exclude:
+            previous[audio["file_path"]] = {"duration": audio.get("duration", 0), "annotations": []}
+    for annotation in output_data.get("annotations", []):
+        if annotation.get("file_path") in previous:
+            previous[annotation["file_path"]]["annotations"].append(annotation)
+    return previous
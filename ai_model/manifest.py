@@ -0,0 +1,181 @@
+# ai_model/manifest.py
+import os
+import json
+import hashlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import soundfile as sf
+
+AUDIO_EXTENSIONS = ('.wav',)
+MANIFEST_FILENAME = 'manifest.json'
+
+def find_audio_files(input_dir, recursive=True):
+    """List audio files under a directory in sorted path order"""
+    audio_files = []
+    if recursive:
+        for root, dirs, files in os.walk(input_dir):
+            for file in files:
+                if file.lower().endswith(AUDIO_EXTENSIONS):
+                    audio_files.append(os.path.join(root, file))
+    else:
+        for file in os.listdir(input_dir):
+            if file.lower().endswith(AUDIO_EXTENSIONS):
+                audio_files.append(os.path.join(input_dir, file))
+    return sorted(audio_files)
+
+def file_content_hash(file_path, chunk_size=1 << 20):
+    """SHA-1 of the raw file bytes (no decoding)"""
+    sha1 = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+def probe_audio(file_path, hash_content=True):
+    """Read size, mtime and the audio header of one file without decoding samples"""
+    stat = os.stat(file_path)
+    entry = {
+        "path": file_path,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sample_rate": 0,
+        "channels": 0,
+        "frames": 0,
+        "duration": 0,
+        "sha1": None,
+        "error": None
+    }
+    
+    if stat.st_size == 0:
+        entry["error"] = "empty file"
+        return entry
+    
+    try:
+        info = sf.info(file_path)
+        entry["sample_rate"] = info.samplerate
+        entry["channels"] = info.channels
+        entry["frames"] = info.frames
+        entry["duration"] = info.frames / info.samplerate if info.samplerate else 0
+        if hash_content:
+            entry["sha1"] = file_content_hash(file_path)
+    except Exception as e:
+        entry["error"] = str(e)
+    
+    return entry
+
+class Manifest:
+    """Header-level metadata for every audio file in a corpus"""
+    
+    def __init__(self, entries, input_dir=None, generated_on=None):
+        self.entries = sorted(entries, key=lambda e: e["path"])
+        self.input_dir = input_dir
+        self.generated_on = generated_on or datetime.now().isoformat()
+        self._by_path = {e["path"]: e for e in self.entries}
+    
+    @classmethod
+    def scan(cls, input_dir, workers=None, hash_content=True, recursive=True, previous=None):
+        """Probe every audio file under input_dir in parallel, reusing unchanged entries from a previous manifest"""
+        audio_files = find_audio_files(input_dir, recursive=recursive)
+        
+        entries = []
+        to_probe = []
+        for path in audio_files:
+            old = previous.get(path) if previous is not None else None
+            if old is not None and _is_unchanged(old, path) and (old.get("sha1") or not hash_content):
+                entries.append(old)
+            else:
+                to_probe.append(path)
+        
+        workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            entries.extend(pool.map(lambda p: probe_audio(p, hash_content), to_probe))
+        
+        return cls(entries, input_dir=input_dir)
+    
+    @classmethod
+    def load(cls, manifest_path):
+        """Load a manifest written by save()"""
+        with open(manifest_path, 'r') as f:
+            data = json.load(f)
+        return cls(data["files"], input_dir=data.get("input_dir"), generated_on=data.get("generated_on"))
+    
+    @classmethod
+    def for_directory(cls, input_dir, manifest_path=None, recursive=True):
+        """Header-only scan of input_dir, reusing unchanged entries from manifest_path (default <input_dir>/manifest.json)
+        
+        The directory is always listed again, so files added, removed or modified since the manifest
+        was written are picked up; only entries whose size and mtime still match are taken from it.
+        """
+        manifest_path = manifest_path or os.path.join(input_dir, MANIFEST_FILENAME)
+        previous = cls.load(manifest_path) if os.path.exists(manifest_path) else None
+        return cls.scan(input_dir, hash_content=False, recursive=recursive, previous=previous)
+    
+    def save(self, manifest_path):
+        """Write the manifest as a single JSON file"""
+        directory = os.path.dirname(manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "input_dir": self.input_dir,
+            "generated_on": self.generated_on,
+            "num_files": len(self.entries),
+            "files": self.entries
+        }
+        with open(manifest_path, 'w') as f:
+            json.dump(data, f)
+    
+    def get(self, path):
+        return self._by_path.get(path)
+    
+    def paths(self, include_unreadable=False):
+        """Sorted paths of files that have a readable, non-empty header"""
+        return [
+            e["path"] for e in self.entries
+            if include_unreadable or (e["error"] is None and e["frames"] > 0)
+        ]
+    
+    def unreadable(self):
+        return [e for e in self.entries if e["error"] is not None or e["frames"] == 0]
+    
+    def duration(self, path):
+        """Duration in seconds from the header, or None if the file is not in the manifest"""
+        entry = self._by_path.get(path)
+        return entry["duration"] if entry is not None else None
+    
+    def __len__(self):
+        return len(self.entries)
+
+def _is_unchanged(entry, path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime
+
+def main():
+    """Build a corpus manifest"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Build an audio corpus manifest from file headers')
+    parser.add_argument('--input_dir', required=True, help='Directory to scan for audio files')
+    parser.add_argument('--output', help='Manifest JSON file (default: <input_dir>/manifest.json)')
+    parser.add_argument('--workers', type=int, default=None, help='Number of parallel probe threads')
+    parser.add_argument('--no_hash', action='store_true', help='Skip content hashing')
+    
+    args = parser.parse_args()
+    args.output = args.output or os.path.join(args.input_dir, MANIFEST_FILENAME)
+    
+    previous = Manifest.load(args.output) if os.path.exists(args.output) else None
+    manifest = Manifest.scan(
+        args.input_dir, workers=args.workers,
+        hash_content=not args.no_hash, previous=previous
+    )
+    manifest.save(args.output)
+    
+    print(f"Manifest saved to {args.output}")
+    print(f"Files: {len(manifest)} ({len(manifest.paths())} readable)")
+    for entry in manifest.unreadable():
+        print(f"  Skipping {entry['path']}: {entry['error'] or 'no audio frames'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# ai_model/mel_frontend.py
+import os
+import json
+import numpy as np
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model", "config.json")
+
+def hann_window(n_fft):
+    """Periodic Hann window, same as scipy.signal.get_window('hann', n_fft, fftbins=True)"""
+    return 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(n_fft) / n_fft)
+
+def _hz_to_mel(frequencies):
+    """Slaney mel scale: linear below 1 kHz, logarithmic above (librosa's htk=False)"""
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    mels = frequencies / (200.0 / 3)
+    log_region = frequencies >= 1000.0
+    mels[log_region] = 15.0 + np.log(frequencies[log_region] / 1000.0) / (np.log(6.4) / 27.0)
+    return mels
+
+def _mel_to_hz(mels):
+    mels = np.asarray(mels, dtype=np.float64)
+    frequencies = mels * (200.0 / 3)
+    log_region = mels >= 15.0
+    frequencies[log_region] = 1000.0 * np.exp((np.log(6.4) / 27.0) * (mels[log_region] - 15.0))
+    return frequencies
+
+def mel_filterbank(sample_rate, n_fft, n_mels=128, fmin=0.0, fmax=None):
+    """Slaney-normalized triangular mel filterbank, equal to librosa.filters.mel defaults"""
+    fmax = sample_rate / 2.0 if fmax is None else fmax
+    fft_freqs = np.fft.rfftfreq(n_fft, d=1.0 / sample_rate)
+    mel_freqs = _mel_to_hz(np.linspace(_hz_to_mel([fmin])[0], _hz_to_mel([fmax])[0], n_mels + 2))
+    
+    widths = np.diff(mel_freqs)
+    ramps = mel_freqs[:, None] - fft_freqs[None, :]
+    lower = -ramps[:-2] / widths[:-1, None]
+    upper = ramps[2:] / widths[1:, None]
+    weights = np.maximum(0, np.minimum(lower, upper))
+    
+    # Slaney normalization: each filter has unit area
+    weights *= (2.0 / (mel_freqs[2:] - mel_freqs[:-2]))[:, None]
+    return weights.astype(np.float32)
+
+def load_frontend_config(config_path=DEFAULT_CONFIG_PATH):
+    """MelFrontend settings from the model_config section of model/config.json"""
+    with open(config_path, "r") as f:
+        config = json.load(f)["model_config"]
+    return {
+        "sample_rate": config["input_sample_rate"],
+        "n_fft": config["fft_size"],
+        "hop_length": config["hop_length"],
+        "n_mels": config["n_mels"],
+        "segment_duration": config["segment_duration"]
+    }
+
+class MelFrontend:
+    """Log-mel spectrogram engine with a cached window and mel filterbank
+    
+    Frames are strided views over the signal, so many segments go through one batched rFFT and one
+    matmul with the filterbank instead of a librosa.feature.melspectrogram call each. Output matches
+    librosa (center=True, constant padding, power=2, power_to_db(ref=np.max, top_db=80)) to float32
+    rounding (well under 1e-3 dB).
+    """
+    
+    def __init__(self, sample_rate=22050, n_fft=2048, hop_length=512, n_mels=128,
+                 segment_duration=2.0, top_db=80.0, amin=1e-10, chunk_frames=8192):
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.segment_duration = segment_duration
+        self.segment_samples = int(sample_rate * segment_duration)
+        self.segment_frames = 1 + self.segment_samples // hop_length
+        self.top_db = top_db
+        self.amin = amin
+        self.chunk_frames = chunk_frames  # bounds the size of the temporary frame/FFT buffers
+        
+        # Built once and reused for every call
+        self.window = hann_window(n_fft).astype(np.float32)
+        self.mel_basis = mel_filterbank(sample_rate, n_fft, n_mels)
+        self._mel_basis_t = np.ascontiguousarray(self.mel_basis.T)
+    
+    @classmethod
+    def from_config(cls, config_path=DEFAULT_CONFIG_PATH):
+        """Build the frontend from the model_config section of model/config.json"""
+        return cls(**load_frontend_config(config_path))
+    
+    def frame(self, y, center=True):
+        """Strided (..., n_frames, n_fft) view of y; centre padding is zeros like librosa's default"""
+        y = np.asarray(y, dtype=np.float32)
+        if center:
+            pad = [(0, 0)] * (y.ndim - 1) + [(self.n_fft // 2, self.n_fft // 2)]
+            y = np.pad(y, pad, "constant")
+        frames = np.lib.stride_tricks.sliding_window_view(y, self.n_fft, axis=-1)
+        return frames[..., ::self.hop_length, :]
+    
+    def _power_mel_frames(self, frames):
+        spectrum = np.fft.rfft(frames * self.window, axis=-1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        return power @ self._mel_basis_t
+    
+    def power_mel(self, y, center=True):
+        """Mel power spectrogram of a 1-D signal (n_mels, T) or a batch of equal-length signals (N, n_mels, T)"""
+        frames = self.frame(y, center)
+        n_frames = frames.shape[-2]
+        
+        if frames.ndim == 2:
+            mel = np.empty((n_frames, self.n_mels), dtype=np.float32)
+            for start in range(0, n_frames, self.chunk_frames):
+                mel[start:start + self.chunk_frames] = self._power_mel_frames(frames[start:start + self.chunk_frames])
+            return mel.T
+        
+        step = max(1, self.chunk_frames // max(1, n_frames))
+        mel = np.empty((frames.shape[0], n_frames, self.n_mels), dtype=np.float32)
+        for start in range(0, frames.shape[0], step):
+            mel[start:start + step] = self._power_mel_frames(frames[start:start + step])
+        return mel.transpose(0, 2, 1)
+    
+    def power_to_db(self, mel, ref_max=True):
+        """dB scaling; with ref_max each item is scaled like power_to_db(ref=np.max, top_db=top_db)"""
+        log_mel = 10.0 * np.log10(np.maximum(self.amin, mel))
+        if not ref_max:
+            return log_mel
+        log_mel -= log_mel.max(axis=(-2, -1), keepdims=True)
+        return np.maximum(log_mel, -self.top_db)
+    
+    def log_mel(self, y, center=True):
+        """Log-mel spectrogram(s) of y, each scaled to its own maximum"""
+        return self.power_to_db(self.power_mel(y, center))
+    
+    def segment_features(self, y):
+        """Split y into zero-padded segments and return (N, n_mels, segment_frames, 1) features"""
+        n_segments = int(np.ceil(len(y) / self.segment_samples))
+        if n_segments == 0:
+            return np.zeros((0, self.n_mels, self.segment_frames, 1), dtype=np.float32)
+        padded = np.pad(np.asarray(y, dtype=np.float32), (0, n_segments * self.segment_samples - len(y)), "constant")
+        segments = padded.reshape(n_segments, self.segment_samples)
+        return self.log_mel(segments)[..., np.newaxis]
+    
+    def window_hop_frames(self, hop_seconds):
+        """Window hop rounded to whole STFT frames, so every window is a slice of the same spectrogram"""
+        return max(1, int(round(hop_seconds * self.sample_rate / self.hop_length)))
+    
+    def window_hop_seconds(self, hop_seconds):
+        """The hop actually used for hop_seconds after rounding to frames"""
+        return self.window_hop_frames(hop_seconds) * self.hop_length / self.sample_rate
+    
+    def overlapping_windows(self, y, hop_seconds):
+        """(N, n_mels, segment_frames, 1) windows starting every hop_seconds, cut from one whole-file spectrogram
+        
+        The STFT and filterbank run once over the file; windows are strided views into it, so
+        overlap only adds the per-window ref=np.max / top_db scaling, not featurization.
+        """
+        hop_frames = self.window_hop_frames(hop_seconds)
+        hop_samples = hop_frames * self.hop_length
+        n_windows = int(np.ceil(len(y) / hop_samples))
+        if n_windows == 0:
+            return np.zeros((0, self.n_mels, self.segment_frames, 1), dtype=np.float32)
+        
+        # Zero-pad so the last window has all its frames
+        total = max(len(y), (n_windows - 1) * hop_samples + self.segment_samples)
+        padded = np.pad(np.asarray(y, dtype=np.float32), (0, total - len(y)), "constant")
+        log_mel = self.power_to_db(self.power_mel(padded), ref_max=False)
+        return self._scale_windows(log_mel, hop_frames, n_windows)
+    
+    def _scale_windows(self, log_mel, hop_frames, n_windows):
+        """Cut n_windows windows every hop_frames out of an absolute-dB spectrogram, each scaled to its own maximum"""
+        windows = np.lib.stride_tricks.sliding_window_view(log_mel, self.segment_frames, axis=1)
+        windows = windows[:, ::hop_frames][:, :n_windows].transpose(1, 0, 2)
+        windows = windows - windows.max(axis=(1, 2), keepdims=True)
+        np.maximum(windows, -self.top_db, out=windows)
+        return windows[..., np.newaxis]
+    
+    def stream_segment_features(self, blocks):
+        """segment_features over an iterable of PCM blocks, yielding the features of the segments each block completes"""
+        carry = np.zeros(0, dtype=np.float32)
+        for block in blocks:
+            carry = np.concatenate([carry, np.asarray(block, dtype=np.float32)])
+            n_complete = len(carry) // self.segment_samples * self.segment_samples
+            if n_complete:
+                yield self.segment_features(carry[:n_complete])
+                carry = carry[n_complete:]
+        if len(carry):
+            yield self.segment_features(carry)
+    
+    def stream_overlapping_windows(self, blocks, hop_seconds):
+        """overlapping_windows over an iterable of PCM blocks, yielding windows as soon as their frames are complete
+        
+        The STFT input past the last complete window is carried into the next block, so the windows
+        equal those cut from the whole-file spectrogram while only about one block is held.
+        """
+        hop_frames = self.window_hop_frames(hop_seconds)
+        hop_samples = hop_frames * self.hop_length
+        pad = self.n_fft // 2
+        window_span = (self.segment_frames - 1) * self.hop_length + self.n_fft  # samples under one window's frames
+        
+        buffer = np.zeros(pad, dtype=np.float32)  # centre padding before the first frame
+        buffer_start = 0  # index of buffer[0] in the centre-padded stream
+        n_samples = 0
+        next_window = 0
+        
+        for block in blocks:
+            buffer = np.concatenate([buffer, np.asarray(block, dtype=np.float32)])
+            n_samples += len(block)
+            
+            # Windows whose last frame is covered by the samples read so far
+            end_window = max(next_window, (buffer_start + len(buffer) - window_span) // hop_samples + 1)
+            if end_window > next_window:
+                yield self._buffered_windows(buffer, buffer_start, next_window, end_window, hop_frames)
+                # Keep from the next window's first sample (hops longer than a window skip the gap too)
+                drop = min(end_window * hop_samples - buffer_start, len(buffer))
+                buffer = buffer[drop:]
+                buffer_start += drop
+                next_window = end_window
+        
+        # Zero-pad the tail exactly like overlapping_windows and flush the remaining windows
+        n_windows = int(np.ceil(n_samples / hop_samples))
+        if next_window >= n_windows:
+            return
+        total = max(n_samples, (n_windows - 1) * hop_samples + self.segment_samples)
+        buffer = np.pad(buffer, (0, pad + total + pad - buffer_start - len(buffer)), "constant")
+        yield self._buffered_windows(buffer, buffer_start, next_window, n_windows, hop_frames)
+    
+    def _buffered_windows(self, buffer, buffer_start, first_window, end_window, hop_frames):
+        hop_samples = hop_frames * self.hop_length
+        start = first_window * hop_samples - buffer_start
+        end = (end_window - 1) * hop_samples + (self.segment_frames - 1) * self.hop_length + self.n_fft - buffer_start
+        log_mel = self.power_to_db(self.power_mel(buffer[start:end], center=False), ref_max=False)
+        return self._scale_windows(log_mel, hop_frames, end_window - first_window)
+
+_frontends = {}
+
+def get_mel_frontend(sample_rate=22050, n_fft=2048, hop_length=512, n_mels=128, segment_duration=2.0):
+    """Shared MelFrontend per parameter set, so filterbanks are built once per process"""
+    key = (sample_rate, n_fft, hop_length, n_mels, segment_duration)
+    if key not in _frontends:
+        _frontends[key] = MelFrontend(sample_rate, n_fft, hop_length, n_mels, segment_duration)
+    return _frontends[key]
+
+def get_config_frontend(config_path=DEFAULT_CONFIG_PATH, **overrides):
+    """Shared MelFrontend for model/config.json; overrides that are not None replace single settings"""
+    params = load_frontend_config(config_path)
+    params.update({name: value for name, value in overrides.items() if value is not None})
+    return get_mel_frontend(**params)
@@ -0,0 +1,222 @@
+# ai_model/numpy_runtime.py
+import os
+import json
+import argparse
+import numpy as np
+
+# Layers the shipped Sequential CNNs are built from; anything else is rejected at export time
+SUPPORTED_LAYERS = ('InputLayer', 'Conv2D', 'BatchNormalization', 'MaxPooling2D', 'GlobalAveragePooling2D',
+                    'Flatten', 'Dense', 'Dropout')
+
+def weights_path_for(model_path):
+    """The .npz weight file exported next to a Keras .h5 model"""
+    if model_path.endswith('.npz'):
+        return model_path
+    return os.path.splitext(model_path)[0] + '.npz'
+
+def _layer_spec(layer):
+    """Architecture and float32 weights of one Keras layer"""
+    kind = type(layer).__name__
+    if kind not in SUPPORTED_LAYERS:
+        raise ValueError(f"Layer {layer.name} ({kind}) is not supported by the NumPy runtime")
+    config = layer.get_config()
+    weights = [np.asarray(w, dtype=np.float32) for w in layer.get_weights()]
+    spec = {'type': kind}
+
+    if kind == 'Conv2D':
+        if config.get('dilation_rate', (1, 1)) not in ((1, 1), [1, 1]) or config.get('groups', 1) != 1:
+            raise ValueError(f"Layer {layer.name}: dilated or grouped convolutions are not supported")
+        spec.update(strides=list(config['strides']), padding=config['padding'], activation=config['activation'])
+        spec['kernel'] = weights[0]
+        spec['bias'] = weights[1] if config['use_bias'] else np.zeros(weights[0].shape[-1], np.float32)
+    elif kind == 'Dense':
+        spec.update(activation=config['activation'])
+        spec['kernel'] = weights[0]
+        spec['bias'] = weights[1] if config['use_bias'] else np.zeros(weights[0].shape[-1], np.float32)
+    elif kind == 'BatchNormalization':
+        # Inference-mode BN is a per-channel affine map: y = x * scale + shift
+        params = iter(weights)
+        gamma = next(params) if config['scale'] else None
+        beta = next(params) if config['center'] else None
+        mean, var = next(params), next(params)
+        scale = 1.0 / np.sqrt(var + config['epsilon'])
+        if gamma is not None:
+            scale = scale * gamma
+        shift = -mean * scale
+        if beta is not None:
+            shift = shift + beta
+        spec['scale'], spec['shift'] = scale.astype(np.float32), shift.astype(np.float32)
+    elif kind == 'MaxPooling2D':
+        spec.update(pool_size=list(config['pool_size']), strides=list(config['strides'] or config['pool_size']),
+                    padding=config['padding'])
+    return spec
+
+def fold_batchnorm(specs):
+    """Fold each BatchNormalization into an adjacent Conv2D/Dense so it costs nothing at inference
+
+    BN goes into the preceding layer when that layer has no activation, otherwise into the next
+    Conv2D/Dense when at most a Dropout sits in between (and the conv is unpadded, so the shift
+    never meets zero padding). BNs that fit neither case stay as a fused multiply-add.
+    """
+    specs = [s for s in specs if s['type'] not in ('InputLayer', 'Dropout')]
+    folded = []
+    i = 0
+    while i < len(specs):
+        spec = specs[i]
+        if spec['type'] != 'BatchNormalization':
+            folded.append(spec)
+            i += 1
+            continue
+
+        scale, shift = spec['scale'], spec['shift']
+        previous = folded[-1] if folded else None
+        if previous is not None and previous['type'] in ('Conv2D', 'Dense') and previous['activation'] == 'linear':
+            previous['kernel'] = previous['kernel'] * scale
+            previous['bias'] = previous['bias'] * scale + shift
+            i += 1
+            continue
+
+        following = specs[i + 1] if i + 1 < len(specs) else None
+        if following is not None and (following['type'] == 'Dense' or (
+                following['type'] == 'Conv2D' and following['padding'] == 'valid')):
+            # Input channels sit on the second-to-last kernel axis for both Conv2D (kh, kw, C, F) and Dense (C, F)
+            kernel = following['kernel']
+            taps = kernel.reshape(-1, kernel.shape[-2], kernel.shape[-1])
+            following['bias'] = following['bias'] + np.einsum('c,kcf->f', shift, taps)
+            following['kernel'] = kernel * scale[:, None]
+            i += 1
+            continue
+
+        folded.append(spec)
+        i += 1
+    return folded
+
+def export_weights(model_path, output_path=None):
+    """Write the architecture and (BN-folded) weights of a Keras model to an .npz for the NumPy runtime"""
+    import tensorflow as tf
+
+    output_path = output_path or weights_path_for(model_path)
+    model = tf.keras.models.load_model(model_path)
+    specs = fold_batchnorm([_layer_spec(layer) for layer in model.layers])
+
+    arrays = {}
+    architecture = []
+    for index, spec in enumerate(specs):
+        entry = {}
+        for name, value in spec.items():
+            if isinstance(value, np.ndarray):
+                arrays[f"{index}_{name}"] = value
+            else:
+                entry[name] = value
+        architecture.append(entry)
+
+    header = {'input_shape': list(model.input_shape[1:]), 'layers': architecture}
+    np.savez(output_path, architecture=np.array(json.dumps(header)), **arrays)
+
+    size_kb = os.path.getsize(output_path) / 1024
+    print(f"Exported {model_path} -> {output_path} ({len(architecture)} layers, {size_kb:.0f} KB)")
+    return output_path
+
+def _activate(x, activation):
+    if activation == 'relu':
+        return np.maximum(x, 0, out=x)
+    if activation == 'softmax':
+        x = x - x.max(axis=-1, keepdims=True)
+        np.exp(x, out=x)
+        return x / x.sum(axis=-1, keepdims=True)
+    if activation == 'sigmoid':
+        return 1.0 / (1.0 + np.exp(-x))
+    if activation == 'linear':
+        return x
+    raise ValueError(f"Unsupported activation '{activation}'")
+
+def _same_padding(size, kernel, stride):
+    """TensorFlow 'same' padding: (before, after) for one spatial axis"""
+    out = -(-size // stride)
+    total = max((out - 1) * stride + kernel - size, 0)
+    return total // 2, total - total // 2
+
+def conv2d(x, kernel, bias, strides=(1, 1), padding='valid'):
+    """NHWC convolution as im2col + one matmul"""
+    kh, kw, channels, filters = kernel.shape
+    if padding == 'same':
+        x = np.pad(x, ((0, 0), _same_padding(x.shape[1], kh, strides[0]),
+                       _same_padding(x.shape[2], kw, strides[1]), (0, 0)))
+    # (N, H', W', C, kh, kw) view; reorder to (N, H', W', kh, kw, C) to match the Keras kernel layout
+    patches = np.lib.stride_tricks.sliding_window_view(x, (kh, kw), axis=(1, 2))
+    patches = patches[:, ::strides[0], ::strides[1]].transpose(0, 1, 2, 4, 5, 3)
+    n, out_h, out_w = patches.shape[:3]
+    cols = patches.reshape(n * out_h * out_w, kh * kw * channels)
+    out = cols @ kernel.reshape(kh * kw * channels, filters)
+    out += bias
+    return out.reshape(n, out_h, out_w, filters)
+
+def max_pool2d(x, pool_size=(2, 2), strides=None, padding='valid'):
+    """NHWC max pooling; non-overlapping pools are a reshape + max"""
+    ph, pw = pool_size
+    sh, sw = strides or pool_size
+    if padding == 'same':
+        pads = (_same_padding(x.shape[1], ph, sh), _same_padding(x.shape[2], pw, sw))
+        x = np.pad(x, ((0, 0), pads[0], pads[1], (0, 0)), constant_values=-np.inf)
+    if (sh, sw) == (ph, pw):
+        n, h, w, c = x.shape
+        h, w = h // ph, w // pw
+        return x[:, :h * ph, :w * pw].reshape(n, h, ph, w, pw, c).max(axis=(2, 4))
+    windows = np.lib.stride_tricks.sliding_window_view(x, (ph, pw), axis=(1, 2))[:, ::sh, ::sw]
+    return windows.max(axis=(4, 5))
+
+class NumpyModel:
+    """Pure-NumPy forward pass over weights written by export_weights, no TensorFlow import"""
+
+    def __init__(self, weights_path):
+        self.weights_path = weights_path
+        with np.load(weights_path) as data:
+            header = json.loads(str(data['architecture']))
+            self.input_shape = tuple(header['input_shape'])
+            self.layers = []
+            for index, entry in enumerate(header['layers']):
+                layer = dict(entry)
+                for key in data.files:
+                    if key.startswith(f"{index}_"):
+                        layer[key[len(f"{index}_"):]] = np.ascontiguousarray(data[key], dtype=np.float32)
+                self.layers.append(layer)
+
+    def forward(self, x):
+        """Run one batch through every layer"""
+        for layer in self.layers:
+            kind = layer['type']
+            if kind == 'Conv2D':
+                x = _activate(conv2d(x, layer['kernel'], layer['bias'], layer['strides'], layer['padding']),
+                              layer['activation'])
+            elif kind == 'Dense':
+                x = _activate(x @ layer['kernel'] + layer['bias'], layer['activation'])
+            elif kind == 'BatchNormalization':
+                x = x * layer['scale'] + layer['shift']
+            elif kind == 'MaxPooling2D':
+                x = max_pool2d(x, layer['pool_size'], layer['strides'], layer['padding'])
+            elif kind == 'GlobalAveragePooling2D':
+                x = x.mean(axis=(1, 2))
+            elif kind == 'Flatten':
+                x = x.reshape(len(x), -1)
+        return x
+
+    def predict(self, features, batch_size=32, verbose=0):
+        """Keras-style predict over features in batches of batch_size"""
+        features = np.asarray(features, dtype=np.float32).reshape((-1,) + self.input_shape)
+        batch_size = batch_size or 32
+        outputs = [self.forward(features[start:start + batch_size])
+                   for start in range(0, len(features), batch_size)]
+        if not outputs:
+            return np.zeros((0, self.layers[-1]['bias'].shape[0]), dtype=np.float32)
+        return np.concatenate(outputs).astype(np.float32, copy=False)
+
+def main():
+    parser = argparse.ArgumentParser(description='Export Keras model weights for the NumPy inference runtime')
+    parser.add_argument('--model_path', required=True, help='Path to trained .h5 model')
+    parser.add_argument('--output', help='Output .npz path (default: next to the model)')
+
+    args = parser.parse_args()
+    export_weights(args.model_path, args.output)
+
+if __name__ == "__main__":
+    main()
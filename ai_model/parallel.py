@@ -0,0 +1,60 @@
+# ai_model/parallel.py
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Per-process predictor, created once by the pool initializer
+_worker_predictor = None
+
+def _init_worker(predictor_class, model_path, threads_per_worker, predictor_kwargs):
+    """Load the model once per worker process"""
+    global _worker_predictor
+    
+    # Keep N workers from each spawning a full-size thread pool
+    if predictor_kwargs.get('backend', 'keras') == 'keras':
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads_per_worker)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    else:
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(threads_per_worker)
+        except ImportError:
+            pass
+    _worker_predictor = predictor_class(model_path, **predictor_kwargs)
+
+def _predict_file(audio_path, confidence_threshold):
+    return audio_path, _worker_predictor.predict_audio(audio_path, confidence_threshold)
+
+def lpt_order(audio_files, manifest=None):
+    """Longest-processing-time-first order: longest files first, ties broken by path"""
+    def duration(path):
+        if manifest is None:
+            return 0
+        return manifest.duration(path) or 0
+    return sorted(audio_files, key=lambda path: (-duration(path), path))
+
+def predict_files_parallel(predictor_class, model_path, audio_files, confidence_threshold,
+                           workers, manifest=None, predictor_kwargs=None):
+    """Run predict_audio for every file in a process pool, yielding (audio_path, detections) as each finishes
+
+    Nothing is kept once a file's detections are yielded, so memory does not grow with the corpus.
+    """
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    
+    # Spawn rather than fork: a forked TensorFlow runtime can deadlock in the children
+    context = mp.get_context('spawn')
+    
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(predictor_class, model_path, threads_per_worker, predictor_kwargs or {})) as pool:
+        # Submitted longest first; idle workers pick up the next file in this order.
+        # as_completed drops each future once it is yielded, so finished results are not held here.
+        completed = as_completed([
+            pool.submit(_predict_file, audio_path, confidence_threshold)
+            for audio_path in lpt_order(audio_files, manifest)
+        ])
+        
+        for done, future in enumerate(completed, 1):
+            audio_path, detections = future.result()
+            print(f"Processed {os.path.basename(audio_path)} ({done}/{len(audio_files)})")
+            yield audio_path, detections
@@ -0,0 +1,140 @@
+# ai_model/pipeline.py
+import os
+import queue
+import multiprocessing as mp
+import numpy as np
+
+from ai_model.parallel import lpt_order
+
+def _featurize_worker(data_loader, task_queue, result_queue, chunk_size):
+    """Decode and featurize files from task_queue, pushing segment tensors into the bounded result_queue"""
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        
+        audio_id, audio_path = task
+        features = data_loader.extract_features(audio_path)
+        if features is None:
+            # None segments tells the consumer the file failed, as opposed to holding no segments
+            result_queue.put(('done', audio_id, None, None))
+            continue
+        
+        # Large files go out in chunks so one file cannot pin the whole queue budget
+        for offset in range(0, len(features), chunk_size):
+            result_queue.put(('features', audio_id, offset, features[offset:offset + chunk_size]))
+        result_queue.put(('done', audio_id, len(features), None))
+    
+    result_queue.put(('exit', None, None, None))
+
+class InferencePipeline:
+    """Featurizer processes feed one inference consumer that batches segments across file boundaries"""
+    
+    def __init__(self, predictor, workers=4, batch_size=256, queue_size=64):
+        self.predictor = predictor
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+    
+    def run(self, audio_files, confidence_threshold, manifest=None):
+        """Yield (audio_path, detections) for every file as it finishes; nothing is kept once yielded
+        
+        Detections are None for a file that could not be decoded or featurized, as from predict_audio.
+        """
+        # Spawn rather than fork: the parent already holds a TensorFlow runtime
+        context = mp.get_context('spawn')
+        task_queue = context.Queue()
+        result_queue = context.Queue(maxsize=self.queue_size)
+        
+        audio_ids = {path: audio_id for audio_id, path in enumerate(audio_files)}
+        for audio_path in lpt_order(audio_files, manifest):
+            task_queue.put((audio_ids[audio_path], audio_path))
+        for _ in range(self.workers):
+            task_queue.put(None)
+        
+        processes = [
+            context.Process(
+                target=_featurize_worker,
+                args=(self.predictor.data_loader, task_queue, result_queue, self.batch_size)
+            )
+            for _ in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+        
+        pending = []          # (audio_id, offset, features) waiting for a full batch
+        pending_segments = 0
+        predictions = {}      # audio_id -> [(offset, predictions)]
+        expected = {}         # audio_id -> total segments, known once the file is fully featurized
+        finished = 0
+        running = self.workers
+        
+        try:
+            while running > 0:
+                try:
+                    kind, audio_id, value, features = result_queue.get(timeout=5.0)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError("Featurizer workers exited unexpectedly")
+                    continue
+                
+                if kind == 'exit':
+                    running -= 1
+                elif kind == 'features':
+                    pending.append((audio_id, value, features))
+                    pending_segments += len(features)
+                    if pending_segments >= self.batch_size:
+                        self._predict_pending(pending, predictions)
+                        pending, pending_segments = [], 0
+                else:
+                    expected[audio_id] = value
+                
+                for audio_path, detections in self._collect_finished(expected, predictions, audio_files, confidence_threshold):
+                    finished += 1
+                    print(f"Processed {os.path.basename(audio_path)} ({finished}/{len(audio_files)})")
+                    yield audio_path, detections
+            
+            # Flush the final partial batch
+            if pending:
+                self._predict_pending(pending, predictions)
+            for audio_path, detections in self._collect_finished(expected, predictions, audio_files, confidence_threshold):
+                finished += 1
+                print(f"Processed {os.path.basename(audio_path)} ({finished}/{len(audio_files)})")
+                yield audio_path, detections
+        finally:
+            for process in processes:
+                process.join(timeout=5.0)
+                if process.is_alive():
+                    process.terminate()
+    
+    def _predict_pending(self, pending, predictions):
+        """Run one model.predict over segments from several files and route the rows back"""
+        batch = np.concatenate([features for _, _, features in pending])
+        batch_predictions = self.predictor.model.predict(batch, batch_size=self.batch_size, verbose=0)
+        
+        start = 0
+        for audio_id, offset, features in pending:
+            predictions.setdefault(audio_id, []).append((offset, batch_predictions[start:start + len(features)]))
+            start += len(features)
+    
+    def _collect_finished(self, expected, predictions, audio_files, confidence_threshold):
+        """[(audio_path, detections)] for the files whose segments have all been predicted"""
+        finished = []
+        for audio_id in list(expected):
+            parts = predictions.get(audio_id, [])
+            if expected[audio_id] is not None and sum(len(p) for _, p in parts) < expected[audio_id]:
+                continue
+            
+            audio_path = audio_files[audio_id]
+            if expected[audio_id] is None:
+                detections = None
+            elif parts:
+                file_predictions = np.concatenate([p for _, p in sorted(parts, key=lambda part: part[0])])
+                detections = self.predictor._detections_from_predictions(file_predictions, confidence_threshold)
+            else:
+                detections = []
+            
+            del expected[audio_id]
+            predictions.pop(audio_id, None)
+            finished.append((audio_path, detections))
+        return finished
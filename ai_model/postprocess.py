@@ -0,0 +1,115 @@
+# ai_model/postprocess.py
+import numpy as np
+
+def segment_arrays(predictions, window_step, window_duration, confidence_threshold, background_class=0):
+    """Confident non-background windows as (starts, ends, scores, classes) arrays, in seconds"""
+    predictions = np.asarray(predictions)
+    if len(predictions) == 0:
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=int)
+    classes = np.argmax(predictions, axis=1)
+    scores = predictions[np.arange(len(predictions)), classes]
+    index = np.flatnonzero((scores > confidence_threshold) & (classes != background_class))
+    starts = index * window_step
+    return starts, starts + window_duration, scores[index], classes[index]
+
+def segments_to_arrays(segments):
+    """(starts, ends, scores, classes) arrays from detection dicts"""
+    starts = np.fromiter((s['start_time'] for s in segments), dtype=float, count=len(segments))
+    ends = np.fromiter((s['end_time'] for s in segments), dtype=float, count=len(segments))
+    scores = np.fromiter((s['score'] for s in segments), dtype=float, count=len(segments))
+    classes = np.fromiter((s['category_id'] for s in segments), dtype=int, count=len(segments))
+    return starts, ends, scores, classes
+
+def merge_events(starts, ends, scores, classes, max_gap=0.0):
+    """Merge same-class segments that overlap or are at most max_gap seconds apart
+
+    Returns (starts, ends, scores, classes, counts) per event; an event's score is the best score
+    of its segments and counts is how many segments it absorbed.
+    """
+    if len(starts) == 0:
+        return starts, ends, scores, classes, np.zeros(0, dtype=int)
+    order = np.lexsort((starts, classes))
+    starts, ends, scores, classes = starts[order], ends[order], scores[order], classes[order]
+
+    # Running max of end times within each class: offset each class past the previous one's range
+    span = ends.max() - starts.min() + max_gap + 1.0
+    class_rank = np.cumsum(np.r_[0, classes[1:] != classes[:-1]])
+    offset = class_rank * span
+    reach = np.maximum.accumulate(ends + offset) - offset
+
+    new_event = np.r_[True, (classes[1:] != classes[:-1]) | (starts[1:] > reach[:-1] + max_gap)]
+    first = np.flatnonzero(new_event)
+    return (starts[first], np.maximum.reduceat(ends, first), np.maximum.reduceat(scores, first),
+            classes[first], np.diff(np.r_[first, len(starts)]))
+
+def temporal_iou(start, end, other_start, other_end):
+    """Intersection-over-union of two time intervals"""
+    inter = max(0.0, min(end, other_end) - max(start, other_start))
+    union = (end - start) + (other_end - other_start) - inter
+    return inter / max(union, 1e-9)
+
+def temporal_nms(starts, ends, scores, iou_threshold=0.5):
+    """Indices of intervals kept by greedy non-max suppression across classes, in time order
+
+    Candidates go best score first and are compared only with already kept intervals that can
+    overlap them: those starting in [start - longest duration, end), a contiguous range of the
+    start-sorted intervals found by bisection. Memory stays O(N) however many events a file has.
+    """
+    if len(starts) == 0:
+        return np.zeros(0, dtype=int)
+    order = np.argsort(-scores, kind='stable')
+    score_rank = np.empty(len(order), dtype=int)
+    score_rank[order] = np.arange(len(order))
+
+    # Start order, ties by score order, so the kept intervals come out exactly as a stable sort would
+    by_start = np.lexsort((score_rank, starts))
+    position = np.empty(len(by_start), dtype=int)
+    position[by_start] = np.arange(len(by_start))
+    sorted_starts, sorted_ends = starts[by_start], ends[by_start]
+
+    longest = (ends - starts).max()
+    first = np.searchsorted(sorted_starts, starts - longest - 1e-6, side='left')
+    last = np.searchsorted(sorted_starts, ends, side='left')
+
+    # Neighbourhoods hold a handful of intervals, so plain Python scalars beat tiny array ops here
+    sorted_starts, sorted_ends = sorted_starts.tolist(), sorted_ends.tolist()
+    kept = [False] * len(by_start)
+    for p, lo, hi in zip(position[order].tolist(), first[order].tolist(), last[order].tolist()):
+        start, end = sorted_starts[p], sorted_ends[p]
+        for j in range(lo, hi):
+            if kept[j] and temporal_iou(start, end, sorted_starts[j], sorted_ends[j]) > iou_threshold:
+                break
+        else:
+            kept[p] = True
+    return by_start[np.array(kept, dtype=bool)]
+
+def aggregate_events(starts, ends, scores, classes, max_gap=0.0, nms_iou=0.5):
+    """Merge same-class runs into events, then suppress overlapping events of other classes"""
+    starts, ends, scores, classes, counts = merge_events(starts, ends, scores, classes, max_gap)
+    if nms_iou is None:
+        keep = np.argsort(starts, kind='stable')
+    else:
+        keep = temporal_nms(starts, ends, scores, nms_iou)
+    return starts[keep], ends[keep], scores[keep], classes[keep], counts[keep]
+
+def events_to_dicts(starts, ends, scores, classes, counts, class_names=None, decimals=3):
+    """Detection dicts with sub-second boundaries, one per event"""
+    events = []
+    for start, end, score, class_id, count in zip(starts.tolist(), ends.tolist(), scores.tolist(),
+                                                   classes.tolist(), counts.tolist()):
+        event = {
+            'start_time': round(start, decimals),
+            'end_time': round(end, decimals),
+            'duration': round(end - start, decimals),
+            'category_id': int(class_id)
+        }
+        if class_names is not None:
+            event['category_name'] = class_names[class_id]
+        event['score'] = float(score)
+        event['n_segments'] = int(count)
+        events.append(event)
+    return events
+
+def merge_segments(segments, max_gap=0.0, nms_iou=0.5, class_names=None):
+    """aggregate_events over detection dicts"""
+    return events_to_dicts(*aggregate_events(*segments_to_arrays(segments), max_gap, nms_iou), class_names)
@@ -2,59 +2,138 @@
 import os
 import sys
 import numpy as np
-import librosa
-import tensorflow as tf
 from datetime import datetime
 import json
+import soundfile as sf
 
 # Add the parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from ai_model.manifest import Manifest
+from ai_model.mel_frontend import get_config_frontend
+from ai_model.audio_source import DEFAULT_RESAMPLE_ENGINE, RESAMPLE_ENGINES, pcm_blocks, describe_resampling, peak_normalize
+from ai_model.feature_store import FeatureStore
+from ai_model.parallel import predict_files_parallel
+from ai_model.pipeline import InferencePipeline
+from ai_model.backends import BACKENDS, DEFAULT_BACKEND, load_model
+from ai_model.postprocess import segment_arrays, aggregate_events, events_to_dicts
+from ai_model.ledger import PredictionLedger, previous_results
+from ai_model.detection_store import DetectionStore
+from ai_model.annotation_journal import AnnotationJournal, journal_path_for, assemble
+
 class UnderwaterDataLoader:
-    def __init__(self, sample_rate=22050, segment_duration=2.0, n_mels=128):
-        self.sample_rate = sample_rate
-        self.segment_duration = segment_duration
-        self.segment_samples = int(sample_rate * segment_duration)
-        self.n_mels = n_mels
-        self.hop_length = 512
-        self.n_fft = 2048
+    n_frames = None  # frames per window the model takes; None keeps the frontend's segment length
+    
+    def __init__(self, sample_rate=None, segment_duration=None, n_mels=None, feature_store=None,
+                 resample_engine=DEFAULT_RESAMPLE_ENGINE, report_resampling=False, hop_seconds=None, block_seconds=60.0):
+        # Settings left as None come from model/config.json
+        self.frontend = get_config_frontend(sample_rate=sample_rate, segment_duration=segment_duration, n_mels=n_mels)
+        self.sample_rate = self.frontend.sample_rate
+        self.segment_duration = self.frontend.segment_duration
+        self.segment_samples = self.frontend.segment_samples
+        self.n_mels = self.frontend.n_mels
+        self.hop_length = self.frontend.hop_length
+        self.n_fft = self.frontend.n_fft
+        self.feature_store = feature_store
+        self.resample_engine = resample_engine
+        self.report_resampling = report_resampling
+        self.hop_seconds = hop_seconds  # None: back-to-back segments; otherwise overlapping windows
+        self.block_seconds = block_seconds  # audio decoded at a time
         
+    def window_step(self):
+        """Seconds between the starts of consecutive feature windows"""
+        if self.hop_seconds is None:
+            return self.segment_duration
+        return self.frontend.window_hop_seconds(self.hop_seconds)
+    
+    def feature_params(self):
+        """Parameters that identify these features in the feature store"""
+        params = {
+            "kind": "segments",
+            "sample_rate": self.sample_rate,
+            "segment_duration": self.segment_duration,
+            "n_fft": self.n_fft,
+            "hop_length": self.hop_length,
+            "n_mels": self.n_mels,
+            "resample_engine": self.resample_engine,
+            "n_frames": self.n_frames
+        }
+        if self.hop_seconds is not None:
+            params["kind"] = "windows"
+            params["hop_seconds"] = self.window_step()
+        return params
+    
     def extract_features(self, audio_path):
-        """Extract mel-spectrogram features from audio file"""
+        """Extract mel-spectrogram features from audio file, through the feature store if configured"""
+        if self.feature_store is None:
+            return self._compute_features(audio_path)
         try:
-            y, sr = librosa.load(audio_path, sr=self.sample_rate)
-            y = librosa.util.normalize(y)
-            
-            # Process in segments
-            features = []
-            for start_idx in range(0, len(y), self.segment_samples):
-                end_idx = min(start_idx + self.segment_samples, len(y))
-                segment = y[start_idx:end_idx]
-                
-                if len(segment) < self.segment_samples:
-                    segment = np.pad(segment, (0, self.segment_samples - len(segment)), 'constant')
-                
-                # Extract mel-spectrogram
-                mel_spec = librosa.feature.melspectrogram(
-                    y=segment, sr=sr, n_fft=self.n_fft,
-                    hop_length=self.hop_length, n_mels=self.n_mels
-                )
-                log_mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
-                
-                # Reshape for CNN (add channel dimension)
-                log_mel_spec = log_mel_spec.reshape(log_mel_spec.shape[0], log_mel_spec.shape[1], 1)
-                features.append(log_mel_spec)
-                
-            return np.array(features)
+            return self.feature_store.get_or_compute(audio_path, self.feature_params(), self._compute_features)
+        except OSError as e:
+            print(f"Error processing {audio_path}: {e}")
+            return None
+    
+    def features_from_signal(self, y):
+        """Segment features for an already decoded mono signal at self.sample_rate"""
+        y = peak_normalize(y)
+        
+        if self.hop_seconds is not None:
+            # Overlapping windows sliced from one whole-file spectrogram
+            features = self.frontend.overlapping_windows(y, self.hop_seconds)
+        else:
+            # Process in segments: one batched STFT and filterbank matmul for the whole file
+            features = self.frontend.segment_features(y)
+        return self._fit_frames(features)
+    
+    def _fit_frames(self, features):
+        """Windows resized to the model's input; subclasses with a fixed n_frames crop or pad here"""
+        return features
+    
+    def iter_features(self, audio_path):
+        """Features of one file block by block, so at most block_seconds of audio is decoded at a time
+        
+        Windows equal those of features_from_signal on the whole file; peak normalization is skipped
+        since each window is scaled to its own maximum anyway.
+        """
+        stats = {}
+        blocks = pcm_blocks(audio_path, self.sample_rate, self.block_seconds, self.resample_engine, stats)
+        if self.hop_seconds is not None:
+            batches = self.frontend.stream_overlapping_windows(blocks, self.hop_seconds)
+        else:
+            batches = self.frontend.stream_segment_features(blocks)
+        for features in batches:
+            yield self._fit_frames(features)
+        if self.report_resampling:
+            print(describe_resampling(audio_path, stats))
+    
+    def _compute_features(self, audio_path):
+        try:
+            batches = list(self.iter_features(audio_path))
+            if not batches:
+                return self.features_from_signal(np.zeros(0, dtype=np.float32))
+            return np.concatenate(batches)
             
         except Exception as e:
             print(f"Error processing {audio_path}: {e}")
             return None
 
 class SoundPredictor:
-    def __init__(self, model_path):
-        self.model = tf.keras.models.load_model(model_path)
-        self.data_loader = UnderwaterDataLoader()
+    loader_class = UnderwaterDataLoader
+    default_model_path = 'underwater/model/best_model.h5'
+    default_confidence = 0.7
+    
+    def __init__(self, model_path, feature_store=None, resample_engine=DEFAULT_RESAMPLE_ENGINE, report_resampling=False,
+                 backend=DEFAULT_BACKEND, hop_seconds=None, merge_events=False, merge_gap=0.0, nms_iou=0.5):
+        self.model_path = model_path
+        self.backend = backend
+        self.merge_events = merge_events
+        self.merge_gap = merge_gap
+        self.nms_iou = nms_iou
+        self.model = load_model(model_path, backend)
+        self.data_loader = self.loader_class(
+            feature_store=feature_store, resample_engine=resample_engine, report_resampling=report_resampling,
+            hop_seconds=hop_seconds
+        )
         self.class_names = {
             0: "Background",
             1: "Vessel", 
@@ -63,24 +142,68 @@ class SoundPredictor:
             4: "Other Anthropogenic"
         }
     
-    def predict_audio(self, audio_path, confidence_threshold=0.7):
-        """Predict sounds in an audio file"""
+    def predict_audio(self, audio_path, confidence_threshold=None):
+        """Predict sounds in an audio file; None if it could not be decoded or featurized"""
+        if confidence_threshold is None:
+            confidence_threshold = self.default_confidence
+        if self.data_loader.feature_store is None:
+            predictions = self._stream_predictions(audio_path)
+            if predictions is None:
+                return None
+            return self._detections_from_predictions(predictions, confidence_threshold)
+        
         # Extract features
         features = self.data_loader.extract_features(audio_path)
         if features is None:
+            return None
+        if len(features) == 0:
             return []
         
         # Predict
         predictions = self.model.predict(features, verbose=0)
+        return self._detections_from_predictions(predictions, confidence_threshold)
+    
+    def _stream_predictions(self, audio_path):
+        """Class probabilities for every window, predicted block by block so the file's features never sit in memory
+        
+        None if the file could not be decoded or featurized.
+        """
+        predictions = []
+        try:
+            for features in self.data_loader.iter_features(audio_path):
+                predictions.append(self.model.predict(features, verbose=0))
+        except Exception as e:
+            print(f"Error processing {audio_path}: {e}")
+            return None
+        if not predictions:
+            return []
+        return np.concatenate(predictions)
+    
+    def _worker_kwargs(self):
+        """Constructor arguments that recreate this predictor in a worker process"""
+        return {
+            'feature_store': self.data_loader.feature_store,
+            'resample_engine': self.data_loader.resample_engine,
+            'report_resampling': self.data_loader.report_resampling,
+            'backend': self.backend,
+            'hop_seconds': self.data_loader.hop_seconds,
+            'merge_events': self.merge_events,
+            'merge_gap': self.merge_gap,
+            'nms_iou': self.nms_iou
+        }
+    
+    def _detections_from_predictions(self, predictions, confidence_threshold):
+        """Turn per-segment class probabilities into detection dicts"""
+        if self.merge_events:
+            return self._events_from_predictions(predictions, confidence_threshold)
         
-        # Process predictions
         results = []
         for i, pred in enumerate(predictions):
             class_id = np.argmax(pred)
             confidence = pred[class_id]
             
             if confidence > confidence_threshold and class_id != 0:  # Skip background
-                start_time = i * self.data_loader.segment_duration
+                start_time = i * self.data_loader.window_step()
                 end_time = start_time + self.data_loader.segment_duration
                 
                 results.append({
@@ -94,89 +217,184 @@ class SoundPredictor:
         
         return results
     
-    def predict_directory(self, input_dir, output_file, confidence_threshold=0.7):
-        """Predict sounds for all audio files in a directory"""
-        all_results = []
-        audio_files = []
+    def _events_from_predictions(self, predictions, confidence_threshold):
+        """One detection per merged event, with sub-second boundaries"""
+        segments = segment_arrays(
+            predictions, self.data_loader.window_step(), self.data_loader.segment_duration, confidence_threshold
+        )
+        events = aggregate_events(*segments, max_gap=self.merge_gap, nms_iou=self.nms_iou)
+        return events_to_dicts(*events, class_names=self.class_names)
+    
+    def ledger_params(self, confidence_threshold):
+        """Everything besides the model and the file that changes a file's detections"""
+        return {
+            "features": self.data_loader.feature_params(),
+            "backend": self.backend,
+            "confidence_threshold": confidence_threshold,
+            "merge_events": self.merge_events,
+            "merge_gap": self.merge_gap,
+            "nms_iou": self.nms_iou
+        }
+    
+    def open_ledger(self, ledger_path, confidence_threshold):
+        """PredictionLedger for this model and these parameters"""
+        return PredictionLedger.for_model(ledger_path, self.model_path, self.ledger_params(confidence_threshold))
+    
+    def predict_directory(self, input_dir, output_file, confidence_threshold=None, manifest=None, workers=1,
+                          pipeline=False, batch_size=256, store=None, ledger=None):
+        """Predict sounds for all audio files in a directory (or listed in a manifest)
         
-        # Find all WAV files
-        for root, dirs, files in os.walk(input_dir):
-            for file in files:
-                if file.endswith('.wav'):
-                    audio_path = os.path.join(root, file)
-                    audio_files.append(audio_path)
+        Each file's detections are journaled as soon as they are produced (journal_path_for(output_file))
+        and assembled into output_file at the end. With a PredictionLedger only new or changed files
+        are processed; the output merges them with the ledger's results and the previous output.
+        With a DetectionStore every journaled file is also written to the store. Files that fail to
+        decode are journaled with "failed": true and left out of the ledger, so the next incremental
+        run retries them. Returns {'audios': n, 'annotations': n, 'failed': n} for the written output.
+        """
+        if confidence_threshold is None:
+            confidence_threshold = self.default_confidence
+        
+        # Find all WAV files from their headers only; empty/unreadable files never reach the decoder
+        if manifest is None:
+            manifest = Manifest.for_directory(input_dir)
+        audio_files = manifest.paths()
+        for entry in manifest.unreadable():
+            print(f"Skipping {entry['path']}: {entry['error'] or 'no audio frames'}")
         
         print(f"Found {len(audio_files)} audio files for prediction")
         
-        # Process each file
-        for audio_id, audio_path in enumerate(audio_files, 1):
-            print(f"Processing {os.path.basename(audio_path)} ({audio_id}/{len(audio_files)})")
-            
-            detections = self.predict_audio(audio_path, confidence_threshold)
-            
-            # Add to results
-            for detection in detections:
-                detection['audio_id'] = audio_id
-                detection['file_path'] = audio_path
-                detection['file_name'] = os.path.basename(audio_path)
-                all_results.append(detection)
-        
-        # Save results
-        self._save_results(all_results, audio_files, output_file)
-        return all_results
-    
-    def _save_results(self, annotations, audio_files, output_file):
-        """Save results to JSON file"""
-        output_data = {
-            "info": {
-                "description": "Underwater Sound Detection Results",
-                "version": "1.0",
-                "generated_on": datetime.now().isoformat(),
-                "confidence_threshold": 0.7
-            },
-            "audios": [
-                {
-                    "id": i + 1,
-                    "file_name": os.path.basename(path),
-                    "file_path": path,
-                    "duration": self._get_audio_duration(path)
-                }
-                for i, path in enumerate(audio_files)
-            ],
-            "categories": [
-                {"id": 1, "name": "vessel"},
-                {"id": 2, "name": "marine_animal"},
-                {"id": 3, "name": "natural_sound"},
-                {"id": 4, "name": "other_anthropogenic"}
-            ],
-            "annotations": annotations
-        }
+        # Files already in the ledger, and files only in the previous output, keep their detections
+        pending_files = audio_files
+        previous = {}
+        if ledger is not None:
+            pending_files = ledger.pending(audio_files)
+            print(f"{len(audio_files) - len(pending_files)} files unchanged since they were last processed, "
+                  f"{len(pending_files)} to process")
+            previous = previous_results(output_file, set(audio_files))
+        audio_ids = {path: audio_id for audio_id, path in enumerate(sorted(audio_files + list(previous)), 1)}
+        
+        journal = self._open_journal(journal_path_for(output_file), confidence_threshold, store)
+        
+        failed = []
         
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        def journal_file(audio_path, detections, duration=None, failed=False):
+            audio_id = audio_ids[audio_path]
+            audio = {
+                "id": audio_id,
+                "file_name": os.path.basename(audio_path),
+                "file_path": audio_path,
+                "duration": self._get_audio_duration(audio_path, manifest) if duration is None else duration
+            }
+            if failed:
+                audio["failed"] = True
+            annotations = [
+                dict(detection, audio_id=audio_id, file_path=audio_path, file_name=os.path.basename(audio_path))
+                for detection in detections
+            ]
+            journal.write(audio, annotations)
         
+        def on_result(audio_path, detections):
+            # A failed file is not "no detections": keep it out of the ledger so it is retried
+            if detections is None:
+                failed.append(audio_path)
+                journal_file(audio_path, [], failed=True)
+                return
+            if ledger is not None:
+                ledger.record(audio_path, detections)
+            journal_file(audio_path, detections)
+        
+        # Fan files out to worker processes, longest first; the journal is assembled in audio_id order
+        with journal:
+            if workers > 1 and pipeline and pending_files:
+                # Workers only featurize; this process batches their segments through the model
+                print(f"Using {workers} featurizer processes, inference batch size {batch_size}")
+                results = InferencePipeline(self, workers, batch_size).run(pending_files, confidence_threshold, manifest)
+                for audio_path, detections in results:
+                    on_result(audio_path, detections)
+            elif workers > 1 and pending_files:
+                print(f"Using {workers} worker processes")
+                results = predict_files_parallel(
+                    type(self), self.model_path, pending_files, confidence_threshold, workers, manifest,
+                    predictor_kwargs=self._worker_kwargs()
+                )
+                for audio_path, detections in results:
+                    on_result(audio_path, detections)
+            else:
+                for file_id, audio_path in enumerate(pending_files, 1):
+                    print(f"Processing {os.path.basename(audio_path)} ({file_id}/{len(pending_files)})")
+                    on_result(audio_path, self.predict_audio(audio_path, confidence_threshold))
+            
+            if ledger is not None:
+                for audio_path, detections, duration in ledger.carried_over(audio_files, set(pending_files), previous):
+                    journal_file(audio_path, detections, duration)
+                ledger.compact()
+        
+        summary = assemble(journal.path, output_file)
+        summary['failed'] = len(failed)
+        if failed:
+            print(f"{len(failed)} files could not be processed and are marked as failed in the results")
         print(f"Results saved to {output_file}")
+        return summary
+    
+    def _open_journal(self, journal_path, confidence_threshold, store=None):
+        """AnnotationJournal carrying this run's info header and categories"""
+        info = {
+            "description": "Underwater Sound Detection Results",
+            "version": "1.0",
+            "generated_on": datetime.now().isoformat(),
+            "confidence_threshold": confidence_threshold
+        }
+        categories = [
+            {"id": 1, "name": "vessel"},
+            {"id": 2, "name": "marine_animal"},
+            {"id": 3, "name": "natural_sound"},
+            {"id": 4, "name": "other_anthropogenic"}
+        ]
+        return AnnotationJournal(journal_path, info, categories, store)
     
-    def _get_audio_duration(self, audio_path):
-        """Get duration of audio file"""
+    def _get_audio_duration(self, audio_path, manifest=None):
+        """Get duration of audio file from the manifest or the file header"""
+        if manifest is not None and manifest.duration(audio_path) is not None:
+            return manifest.duration(audio_path)
         try:
-            y, sr = librosa.load(audio_path, sr=None)
-            return len(y) / sr
+            info = sf.info(audio_path)
+            return info.frames / info.samplerate
         except:
             return 0
 
-def main():
+def main(predictor_class=SoundPredictor):
     """Main prediction function"""
     import argparse
     
     parser = argparse.ArgumentParser(description='Underwater Sound Prediction')
-    parser.add_argument('--input_dir', required=True, help='Input directory with audio files')
+    parser.add_argument('--input_dir', help='Input directory with audio files')
+    parser.add_argument('--manifest', help='Corpus manifest from ai_model/manifest.py (used instead of scanning input_dir)')
     parser.add_argument('--output_file', default='outputs/predictions.json', help='Output JSON file')
-    parser.add_argument('--model_path', default='underwater/model/best_model.h5', help='Path to trained model')
-    parser.add_argument('--confidence', type=float, default=0.7, help='Confidence threshold')
+    parser.add_argument('--model_path', default=predictor_class.default_model_path, help='Path to trained model')
+    parser.add_argument('--confidence', type=float, default=predictor_class.default_confidence, help='Confidence threshold')
+    parser.add_argument('--feature_store', help='Feature cache directory (reuses features across runs)')
+    parser.add_argument('--resample_engine', default=DEFAULT_RESAMPLE_ENGINE, choices=sorted(RESAMPLE_ENGINES),
+                        help='Resampler for files not already at 22050 Hz')
+    parser.add_argument('--report_resampling', action='store_true', help='Print resampling speed per file')
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, choices=BACKENDS,
+                        help='Inference backend (tflite expects a .tflite exported next to the model)')
+    parser.add_argument('--hop_seconds', '--hop-seconds', type=float,
+                        help='Overlapping windows every HOP seconds (default: back-to-back segments)')
+    parser.add_argument('--merge_events', action='store_true',
+                        help='Merge adjacent same-class segments into events and apply temporal NMS across classes')
+    parser.add_argument('--merge_gap', type=float, default=0.0, help='Largest gap in seconds bridged when merging')
+    parser.add_argument('--nms_iou', type=float, default=0.5, help='IoU above which overlapping events are suppressed')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    parser.add_argument('--pipeline', action='store_true', help='Workers only featurize; one consumer batches inference across files')
+    parser.add_argument('--batch_size', type=int, default=256, help='Inference batch size for --pipeline')
+    parser.add_argument('--detection_db', help='Also write detections to this SQLite detection store')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip files already processed with this model and parameters; merge into the existing output')
+    parser.add_argument('--ledger', help='Processed-file ledger for --incremental (default: <output_file>.ledger.jsonl)')
     
     args = parser.parse_args()
+    if not args.input_dir and not args.manifest:
+        parser.error('one of --input_dir or --manifest is required')
     
     print("Starting prediction...")
     
@@ -186,12 +404,31 @@ def main():
         print("Please train the model first or provide a valid model path")
         return
     
-    predictor = SoundPredictor(args.model_path)
-    results = predictor.predict_directory(args.input_dir, args.output_file, args.confidence)
+    manifest = Manifest.load(args.manifest) if args.manifest else None
+    feature_store = FeatureStore(args.feature_store, manifest=manifest) if args.feature_store else None
+    predictor = predictor_class(
+        args.model_path, feature_store=feature_store,
+        resample_engine=args.resample_engine, report_resampling=args.report_resampling,
+        backend=args.backend, hop_seconds=args.hop_seconds,
+        merge_events=args.merge_events, merge_gap=args.merge_gap, nms_iou=args.nms_iou
+    )
+    store = DetectionStore(args.detection_db) if args.detection_db else None
+    ledger = None
+    if args.incremental:
+        ledger = predictor.open_ledger(args.ledger or args.output_file + '.ledger.jsonl', args.confidence)
+    results = predictor.predict_directory(
+        args.input_dir, args.output_file, args.confidence, manifest=manifest, workers=args.workers,
+        pipeline=args.pipeline, batch_size=args.batch_size, ledger=ledger, store=store
+    )
+    if store is not None:
+        store.close()
+        print(f"Detections stored in {args.detection_db}")
     
     print(f"\nPrediction completed!")
-    print(f"Files processed: {len(set(r['audio_id'] for r in results)) if results else 0}")
-    print(f"Anomalies detected: {len(results)}")
+    print(f"Files in results: {results['audios']}")
+    print(f"Anomalies detected: {results['annotations']}")
+    if results['failed']:
+        print(f"Files failed: {results['failed']}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,272 @@
+# ai_model/results_analytics.py
+import os
+import sys
+import json
+import argparse
+from collections import Counter
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_model.annotation_journal import read_journal
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\r\n'
+
+class _Scanner:
+    """Incremental reader of one JSON document that decodes a single value at a time"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer stays around one value plus one chunk
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at the end of the file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the buffered JSON")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next value, reading more of the file while it is incomplete"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number that ends with the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+def _scan_events(f):
+    """('item', key, element) for elements of top-level arrays, ('value', key, value) for other top-level values"""
+    scanner = _Scanner(f)
+    scanner.expect('{')
+    while scanner.peek() not in ('}', ''):
+        key = scanner.value()
+        scanner.expect(':')
+        if scanner.peek() == '[':
+            scanner.expect('[')
+            while scanner.peek() != ']':
+                yield 'item', key, scanner.value()
+                if scanner.peek() == ',':
+                    scanner.expect(',')
+            scanner.expect(']')
+        else:
+            yield 'value', key, scanner.value()
+        if scanner.peek() == ',':
+            scanner.expect(',')
+
+def _ijson_events(f):
+    """_scan_events on top of ijson's C parser"""
+    import ijson
+    from ijson.common import ObjectBuilder
+
+    key = None
+    builder = None
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == item_prefix and event in ('end_map', 'end_array'):
+                yield kind, key, builder.value
+                builder = None
+            continue
+        if prefix == '':
+            if event == 'map_key':
+                key = value
+            continue
+        if prefix == key and event in ('start_array', 'end_array'):
+            continue
+
+        item_prefix = prefix
+        kind = 'item' if prefix == key + '.item' else 'value'
+        if event in ('start_map', 'start_array'):
+            builder = ObjectBuilder()
+            builder.event(event, value)
+        else:
+            yield kind, key, value
+
+def _event_source():
+    """(events function, file mode): ijson when installed, else the pure-Python scanner giving the same events"""
+    try:
+        import ijson
+    except ImportError:
+        return _scan_events, 'r'
+    return _ijson_events, 'rb'
+
+def iter_results(results_path):
+    """Stream ('category' | 'audio' | 'annotation' | 'info', record) from a results document or journal"""
+    if results_path.endswith('.jsonl'):
+        for _, record in read_journal(results_path):
+            if 'info' in record:
+                yield 'info', record['info']
+                for category in record.get('categories', []):
+                    yield 'category', category
+            else:
+                yield 'audio', record['audio']
+                for annotation in record['annotations']:
+                    yield 'annotation', annotation
+        return
+
+    kinds = {'audios': 'audio', 'annotations': 'annotation', 'categories': 'category'}
+    events, mode = _event_source()
+    with open(results_path, mode) as f:
+        for event, key, value in events(f):
+            if event == 'item' and key in kinds:
+                yield kinds[key], value
+            elif key == 'info':
+                yield 'info', value
+
+class ResultsSummary:
+    """Single-pass aggregates over one results file, in either output schema
+
+    Annotation-list outputs (audios + annotations with audio_id/category_id/score) and per-audio
+    outputs (audios carrying their own 'detections' of class/confidence) are both counted. Memory
+    grows with the number of files, for the per-file counts, never with the number of detections.
+    """
+
+    def __init__(self, bins=10):
+        self.bins = bins
+        self.histogram = [0] * bins
+        self.categories = {}
+        self.files = {}
+        self.file_counts = Counter()
+        self.class_counts = Counter()
+        self.detections = 0
+        self.schemas = set()
+
+    def add_detection(self, audio_key, category, score):
+        self.detections += 1
+        self.file_counts[audio_key] += 1
+        self.class_counts[category] += 1
+        if score is not None:
+            self.histogram[min(self.bins - 1, max(0, int(float(score) * self.bins)))] += 1
+
+    def add(self, kind, record):
+        if kind == 'category':
+            self.categories[record['id']] = record['name']
+        elif kind == 'annotation':
+            self.schemas.add('annotations')
+            self.add_detection(record.get('audio_id'), record.get('category_id'), record.get('score'))
+        elif kind == 'audio':
+            audio_key = record.get('id', len(self.files) + 1)
+            self.files[audio_key] = record.get('file_name') or record.get('filename') or record.get('file_path') or str(audio_key)
+            detections = record.get('detections')
+            if detections is None:
+                detections = record.get('anomalies')
+            if isinstance(detections, list):
+                self.schemas.add('per-audio detections')
+                for detection in detections:
+                    category = detection.get('class', detection.get('category_id'))
+                    self.add_detection(audio_key, category, detection.get('confidence', detection.get('score')))
+
+    def class_name(self, category):
+        return self.categories.get(category, category)
+
+    def as_dict(self, top=10):
+        files_with = sum(1 for audio_key in self.files if self.file_counts[audio_key])
+        return {
+            'schemas': sorted(self.schemas),
+            'files': len(self.files),
+            'files_with_detections': files_with,
+            'files_without_detections': len(self.files) - files_with,
+            'detections': self.detections,
+            'by_class': {str(self.class_name(c)): n for c, n in self.class_counts.most_common()},
+            'top_files': [
+                {'file': self.files.get(audio_key, str(audio_key)), 'detections': n}
+                for audio_key, n in self.file_counts.most_common(top)
+            ],
+            'confidence_histogram': [
+                {'from': i / self.bins, 'to': (i + 1) / self.bins, 'count': n} for i, n in enumerate(self.histogram)
+            ]
+        }
+
+def summarize(results_path, bins=10):
+    """ResultsSummary of a results document or journal, read in one streaming pass"""
+    summary = ResultsSummary(bins)
+    for kind, record in iter_results(results_path):
+        summary.add(kind, record)
+    return summary
+
+def print_summary(results_path, summary, top=10):
+    report = summary.as_dict(top)
+    print(f"\n=== {results_path} ===")
+    print(f"  Schema: {', '.join(report['schemas']) or 'no detections recorded'}")
+    print(f"  Files processed: {report['files']}")
+    print(f"  Files with detections: {report['files_with_detections']}")
+    print(f"  Files without detections: {report['files_without_detections']}")
+    print(f"  Total detections: {report['detections']}")
+
+    if report['by_class']:
+        print('  Detections by class:')
+        for class_name, count in report['by_class'].items():
+            print(f"    {class_name}: {count} ({100.0 * count / report['detections']:.1f}%)")
+    else:
+        print('  No detections found')
+
+    if report['top_files']:
+        print(f"  Top {len(report['top_files'])} files by detections:")
+        for entry in report['top_files']:
+            print(f"    {entry['file']}: {entry['detections']}")
+
+    if report['detections']:
+        print('  Confidence histogram:')
+        peak = max(summary.histogram) or 1
+        for entry in report['confidence_histogram']:
+            bar = '#' * round(40 * entry['count'] / peak)
+            print(f"    {entry['from']:.2f}-{entry['to']:.2f} {entry['count']:>8} {bar}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stream prediction results and report detection statistics')
+    parser.add_argument('results', nargs='+', help='Results JSON documents or .jsonl journals')
+    parser.add_argument('--bins', type=int, default=10, help='Confidence histogram bins over [0, 1]')
+    parser.add_argument('--top', type=int, default=10, help='Files listed by detection count')
+    parser.add_argument('--json', help='Also write the aggregates of every file to this JSON file')
+    args = parser.parse_args(argv)
+
+    reports = {}
+    for results_path in args.results:
+        if not os.path.exists(results_path):
+            print(f"\n{results_path}: File not found")
+            continue
+        try:
+            summary = summarize(results_path, args.bins)
+        except Exception as e:
+            print(f"\n{results_path}: Could not parse results: {e}")
+            continue
+        print_summary(results_path, summary, args.top)
+        reports[results_path] = summary.as_dict(args.top)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nAggregates saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
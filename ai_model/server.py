@@ -0,0 +1,260 @@
+# ai_model/server.py
+import os
+import sys
+import json
+import time
+import queue
+import base64
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_model.audio_source import DEFAULT_RESAMPLE_ENGINE, RESAMPLE_ENGINES, resample
+from ai_model.backends import BACKENDS, DEFAULT_BACKEND
+from ai_model.feature_store import FeatureStore
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+class MicroBatcher:
+    """Coalesces feature batches from concurrent requests into one model.predict call
+
+    A batch is run as soon as max_batch segments are waiting or the oldest request has waited
+    max_latency seconds, whichever comes first. Only the batcher thread touches the model.
+    """
+
+    def __init__(self, model, max_batch=256, max_latency=0.01):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.requests = queue.Queue()
+        self.batches_run = 0
+        self.segments_run = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """Block until the predictions for features (one row per segment) are ready"""
+        request = {'features': features, 'done': threading.Event(), 'result': None, 'error': None}
+        self.requests.put(request)
+        request['done'].wait()
+        if request['error'] is not None:
+            raise request['error']
+        return request['result']
+
+    def close(self):
+        self.requests.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self.requests.get()
+            if first is None:
+                return
+            pending = [first]
+            segments = len(first['features'])
+            deadline = time.monotonic() + self.max_latency
+
+            while segments < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.requests.put(None)  # finish this batch, then stop
+                    break
+                pending.append(request)
+                segments += len(request['features'])
+
+            self._predict(pending)
+
+    def _predict(self, pending):
+        try:
+            batch = np.concatenate([request['features'] for request in pending])
+            predictions = self.model.predict(batch, batch_size=self.max_batch, verbose=0)
+            self.batches_run += 1
+            self.segments_run += len(batch)
+
+            start = 0
+            for request in pending:
+                request['result'] = predictions[start:start + len(request['features'])]
+                start += len(request['features'])
+        except Exception as e:
+            for request in pending:
+                request['error'] = e
+        finally:
+            for request in pending:
+                request['done'].set()
+
+class InferenceServer:
+    """Keeps one predictor loaded and answers predict requests over localhost HTTP"""
+
+    def __init__(self, predictor, host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch=256, max_latency=0.01):
+        self.predictor = predictor
+        self.batcher = MicroBatcher(predictor.model, max_batch, max_latency)
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def predict_path(self, audio_path, confidence_threshold=0.7):
+        """Same detections as SoundPredictor.predict_audio(audio_path), None if the file could not be read"""
+        features = self.predictor.data_loader.extract_features(audio_path)
+        if features is None:
+            return None
+        return self._detections(features, confidence_threshold)
+
+    def predict_pcm(self, y, sample_rate, confidence_threshold=0.7):
+        """Detections for raw mono float32 PCM at sample_rate"""
+        data_loader = self.predictor.data_loader
+        y = resample(np.asarray(y, dtype=np.float32), sample_rate, data_loader.sample_rate, data_loader.resample_engine)
+        return self._detections(data_loader.features_from_signal(y), confidence_threshold)
+
+    def _detections(self, features, confidence_threshold):
+        if len(features) == 0:
+            return []
+        predictions = self.batcher.submit(features)
+        return self.predictor._detections_from_predictions(predictions, confidence_threshold)
+
+    def handle(self, request):
+        """Dispatch one decoded JSON request body"""
+        confidence_threshold = float(request.get('confidence_threshold', 0.7))
+        if 'audio_path' in request:
+            return self.predict_path(request['audio_path'], confidence_threshold)
+        if 'pcm' in request:
+            y = np.frombuffer(base64.b64decode(request['pcm']), dtype='<f4')
+            return self.predict_pcm(y, int(request['sample_rate']), confidence_threshold)
+        raise ValueError("request needs 'audio_path' or 'pcm' + 'sample_rate'")
+
+    def stats(self):
+        return {
+            'model_path': self.predictor.model_path,
+            'backend': self.predictor.backend,
+            'batches': self.batcher.batches_run,
+            'segments': self.batcher.segments_run
+        }
+
+    def serve_forever(self):
+        print(f"Serving {self.predictor.model_path} ({self.predictor.backend}) on {self.url}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("Shutting down")
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.httpd.server_close()
+        self.batcher.close()
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, server.stats())
+            else:
+                self._reply(404, {'error': f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._reply(404, {'error': f"unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                self._reply(200, {'detections': server.handle(request)})
+            except (ValueError, KeyError) as e:
+                self._reply(400, {'error': str(e)})
+            except Exception as e:
+                self._reply(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            pass  # one line per request would swamp the console at thousands of jobs per hour
+
+    return Handler
+
+class InferenceClient:
+    """predict_audio-compatible client for a running InferenceServer"""
+
+    def __init__(self, url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout=300):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _post(self, body):
+        request = urllib.request.Request(
+            self.url + '/predict', data=json.dumps(body).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())['detections']
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(json.loads(e.read()).get('error', str(e)))
+
+    def predict_audio(self, audio_path, confidence_threshold=0.7):
+        """Predict sounds in an audio file the server can read"""
+        return self._post({'audio_path': os.path.abspath(audio_path), 'confidence_threshold': confidence_threshold})
+
+    def predict_pcm(self, y, sample_rate, confidence_threshold=0.7):
+        """Predict sounds in raw mono PCM"""
+        pcm = base64.b64encode(np.asarray(y, dtype='<f4').tobytes()).decode('ascii')
+        return self._post({'pcm': pcm, 'sample_rate': sample_rate, 'confidence_threshold': confidence_threshold})
+
+    def health(self):
+        with urllib.request.urlopen(self.url + '/health', timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+def main():
+    parser = argparse.ArgumentParser(description='Resident underwater sound inference server')
+    parser.add_argument('--model_path', default='underwater/model/best_model.h5', help='Path to trained model')
+    parser.add_argument('--fixed', action='store_true', help='Use the 44-frame predictor from predict_fixed.py')
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, choices=BACKENDS, help='Inference backend')
+    parser.add_argument('--feature_store', help='Feature cache directory (reuses features across requests)')
+    parser.add_argument('--resample_engine', default=DEFAULT_RESAMPLE_ENGINE, choices=sorted(RESAMPLE_ENGINES),
+                        help='Resampler for inputs not already at 22050 Hz')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Bind address (localhost only by default)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--max_batch', type=int, default=256, help='Most segments per micro-batch')
+    parser.add_argument('--max_latency_ms', type=float, default=10.0,
+                        help='Longest a request waits for others to join its batch')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model_path):
+        print(f"Model not found at {args.model_path}")
+        return
+
+    if args.fixed:
+        from ai_model.predict_fixed import SoundPredictor
+    else:
+        from ai_model.predict import SoundPredictor
+
+    feature_store = FeatureStore(args.feature_store) if args.feature_store else None
+    predictor = SoundPredictor(
+        args.model_path, feature_store=feature_store, resample_engine=args.resample_engine, backend=args.backend
+    )
+    server = InferenceServer(predictor, args.host, args.port, args.max_batch, args.max_latency_ms / 1000.0)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
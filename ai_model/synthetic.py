@@ -0,0 +1,353 @@
+# ai_model/synthetic.py
+import os
+import sys
+import json
+import wave
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_model.mel_frontend import get_mel_frontend
+
+SAMPLE_RATE = 22050
+SHARD_INDEX = "index.jsonl"
+BATCH_SAMPLES = 1 << 22  # audio samples synthesized per work unit (~16 MB of float32)
+
+# Recipe components: each takes (rng, t, lengths, sample_rate) for a batch of clips sharing the time
+# base t and returns a (n_clips, len(t)) array that the recipe sums. t is float64 so the phase of a
+# 12 kHz tone is still accurate ten seconds in.
+
+def _tone(freq_range, partials):
+    """One random base frequency per clip and its partials, given as [(multiple, amplitude)]"""
+    def component(rng, t, lengths, sample_rate):
+        base = rng.uniform(freq_range[0], freq_range[1], size=(len(lengths), 1))
+        phase = 2 * np.pi * base * t
+        return sum(amplitude * np.sin(multiple * phase) for multiple, amplitude in partials)
+    return component
+
+def _fm_tone(freq_range, amplitude, depth, rate):
+    """Tone whose frequency swings by depth Hz at rate Hz"""
+    def component(rng, t, lengths, sample_rate):
+        base = rng.uniform(freq_range[0], freq_range[1], size=(len(lengths), 1))
+        return amplitude * np.sin(2 * np.pi * (base + depth * np.sin(2 * np.pi * rate * t)) * t)
+    return component
+
+def _am_tone(freq_range, amplitude, depth, rate):
+    """Tone with its amplitude modulated by depth at rate Hz"""
+    def component(rng, t, lengths, sample_rate):
+        base = rng.uniform(freq_range[0], freq_range[1], size=(len(lengths), 1))
+        return amplitude * np.sin(2 * np.pi * base * t) * (1 + depth * np.sin(2 * np.pi * rate * t))
+    return component
+
+def _noise(amplitude):
+    def component(rng, t, lengths, sample_rate):
+        return amplitude * rng.standard_normal((len(lengths), len(t)), dtype=np.float32)
+    return component
+
+def _scatter(shape, starts, duration, lengths, values):
+    """Add values (n, count, duration) at starts (n, count) into a zero (n, T) array, all clicks at once
+
+    Events that would run past their own clip's end are dropped, and overlapping events add up.
+    """
+    audio = np.zeros(shape, dtype=np.float32)
+    valid = starts + duration < lengths[:, None]
+    index = np.minimum(starts[..., None] + np.arange(duration), shape[1] - 1)
+    rows = np.broadcast_to(np.arange(shape[0])[:, None, None], index.shape)
+    np.add.at(audio, (rows, index), np.where(valid[..., None], values, 0))
+    return audio
+
+def _clicks(count, seconds, amplitude):
+    """count rectangular clicks of the given length at uniformly random positions in each clip"""
+    def component(rng, t, lengths, sample_rate):
+        duration = int(seconds * sample_rate)
+        starts = (rng.random((len(lengths), count)) * lengths[:, None]).astype(np.int64)
+        return _scatter((len(lengths), len(t)), starts, duration, lengths, np.float32(amplitude))
+    return component
+
+def _pings(count, seconds, freq_range, amplitude, first=0.0):
+    """count tone bursts, each with its own random frequency, at evenly spaced fractions of each clip"""
+    def component(rng, t, lengths, sample_rate):
+        duration = int(seconds * sample_rate)
+        fractions = first + np.arange(count) / count
+        starts = (fractions[None, :] * lengths[:, None]).astype(np.int64)
+        freqs = rng.uniform(freq_range[0], freq_range[1], size=(len(lengths), count, 1))
+        times = t[np.minimum(starts[..., None] + np.arange(duration), len(t) - 1)]
+        values = (amplitude * np.sin(2 * np.pi * freqs * times)).astype(np.float32)
+        return _scatter((len(lengths), len(t)), starts, duration, lengths, values)
+    return component
+
+RECIPES = {
+    # Sound types without a signal model are background noise only
+    'silence': [],
+
+    # DOSITS categories (create_complete_dosits.py)
+    'humpback_whale': [_tone((100, 300), [(1, 0.7), (2, 0.3)])],
+    'dolphin': [_tone((8000, 12000), [(1, 0.6)]), _clicks(5, 0.02, 0.8)],
+    'grunting_fish': [_tone((200, 600), [(1, 0.5)])],
+    'clicking_fish': [_clicks(8, 0.01, 0.7)],
+    'waves': [_tone((0.1, 0.5), [(1, 0.4)])],
+    'rain': [_noise(0.3)],
+    'ship_engine': [_tone((80, 200), [(1, 0.8)])],
+    'sonar': [_pings(8, 0.1, (5000, 10000), 0.6)],
+    'snapping_shrimp': [_clicks(15, 0.005, 0.9)],
+    'ocean_background': [_tone((0.5, 2.0), [(1, 0.05)]), _tone((200, 500), [(1, 0.02)])],
+
+    # Humpback vocalizations (create_whale_sounds.py)
+    'moan': [_tone((100, 300), [(1, 0.7), (2, 0.3), (3, 0.1)])],
+    'song': [_fm_tone((200, 800), 0.6, depth=25, rate=2)],
+    'click': [_pings(1, 0.1, (2000, 6000), 0.8, first=0.3)],
+    'grunt': [_am_tone((400, 1000), 0.5, depth=0.3, rate=5)],
+    'ocean_noise': [_tone((0.1, 0.5), [(1, 0.03)]), _tone((200, 800), [(1, 0.01)])],
+
+    # Fixed-frequency class prototypes (train_fixed.py, train_model.create_sample_data)
+    'vessel': [_tone((100, 100), [(1, 0.7), (2, 0.3)])],
+    'marine': [_tone((8000, 8000), [(1, 0.6), (1.5, 0.2)])],
+    'natural': [_tone((0.5, 0.5), [(1, 0.5), (4, 0.3)])],
+    'anthropogenic': [_tone((300, 300), [(1, 0.8), (2, 0.4)])],
+    'vessel_tone': [_tone((100, 100), [(1, 0.7)])],
+    'marine_tone': [_tone((8000, 8000), [(1, 0.6)])],
+    'natural_tone': [_tone((0.5, 0.5), [(1, 0.5)])],
+    'anthropogenic_tone': [_tone((300, 300), [(1, 0.8)])]
+}
+
+def sound(name, folder, class_id, count, duration, recipe=None, noise=0.1, pattern='{name}_{i:02d}.wav', first=1):
+    """One sound type of a corpus: count clips of recipe (default: name) plus background noise
+
+    duration is seconds or a (min, max) range drawn per clip; files are named by pattern with i
+    counting from first.
+    """
+    return {
+        'name': name, 'folder': folder, 'class_id': class_id, 'count': count, 'duration': duration,
+        'recipe': recipe or name, 'noise': noise, 'pattern': pattern, 'first': first
+    }
+
+_DOSITS_SUBTYPES = {
+    'marine_mammals': (['humpback_whale', 'dolphin', 'orca', 'seal'], 2),                         # Marine Animal
+    'fish': (['grunting_fish', 'clicking_fish', 'drumming_fish'], 2),                             # Marine Animal
+    'natural_sounds': (['waves', 'rain', 'underwater_earthquake', 'ice_cracking'], 3),            # Natural Sound
+    'anthropogenic': (['ship_engine', 'sonar', 'dredging', 'construction'], 4),                   # Anthropogenic
+    'invertebrates': (['snapping_shrimp', 'urchin', 'crab'], 2)                                   # Marine Animal
+}
+
+# Root-relative corpora reproducing the original one-clip-at-a-time generator scripts
+CORPORA = {
+    'dosits': [
+        sound(subtype, category, class_id, 5, (3.0, 8.0), subtype if subtype in RECIPES else 'silence')
+        for category, (subtypes, class_id) in _DOSITS_SUBTYPES.items() for subtype in subtypes
+    ] + [sound('ocean_background', 'background', 0, 20, (5.0, 10.0))],
+    'whales': [
+        sound('moan', 'synthetic_whales', 2, 10, 3.0, pattern='humpback_{name}_{i:02d}.wav'),
+        sound('song', 'synthetic_whales', 2, 8, 5.0, pattern='humpback_{name}_{i:02d}.wav'),
+        sound('click', 'synthetic_whales', 2, 15, 0.5, pattern='humpback_{name}_{i:02d}.wav'),
+        sound('grunt', 'synthetic_whales', 2, 12, 1.5, pattern='humpback_{name}_{i:02d}.wav'),
+        sound('ocean_noise', 'synthetic_background', 0, 20, (4.0, 8.0), noise=0.05)
+    ],
+    'classes': [
+        sound('background', '', 0, 100, 2.0, recipe='silence'),
+        sound('vessel', '', 1, 200, 2.0),
+        sound('marine', '', 2, 200, 2.0),
+        sound('natural', '', 3, 200, 2.0),
+        sound('anthropogenic', '', 4, 200, 2.0)
+    ],
+    'sample': [
+        sound(label, '', class_id, 5, 3.0, recipe=f'{label}_tone', pattern='{name}_{i}.wav', first=5 * (class_id - 1))
+        for label, class_id in [('vessel', 1), ('marine', 2), ('natural', 3), ('anthropogenic', 4)]
+    ]
+}
+
+def scaled(specs, scale):
+    """Same corpus with every count multiplied by scale (e.g. 900 turns the 110-clip DOSITS set into ~100k)"""
+    return [dict(spec, count=max(1, int(round(spec['count'] * scale)))) for spec in specs]
+
+def synthesize(spec, rng, count, sample_rate=SAMPLE_RATE):
+    """(audio, lengths) for count clips of one sound type as one zero-padded (count, max_length) batch
+
+    All clips share one time base; each is peak-normalized over its own length.
+    """
+    low, high = spec['duration'] if isinstance(spec['duration'], (tuple, list)) else (spec['duration'],) * 2
+    lengths = (rng.uniform(low, high, size=count) * sample_rate).astype(np.int64)
+    t = np.arange(lengths.max()) / sample_rate
+
+    audio = np.zeros((count, len(t)), dtype=np.float32)
+    for component in RECIPES[spec['recipe']]:
+        audio += component(rng, t, lengths, sample_rate)
+    if spec['noise']:
+        audio += _noise(spec['noise'])(rng, t, lengths, sample_rate)
+
+    audio[np.arange(len(t))[None, :] >= lengths[:, None]] = 0
+    audio /= np.maximum(np.abs(audio).max(axis=1, keepdims=True), 1e-12)
+    return audio, lengths
+
+def clip_features_batch(audio, lengths, n_frames=44, frontend=None):
+    """clip_features for a padded batch: whole-clip log-mel (ref=max) cropped or zero-padded to n_frames"""
+    frontend = frontend or get_mel_frontend()
+    log_mel = frontend.log_mel(audio)
+    if log_mel.shape[2] < n_frames:
+        log_mel = np.pad(log_mel, ((0, 0), (0, 0), (0, n_frames - log_mel.shape[2])), 'constant')
+    log_mel = log_mel[:, :, :n_frames]
+
+    # Frames past a clip's own end are padding in clip_features, not silence
+    own_frames = 1 + lengths // frontend.hop_length
+    log_mel = np.where(np.arange(n_frames) >= own_frames[:, None, None], np.float32(0), log_mel)
+    return log_mel[..., np.newaxis]
+
+def write_wav(path, audio, sample_rate=SAMPLE_RATE):
+    """16-bit mono WAV, as the original generator scripts wrote"""
+    with wave.open(path, 'w') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes((audio * 32767).astype(np.int16).tobytes())
+
+def _generate_unit(unit):
+    """Synthesize one work unit (a slice of one sound type) and write or return it"""
+    spec = unit['spec']
+    rng = np.random.default_rng(unit['seed'])
+    audio, lengths = synthesize(spec, rng, unit['count'], unit['sample_rate'])
+    folder = os.path.join(unit['output_dir'], spec['folder']) if unit['output_dir'] else None
+
+    if unit['output'] == 'wav':
+        paths = []
+        for offset in range(unit['count']):
+            name = spec['pattern'].format(name=spec['name'], i=spec['first'] + unit['start'] + offset)
+            path = os.path.join(folder, name)
+            write_wav(path, audio[offset, :lengths[offset]], unit['sample_rate'])
+            paths.append(path)
+        return {'paths': paths}
+
+    features = clip_features_batch(audio, lengths, unit['n_frames'], get_mel_frontend(unit['sample_rate']))
+    if unit['output'] == 'memory':
+        return {'features': features}
+
+    shard = os.path.join(folder, f"{spec['name']}_{unit['start']:07d}.npy")
+    np.save(shard, features)
+    return {'entry': {'shard': os.path.relpath(shard, unit['output_dir']), 'name': spec['name'],
+                      'class_id': spec['class_id'], 'count': unit['count']}}
+
+def work_units(specs, seed=None, sample_rate=SAMPLE_RATE):
+    """Cut each sound type into batches of about BATCH_SAMPLES audio samples, each with its own seed
+
+    Seeds come from one SeedSequence, so a given seed produces the same corpus for any worker count.
+    """
+    units = []
+    for spec_index, spec in enumerate(specs):
+        longest = max(spec['duration']) if isinstance(spec['duration'], (tuple, list)) else spec['duration']
+        per_unit = max(1, BATCH_SAMPLES // int(longest * sample_rate))
+        for start in range(0, spec['count'], per_unit):
+            units.append({'spec': spec, 'spec_index': spec_index, 'start': start,
+                          'count': min(per_unit, spec['count'] - start)})
+    for unit, child in zip(units, np.random.SeedSequence(seed).spawn(len(units))):
+        unit['seed'] = child
+    return units
+
+class ProgressPrinter:
+    """Default progress callback: a line each time another 10% of the clips is done, then the rate"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.reported = 0
+
+    def __call__(self, done, total):
+        if done * 10 // total > self.reported * 10 // total or done == total:
+            print(f"Generated {done}/{total} clips...")
+            self.reported = done
+        if done == total:
+            seconds = time.perf_counter() - self.start
+            print(f"{total} clips in {seconds:.1f}s ({total / max(seconds, 1e-9):.0f} clips/s)")
+
+def generate_corpus(specs, output_dir=None, output='wav', workers=None, seed=None, n_frames=44,
+                    sample_rate=SAMPLE_RATE, progress=None):
+    """Synthesize a corpus across worker processes
+
+    output='wav' writes one WAV per clip and returns the paths; 'features' writes one clip-feature
+    shard per work unit plus index.jsonl and returns the index entries; 'memory' returns (X, y).
+    Results are in spec order whatever order the workers finish in. progress(done, total) defaults
+    to a ProgressPrinter.
+    """
+    if output not in ('wav', 'features', 'memory'):
+        raise ValueError(f"Unknown output '{output}', expected wav, features or memory")
+    if output != 'memory':
+        for folder in sorted({spec['folder'] for spec in specs}):
+            os.makedirs(os.path.join(output_dir, folder), exist_ok=True)
+
+    units = work_units(specs, seed, sample_rate)
+    for unit in units:
+        unit.update(output=output, output_dir=output_dir if output != 'memory' else None,
+                    n_frames=n_frames, sample_rate=sample_rate)
+
+    progress = progress or ProgressPrinter()
+    total = sum(unit['count'] for unit in units)
+    results = [None] * len(units)
+    done = 0
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(units) == 1:
+        for i, unit in enumerate(units):
+            results[i] = _generate_unit(unit)
+            done += units[i]['count']
+            progress(done, total)
+    else:
+        context = mp.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(units)), mp_context=context) as pool:
+            futures = {pool.submit(_generate_unit, unit): i for i, unit in enumerate(units)}
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                done += units[i]['count']
+                progress(done, total)
+
+    if output == 'wav':
+        return [path for result in results for path in result['paths']]
+    if output == 'memory':
+        X = np.concatenate([result['features'] for result in results])
+        y = np.concatenate([np.full(unit['count'], unit['spec']['class_id']) for unit in units])
+        return X, y
+
+    entries = [result['entry'] for result in results]
+    with open(os.path.join(output_dir, SHARD_INDEX), 'w') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+    return entries
+
+def load_feature_shards(root):
+    """(X, y) from a features corpus; X is a concatenation of the memory-mapped shards"""
+    with open(os.path.join(root, SHARD_INDEX)) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if not entries:
+        return np.zeros((0, 128, 44, 1), dtype=np.float32), np.zeros(0, dtype=int)
+    X = np.concatenate([np.load(os.path.join(root, entry['shard']), mmap_mode='r') for entry in entries])
+    y = np.concatenate([np.full(entry['count'], entry['class_id']) for entry in entries])
+    return X, y
+
+def add_generator_arguments(parser, output_dir):
+    parser.add_argument('--output_dir', default=output_dir, help='Corpus root directory')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every per-type clip count')
+    parser.add_argument('--features', action='store_true',
+                        help='Write clip-feature shards (index.jsonl) instead of WAV files')
+    parser.add_argument('--n_frames', type=int, default=44, help='Frames per clip feature (with --features)')
+    parser.add_argument('--workers', type=int, help='Generator processes (default: one per CPU)')
+    parser.add_argument('--seed', type=int, help='Corpus seed (default: fresh randomness)')
+
+def generate_from_args(corpus, args):
+    """Run generate_corpus for a CORPORA entry with add_generator_arguments' options"""
+    return generate_corpus(
+        scaled(CORPORA[corpus], args.scale), args.output_dir, 'features' if args.features else 'wav',
+        args.workers, args.seed, args.n_frames
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic underwater sound corpus')
+    parser.add_argument('corpus', choices=sorted(CORPORA), help='Which corpus to generate')
+    add_generator_arguments(parser, 'data/synthetic_corpus')
+    args = parser.parse_args()
+
+    results = generate_from_args(args.corpus, args)
+    kind = 'feature shards' if args.features else 'files'
+    print(f"\n✅ Created {len(results)} {kind} in {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# ai_model/synthetic_stream.py
+import os
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+import tensorflow as tf
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_model.mel_frontend import get_mel_frontend
+from ai_model.synthetic import CORPORA, SAMPLE_RATE, synthesize, clip_features_batch
+
+TRAIN_STREAM = 0
+VALIDATION_STREAM = 1
+
+class SyntheticStream:
+    """Class-conditional synthetic clips generated on the fly inside tf.data map workers
+
+    Every batch is a pure function of (seed, stream, epoch, step): sound types are drawn in
+    proportion to their corpus counts, synthesized and featurized in parallel map calls, and nothing
+    is stored. With reseeding each epoch sees new clips; a validation stream repeats the same ones.
+    An augment.Augmenter augments training clips as waveforms and masks their features, from the
+    batch's own generator, so augmented batches stay reproducible.
+    """
+
+    def __init__(self, specs=None, n_frames=44, batch_size=32, seed=42, sample_rate=SAMPLE_RATE,
+                 num_parallel_calls=None, n_mels=128, augmenter=None):
+        self.specs = specs if specs is not None else CORPORA['classes']
+        self.n_frames = n_frames
+        self.batch_size = batch_size
+        self.seed = seed
+        self.sample_rate = sample_rate
+        self.num_parallel_calls = num_parallel_calls or os.cpu_count() or 1
+        self.input_shape = (n_mels, n_frames, 1)
+        self.frontend = get_mel_frontend(sample_rate, n_mels=n_mels)
+        self.augmenter = augmenter
+
+        counts = np.array([spec['count'] for spec in self.specs], dtype=float)
+        self.weights = counts / counts.sum()
+        self.class_ids = np.array([spec['class_id'] for spec in self.specs], dtype=np.int32)
+
+        # Generation statistics, updated from the map workers
+        self._lock = threading.Lock()
+        self.clips_generated = 0
+        self.generation_seconds = 0.0
+
+    @property
+    def num_classes(self):
+        return int(self.class_ids.max()) + 1
+
+    def generate_batch(self, stream, epoch, step):
+        """(features, labels) for one batch; the same arguments always give the same batch"""
+        start = time.perf_counter()
+        rng = np.random.default_rng([self.seed, int(stream), int(epoch), int(step)])
+        choice = rng.choice(len(self.specs), size=self.batch_size, p=self.weights)
+
+        augmenter = self.augmenter if stream == TRAIN_STREAM else None
+        features = np.empty((self.batch_size,) + self.input_shape, dtype=np.float32)
+        for spec_index in np.unique(choice):
+            rows = np.flatnonzero(choice == spec_index)
+            audio, lengths = synthesize(self.specs[spec_index], rng, len(rows), self.sample_rate)
+            if augmenter is not None:
+                audio = augmenter.augment_waveforms(audio, lengths, rng)
+            features[rows] = clip_features_batch(audio, lengths, self.n_frames, self.frontend)
+        if augmenter is not None:
+            features = augmenter.mask_features(features, rng)
+
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.clips_generated += self.batch_size
+            self.generation_seconds += seconds
+        return features, self.class_ids[choice]
+
+    def _map(self, stream, epoch, step):
+        features, labels = tf.numpy_function(
+            self.generate_batch, [stream, epoch, step], (tf.float32, tf.int32), stateful=False
+        )
+        features.set_shape((self.batch_size,) + self.input_shape)
+        labels.set_shape((self.batch_size,))
+        return features, labels
+
+    def dataset(self, steps_per_epoch, reseed=True):
+        """Infinite training dataset for fit(steps_per_epoch=...); epoch n reads seed (seed, n)
+
+        With reseed=False every epoch replays epoch 0's batches (a fixed virtual dataset).
+        """
+        def batch_at(step):
+            epoch = step // steps_per_epoch if reseed else tf.constant(0, tf.int64)
+            return self._map(tf.constant(TRAIN_STREAM, tf.int64), epoch, step % steps_per_epoch)
+
+        return (tf.data.Dataset.counter()
+                .map(batch_at, num_parallel_calls=self.num_parallel_calls, deterministic=True)
+                .prefetch(tf.data.AUTOTUNE))
+
+    def validation_dataset(self, steps):
+        """Finite dataset of the same steps batches on every pass, independent of the training stream"""
+        def batch_at(step):
+            return self._map(tf.constant(VALIDATION_STREAM, tf.int64), tf.constant(0, tf.int64), step)
+
+        return (tf.data.Dataset.range(steps)
+                .map(batch_at, num_parallel_calls=self.num_parallel_calls, deterministic=True)
+                .prefetch(tf.data.AUTOTUNE))
+
+    def stats(self):
+        """(clips generated so far, summed worker seconds spent generating them)"""
+        with self._lock:
+            return self.clips_generated, self.generation_seconds
+
+    def benchmark(self, batches=20, steps_per_epoch=1000):
+        """Clips per second the pipeline delivers on its own, with no trainer attached"""
+        iterator = iter(self.dataset(steps_per_epoch))
+        next(iterator)  # pipeline start-up is not throughput
+        start = time.perf_counter()
+        for _ in range(batches):
+            next(iterator)
+        rate = batches * self.batch_size / (time.perf_counter() - start)
+        print(f"[stream] {rate:.0f} clips/s with {self.num_parallel_calls} parallel calls "
+              f"({self.per_call_rate():.0f} clips/s per call)")
+        return rate
+
+    def per_call_rate(self):
+        clips, seconds = self.stats()
+        return clips / seconds if seconds else 0.0
+
+class StreamMonitor(tf.keras.callbacks.Callback):
+    """Per-epoch report of how fast the stream generates clips against how fast the model consumes them
+
+    If the generation capacity (per-call rate x parallel calls) is not clearly above the training
+    rate the trainer is waiting on data: raise num_parallel_calls or shrink the clips.
+    """
+
+    def __init__(self, stream, steps_per_epoch):
+        super().__init__()
+        self.stream = stream
+        self.steps_per_epoch = steps_per_epoch
+        self._start = None
+        self._stats = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+        self._stats = self.stream.stats()
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._start
+        clips, busy = self.stream.stats()
+        clips, busy = clips - self._stats[0], busy - self._stats[1]
+
+        consumed = self.steps_per_epoch * self.stream.batch_size / seconds
+        per_call = clips / busy if busy else 0.0
+        capacity = per_call * self.stream.num_parallel_calls
+        print(f"[stream] epoch {epoch + 1}: generated {clips} clips at {per_call:.0f} clips/s per call "
+              f"(capacity ~{capacity:.0f} clips/s with {self.stream.num_parallel_calls} calls), "
+              f"trainer consumed {consumed:.0f} clips/s")
+        if capacity and capacity < 1.2 * consumed:
+            print("[stream] generation is close to the training rate; the trainer is likely waiting on data")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the on-the-fly synthetic training stream')
+    parser.add_argument('--corpus', default='classes', choices=sorted(CORPORA), help='Sound types to stream')
+    parser.add_argument('--n_frames', type=int, default=44, help='Frames per clip feature')
+    parser.add_argument('--batch_size', type=int, default=32)
+    parser.add_argument('--parallel_calls', type=int, help='tf.data map parallelism (default: one per CPU)')
+    parser.add_argument('--batches', type=int, default=20, help='Batches to time')
+    args = parser.parse_args()
+
+    stream = SyntheticStream(CORPORA[args.corpus], args.n_frames, args.batch_size,
+                             num_parallel_calls=args.parallel_calls)
+    stream.benchmark(args.batches)
+
+if __name__ == "__main__":
+    main()
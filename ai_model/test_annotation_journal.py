@@ -0,0 +1,51 @@
+# ai_model/test_annotation_journal.py
+import json
+import pytest
+
+from ai_model.annotation_journal import AnnotationJournal, journal_path_for, read_journal, assemble
+
+INFO = {'description': 'test'}
+CATEGORIES = [{'id': 1, 'name': 'vessel'}]
+
+def audio(audio_id, name):
+    return {'id': audio_id, 'file_name': name, 'file_path': '/data/' + name, 'duration': 10.0}
+
+def annotation(audio_id, score):
+    return {'audio_id': audio_id, 'category_id': 1, 'start_time': 0.0, 'end_time': 1.0, 'score': score}
+
+def test_journal_path_for():
+    assert journal_path_for('outputs/predictions.json') == 'outputs/predictions.jsonl'
+
+def test_assemble_orders_by_audio_id_and_keeps_last_entry(tmp_path):
+    journal_path = str(tmp_path / 'out.jsonl')
+    with AnnotationJournal(journal_path, INFO, CATEGORIES) as journal:
+        journal.write(audio(3, 'c.wav'), [annotation(3, 0.9)])
+        journal.write(audio(1, 'a.wav'), [annotation(1, 0.8), annotation(1, 0.7)])
+        journal.write(audio(2, 'b.wav'), [])
+        journal.write(audio(3, 'c.wav'), [annotation(3, 0.5), annotation(3, 0.6)])
+
+    output_path = str(tmp_path / 'out.json')
+    assert assemble(journal_path, output_path) == {'audios': 3, 'annotations': 4}
+    with open(output_path) as f:
+        document = json.load(f)
+    assert document['info'] == INFO
+    assert document['categories'] == CATEGORIES
+    assert [a['id'] for a in document['audios']] == [1, 2, 3]
+    assert [a['score'] for a in document['annotations']] == [0.8, 0.7, 0.5, 0.6]
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    journal_path = str(tmp_path / 'out.jsonl')
+    with AnnotationJournal(journal_path, INFO, CATEGORIES) as journal:
+        journal.write(audio(1, 'a.wav'), [annotation(1, 0.8)])
+    with open(journal_path, 'a') as f:
+        f.write('{"audio": {"id": 2, "file_na')
+
+    assert len(list(read_journal(journal_path))) == 2
+    assert assemble(journal_path, str(tmp_path / 'out.json')) == {'audios': 1, 'annotations': 1}
+
+def test_assemble_requires_header(tmp_path):
+    journal_path = str(tmp_path / 'out.jsonl')
+    with open(journal_path, 'w') as f:
+        f.write(json.dumps({'audio': audio(1, 'a.wav'), 'annotations': []}) + '\n')
+    with pytest.raises(ValueError):
+        assemble(journal_path, str(tmp_path / 'out.json'))
@@ -0,0 +1,52 @@
+# ai_model/test_detection_store.py
+import numpy as np
+import pytest
+
+from ai_model.detection_store import DetectionStore
+
+def random_annotations(rng, n):
+    starts = rng.uniform(0, 100, n).round(3)
+    durations = rng.exponential(2.0, n).round(3) + 0.01
+    return [
+        {'start_time': float(s), 'end_time': float(s + d), 'category_id': int(c), 'score': float(p)}
+        for s, d, c, p in zip(starts, durations, rng.integers(1, 5, n), rng.uniform(0, 1, n))
+    ]
+
+@pytest.fixture
+def store(tmp_path):
+    with DetectionStore(str(tmp_path / 'detections.db')) as store:
+        yield store
+
+def test_overlapping_matches_brute_force(store):
+    rng = np.random.default_rng(0)
+    by_audio = {}
+    for i in range(5):
+        annotations = random_annotations(rng, 200)
+        by_audio[store.add_file({'file_path': f'/data/{i}.wav', 'duration': 100.0}, annotations)] = annotations
+
+    for t0, t1 in [(0.0, 1.0), (10.0, 10.5), (42.0, 60.0), (99.0, 120.0), (-5.0, 0.0)]:
+        for audio_id, category_id in [(None, None), (2, None), (None, 3)]:
+            expected = sorted(
+                (a_id, a['start_time'], a['end_time']) for a_id, annotations in by_audio.items()
+                for a in annotations
+                if a['start_time'] < t1 and a['end_time'] > t0 and audio_id in (None, a_id)
+                and category_id in (None, a['category_id'])
+            )
+            found = [(d['audio_id'], d['start_time'], d['end_time'])
+                     for d in store.overlapping(t0, t1, audio_id, category_id)]
+            assert sorted(found) == expected
+
+def test_rewriting_a_file_replaces_its_detections(store):
+    store.set_categories([{'id': 1, 'name': 'vessel'}, {'id': 2, 'name': 'marine_animal'}])
+    detection = {'start_time': 0.0, 'end_time': 1.0}
+    store.add_file({'file_path': '/data/a.wav'}, [dict(detection, category_id=1, score=0.9)] * 3)
+    store.add_file({'file_path': '/data/b.wav'}, [dict(detection, category_id=2, score=0.4)])
+    store.add_file({'file_path': '/data/a.wav'}, [dict(detection, category_id=2, score=0.8)])
+    store.add_file({'file_path': '/data/c.wav'}, [])
+
+    assert store.class_counts() == [(2, 'marine_animal', 2)]
+    assert store.class_counts(min_score=0.5) == [(2, 'marine_animal', 1)]
+    assert store.totals() == {'audios': 3, 'detections': 2, 'files_with_detections': 2}
+    summaries = store.file_summaries(with_detections=True)
+    assert [(s['file_name'], s['detection_count'], s['max_score']) for s in summaries] == [
+        ('a.wav', 1, 0.8), ('b.wav', 1, 0.4)]
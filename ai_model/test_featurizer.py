@@ -0,0 +1,48 @@
+# ai_model/test_featurizer.py
+import os
+import numpy as np
+import soundfile as sf
+
+from ai_model.featurizer import featurize_files, store_features
+from ai_model.feature_store import FeatureStore
+from ai_model.train_model import UnderwaterDataLoader
+from ai_model.tf_dataset import SegmentIndex
+
+def write_tone(path, seconds, sample_rate=22050, frequency=440.0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    sf.write(path, (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32), sample_rate)
+
+def test_featurize_files_sorted_and_skips_errors(tmp_path):
+    paths = []
+    for name, size in [('c', 3), ('a', 1), ('b', 2)]:
+        path = str(tmp_path / name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        paths.append(path)
+    missing = str(tmp_path / 'missing')
+
+    results = featurize_files(paths + [missing], os.path.getsize, workers=2, chunk_size=1, progress=None)
+    assert results == [(str(tmp_path / 'a'), 1), (str(tmp_path / 'b'), 2), (str(tmp_path / 'c'), 3)]
+
+def test_store_features_returns_shard_and_shape(tmp_path):
+    path = str(tmp_path / 'vessel' / 'a.wav')
+    write_tone(path, 5.0)
+    loader = UnderwaterDataLoader(feature_store=FeatureStore(str(tmp_path / 'store')))
+
+    shard_path, shape = store_features(loader, path)
+    assert shard_path == loader.feature_store.shard_for(path, loader.feature_params())
+    assert np.load(shard_path).shape == shape
+    assert shape[0] == 3  # the last partial segment is padded
+
+def test_segment_index_from_loader_reads_written_shards(tmp_path):
+    write_tone(str(tmp_path / 'data' / 'vessel' / 'a.wav'), 7.0)
+    write_tone(str(tmp_path / 'data' / 'whale' / 'b.wav'), 3.0, frequency=880.0)
+    loader = UnderwaterDataLoader(feature_store=FeatureStore(str(tmp_path / 'store')))
+
+    index = SegmentIndex.from_loader(loader, str(tmp_path / 'data'), workers=1)
+    assert len(index) == 4 + 2
+    assert index.labels.tolist() == [1, 1, 1, 1, 2, 2]
+    assert index.input_shape == (loader.n_mels, 87, 1)
+    expected = loader.extract_features(str(tmp_path / 'data' / 'whale' / 'b.wav'))
+    assert np.array_equal(index._read_chunk(1, np.array([0])), expected[:1])
@@ -0,0 +1,81 @@
+# ai_model/test_ledger.py
+import os
+import json
+
+from ai_model.ledger import PredictionLedger, previous_results
+from ai_model.annotation_journal import AnnotationJournal
+
+PARAMS = {'confidence_threshold': 0.7}
+
+def write_file(path, content=b'audio'):
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+def test_is_current_tracks_file_model_and_params(tmp_path):
+    audio = write_file(str(tmp_path / 'a.wav'))
+    ledger_path = str(tmp_path / 'ledger.jsonl')
+    ledger = PredictionLedger(ledger_path, 'model-1', PARAMS)
+    assert not ledger.is_current(audio)
+    ledger.record(audio, [{'score': 0.9}])
+
+    assert PredictionLedger(ledger_path, 'model-1', PARAMS).is_current(audio)
+    assert not PredictionLedger(ledger_path, 'model-2', PARAMS).is_current(audio)
+    assert not PredictionLedger(ledger_path, 'model-1', {'confidence_threshold': 0.5}).is_current(audio)
+
+    write_file(audio, b'changed audio')
+    assert not PredictionLedger(ledger_path, 'model-1', PARAMS).is_current(audio)
+    os.remove(audio)
+    assert not PredictionLedger(ledger_path, 'model-1', PARAMS).is_current(audio)
+
+def test_pending_and_truncated_line(tmp_path):
+    paths = [write_file(str(tmp_path / name)) for name in ['c.wav', 'a.wav', 'b.wav']]
+    ledger_path = str(tmp_path / 'ledger.jsonl')
+    ledger = PredictionLedger(ledger_path, 'model', PARAMS)
+    ledger.record(paths[1], [])
+    with open(ledger_path, 'a') as f:
+        f.write('{"path": "' + paths[0])
+
+    reloaded = PredictionLedger(ledger_path, 'model', PARAMS)
+    assert len(reloaded) == 1
+    assert reloaded.pending(paths) == [paths[0], paths[2]]
+
+def test_compact_keeps_latest_line_per_file(tmp_path):
+    audio = write_file(str(tmp_path / 'a.wav'))
+    ledger_path = str(tmp_path / 'ledger.jsonl')
+    ledger = PredictionLedger(ledger_path, 'model', PARAMS)
+    ledger.record(audio, [{'score': 0.1}])
+    ledger.record(audio, [{'score': 0.2}])
+    ledger.compact()
+
+    with open(ledger_path) as f:
+        lines = f.readlines()
+    assert len(lines) == 1
+    assert PredictionLedger(ledger_path, 'model', PARAMS).detections(audio) == [{'score': 0.2}]
+
+def test_carried_over_and_previous_results(tmp_path):
+    kept, redone = write_file(str(tmp_path / 'kept.wav')), write_file(str(tmp_path / 'redone.wav'))
+    ledger = PredictionLedger(str(tmp_path / 'ledger.jsonl'), 'model', PARAMS)
+    ledger.record(kept, [{'score': 0.8}])
+    ledger.record(redone, [{'score': 0.3}])
+
+    output_file = str(tmp_path / 'out.json')
+    with AnnotationJournal(str(tmp_path / 'out.jsonl'), {}, []) as journal:
+        journal.write({'file_path': kept, 'duration': 1.0}, [])
+        journal.write({'file_path': 'gone.wav', 'duration': 2.0}, [{'score': 0.6}])
+    previous = previous_results(output_file, {kept, redone})
+    assert previous == {'gone.wav': {'duration': 2.0, 'annotations': [{'score': 0.6}]}}
+
+    assert list(ledger.carried_over([kept, redone], {redone}, previous)) == [
+        (kept, [{'score': 0.8}], None), ('gone.wav', [{'score': 0.6}], 2.0)]
+
+def test_previous_results_from_output_without_journal(tmp_path):
+    output_file = str(tmp_path / 'out.json')
+    with open(output_file, 'w') as f:
+        json.dump({
+            'audios': [{'file_path': 'a.wav', 'duration': 3.0}, {'file_path': 'b.wav', 'duration': 1.0}],
+            'annotations': [{'file_path': 'a.wav', 'score': 0.9}, {'file_path': 'b.wav', 'score': 0.4}]
+        }, f)
+    assert previous_results(output_file, {'b.wav'}) == {
+        'a.wav': {'duration': 3.0, 'annotations': [{'file_path': 'a.wav', 'score': 0.9}]}}
+    assert previous_results(str(tmp_path / 'missing.json'), set()) == {}
@@ -0,0 +1,78 @@
+# ai_model/test_main.py
+import numpy as np
+import pytest
+import soundfile as sf
+import tensorflow as tf
+
+from main import UnderwaterSoundAnalyzer
+from ai_model.mel_frontend import _hz_to_mel, _mel_to_hz
+
+def band_classifier(n_mels, n_frames, n_bands=4, scale=0.5, margin=10.0):
+    """Class k > 0 when the peak of mel band k - 1 stands out from the other bands, background otherwise"""
+    model = tf.keras.Sequential([
+        tf.keras.Input((n_mels, n_frames, 1)),
+        tf.keras.layers.MaxPooling2D((n_mels // n_bands, n_frames)),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(n_bands + 1, activation='softmax')
+    ])
+    weights = np.zeros((n_bands, n_bands + 1), dtype=np.float32)
+    weights[:, 1:] = scale * (np.eye(n_bands) - 1.0 / n_bands)
+    bias = np.zeros(n_bands + 1, dtype=np.float32)
+    bias[0] = scale * margin
+    model.layers[-1].set_weights([weights, bias])
+    return model
+
+def band_centre(analyzer, band, n_bands=4):
+    """Frequency at the middle mel of one band of the filterbank"""
+    mel = np.linspace(0, _hz_to_mel([analyzer.sample_rate / 2.0])[0], analyzer.n_mels + 2)
+    return _mel_to_hz(mel[[1 + (2 * band + 1) * analyzer.n_mels // (2 * n_bands)]])[0]
+
+@pytest.fixture
+def analyzer():
+    analyzer = UnderwaterSoundAnalyzer(confidence_threshold=0.5)
+    analyzer.model = band_classifier(analyzer.n_mels, analyzer.segment_frames)
+    return analyzer
+
+def synthetic_signal(analyzer):
+    # Tones in bands 0, 1 and 3, a noise-only segment, and a partial last segment that gets zero-padded
+    sr = analyzer.sample_rate
+    rng = np.random.default_rng(0)
+    parts = []
+    for band, seconds in [(0, 2.0), (1, 2.0), (None, 2.0), (3, 1.3)]:
+        t = np.arange(int(seconds * sr)) / sr
+        part = 0.02 * rng.standard_normal(len(t))
+        if band is not None:
+            part += 0.5 * np.sin(2 * np.pi * band_centre(analyzer, band) * t)
+        parts.append(part)
+    return np.concatenate(parts).astype(np.float32)
+
+def test_batched_features_match_per_segment(analyzer):
+    y = synthetic_signal(analyzer)
+    per_segment = []
+    for start in range(0, len(y), analyzer.segment_samples):
+        segment = y[start:start + analyzer.segment_samples]
+        per_segment.append(analyzer.extract_features(np.pad(segment, (0, analyzer.segment_samples - len(segment)))))
+    per_segment = np.stack(per_segment)
+    batched = analyzer.extract_features_batch(y)
+
+    assert batched.shape == per_segment.shape
+    np.testing.assert_allclose(batched, per_segment, atol=1e-3)
+
+def assert_same_detections(detections, expected):
+    assert [{k: v for k, v in d.items() if k != 'score'} for d in detections] == \
+        [{k: v for k, v in d.items() if k != 'score'} for d in expected]
+    assert [d['score'] for d in detections] == pytest.approx([d['score'] for d in expected], abs=1e-4)
+
+def test_batched_and_streaming_detections_match_per_segment(tmp_path, analyzer):
+    audio_path = str(tmp_path / 'synthetic.wav')
+    sf.write(audio_path, synthetic_signal(analyzer), analyzer.sample_rate, subtype='FLOAT')
+
+    per_segment = analyzer.detect_anomalies(audio_path)
+    assert [d['category_id'] for d in per_segment] == [1, 2, 4]
+
+    analyzer.batched = True
+    assert_same_detections(analyzer.detect_anomalies(audio_path), per_segment)
+
+    # Blocks that end mid-segment
+    analyzer.block_seconds = 0.7
+    assert_same_detections(list(analyzer.stream_detections(audio_path)), per_segment)
@@ -0,0 +1,44 @@
+# ai_model/test_manifest.py
+import os
+import numpy as np
+import soundfile as sf
+
+from ai_model.manifest import Manifest, MANIFEST_FILENAME
+
+def write_wav(path, seconds, sample_rate=8000):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    sf.write(path, np.zeros(int(seconds * sample_rate), dtype=np.float32), sample_rate)
+
+def test_for_directory_rescans_a_saved_manifest(tmp_path):
+    root = str(tmp_path)
+    write_wav(os.path.join(root, 'a.wav'), 1.0)
+    write_wav(os.path.join(root, 'b.wav'), 1.0)
+    Manifest.scan(root, hash_content=False).save(os.path.join(root, MANIFEST_FILENAME))
+
+    os.remove(os.path.join(root, 'b.wav'))
+    write_wav(os.path.join(root, 'c.wav'), 2.0)
+    write_wav(os.path.join(root, 'a.wav'), 3.0)
+    os.utime(os.path.join(root, 'a.wav'), (1, 1))
+
+    manifest = Manifest.for_directory(root)
+    assert manifest.paths() == [os.path.join(root, 'a.wav'), os.path.join(root, 'c.wav')]
+    assert manifest.duration(os.path.join(root, 'a.wav')) == 3.0
+    assert manifest.duration(os.path.join(root, 'c.wav')) == 2.0
+
+def test_for_directory_reuses_unchanged_entries(tmp_path):
+    root = str(tmp_path)
+    write_wav(os.path.join(root, 'a.wav'), 1.0)
+    saved = Manifest.scan(root, hash_content=False)
+    saved.entries[0]['duration'] = 42.0
+    saved.save(os.path.join(root, MANIFEST_FILENAME))
+
+    assert Manifest.for_directory(root).duration(os.path.join(root, 'a.wav')) == 42.0
+
+def test_for_directory_applies_recursive_to_a_saved_manifest(tmp_path):
+    root = str(tmp_path)
+    write_wav(os.path.join(root, 'a.wav'), 1.0)
+    write_wav(os.path.join(root, 'sub', 'b.wav'), 1.0)
+    Manifest.scan(root, hash_content=False).save(os.path.join(root, MANIFEST_FILENAME))
+
+    assert len(Manifest.for_directory(root).paths()) == 2
+    assert Manifest.for_directory(root, recursive=False).paths() == [os.path.join(root, 'a.wav')]
@@ -0,0 +1,35 @@
+# ai_model/test_mel_frontend.py
+import json
+import numpy as np
+import librosa
+
+from ai_model.mel_frontend import MelFrontend, mel_filterbank, get_config_frontend, load_frontend_config
+
+def test_mel_filterbank_matches_librosa():
+    expected = librosa.filters.mel(sr=22050, n_fft=2048, n_mels=128)
+    np.testing.assert_allclose(mel_filterbank(22050, 2048, 128), expected, atol=1e-6)
+
+def test_segment_features_match_librosa():
+    frontend = MelFrontend()
+    y = np.random.default_rng(0).standard_normal(3 * frontend.segment_samples + 1000).astype(np.float32)
+    features = frontend.segment_features(y)
+    assert features.shape == (4, 128, 87, 1)
+
+    padded = np.pad(y, (0, 4 * frontend.segment_samples - len(y)))
+    for i, segment in enumerate(padded.reshape(4, frontend.segment_samples)):
+        mel = librosa.feature.melspectrogram(y=segment, sr=22050, n_fft=2048, hop_length=512, n_mels=128, pad_mode='constant')
+        expected = librosa.power_to_db(mel, ref=np.max, top_db=80)
+        np.testing.assert_allclose(features[i, :, :, 0], expected, atol=1e-3)
+
+def test_config_frontend_follows_config_file(tmp_path):
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps({'model_config': {
+        'input_sample_rate': 16000, 'fft_size': 1024, 'hop_length': 256, 'n_mels': 64, 'segment_duration': 1.0
+    }}))
+    assert load_frontend_config(str(config_path))['n_fft'] == 1024
+
+    frontend = get_config_frontend(str(config_path))
+    assert (frontend.sample_rate, frontend.n_fft, frontend.hop_length, frontend.n_mels) == (16000, 1024, 256, 64)
+    assert frontend.segment_frames == 1 + 16000 // 256
+    assert get_config_frontend(str(config_path), n_mels=32).n_mels == 32
+    assert MelFrontend.from_config(str(config_path)).mel_basis.shape == (64, 513)
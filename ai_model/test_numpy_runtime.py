@@ -0,0 +1,42 @@
+# ai_model/test_numpy_runtime.py
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from ai_model.numpy_runtime import NumpyModel, export_weights
+from ai_model.training_engine import ARCHITECTURES, CLIP_SHAPE, build_classifier
+
+def randomize_batchnorm(model, rng):
+    """Non-trivial BN statistics, so folding is actually exercised"""
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.layers.BatchNormalization):
+            gamma, beta, mean, var = layer.get_weights()
+            layer.set_weights([
+                rng.uniform(0.5, 1.5, gamma.shape).astype(np.float32),
+                rng.normal(0, 0.1, beta.shape).astype(np.float32),
+                rng.normal(0, 0.1, mean.shape).astype(np.float32),
+                rng.uniform(0.5, 1.5, var.shape).astype(np.float32)
+            ])
+
+@pytest.mark.parametrize('architecture', sorted(ARCHITECTURES))
+def test_numpy_runtime_matches_keras(tmp_path, architecture):
+    rng = np.random.default_rng(0)
+    tf.keras.utils.set_random_seed(0)
+    model = build_classifier(architecture, 5)
+    randomize_batchnorm(model, rng)
+    model_path = str(tmp_path / 'model.h5')
+    model.save(model_path)
+
+    features = rng.uniform(-80, 0, (7,) + CLIP_SHAPE).astype(np.float32)
+    expected = model.predict(features, verbose=0)
+    runtime = NumpyModel(export_weights(model_path))
+    predictions = runtime.predict(features, batch_size=3)
+
+    assert predictions.shape == expected.shape
+    np.testing.assert_allclose(predictions, expected, atol=1e-5)
+
+def test_numpy_runtime_predict_on_no_windows(tmp_path):
+    model_path = str(tmp_path / 'model.h5')
+    build_classifier('simple', 5).save(model_path)
+    runtime = NumpyModel(export_weights(model_path))
+    assert runtime.predict(np.zeros((0,) + CLIP_SHAPE, dtype=np.float32)).shape == (0, 5)
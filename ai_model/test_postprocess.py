@@ -0,0 +1,69 @@
+# ai_model/test_postprocess.py
+import numpy as np
+import pytest
+
+from ai_model.postprocess import merge_events, temporal_nms, merge_segments
+
+def dense_nms(starts, ends, scores, iou_threshold):
+    """Reference greedy NMS over the full pairwise IoU matrix"""
+    inter = np.clip(np.minimum(ends[:, None], ends[None, :]) - np.maximum(starts[:, None], starts[None, :]), 0, None)
+    durations = ends - starts
+    iou = inter / np.maximum(durations[:, None] + durations[None, :] - inter, 1e-9)
+    suppressed = np.zeros(len(starts), dtype=bool)
+    keep = []
+    for i in np.argsort(-scores, kind='stable'):
+        if not suppressed[i]:
+            keep.append(i)
+            suppressed |= iou[i] > iou_threshold
+    keep = np.array(keep, dtype=int)
+    return keep[np.argsort(starts[keep], kind='stable')]
+
+@pytest.mark.parametrize('iou_threshold', [0.0, 0.3, 0.5, 0.9])
+@pytest.mark.parametrize('seed', range(20))
+def test_temporal_nms_matches_dense(seed, iou_threshold):
+    rng = np.random.default_rng(seed)
+    n = 200
+    if seed % 2:
+        # Grid-aligned windows with tied scores
+        starts = rng.integers(0, 100, n) * 0.5
+        ends = starts + rng.integers(1, 6, n) * 0.5
+        scores = rng.integers(0, 4, n) / 4.0
+    else:
+        starts = rng.uniform(0, 300, n)
+        ends = starts + rng.exponential(3.0, n) + 0.01
+        scores = rng.uniform(0, 1, n)
+    expected = dense_nms(starts, ends, scores, iou_threshold)
+    assert temporal_nms(starts, ends, scores, iou_threshold).tolist() == expected.tolist()
+
+def test_temporal_nms_empty():
+    assert len(temporal_nms(np.zeros(0), np.zeros(0), np.zeros(0))) == 0
+
+def test_merge_events_joins_same_class_runs():
+    starts = np.array([0.0, 1.0, 2.5, 10.0, 1.5])
+    ends = starts + 1.0
+    scores = np.array([0.6, 0.9, 0.7, 0.8, 0.95])
+    classes = np.array([1, 1, 1, 1, 2])
+
+    starts_out, ends_out, scores_out, classes_out, counts = merge_events(starts, ends, scores, classes)
+    assert starts_out.tolist() == [0.0, 2.5, 10.0, 1.5]
+    assert ends_out.tolist() == [2.0, 3.5, 11.0, 2.5]
+    assert scores_out.tolist() == [0.9, 0.7, 0.8, 0.95]
+    assert classes_out.tolist() == [1, 1, 1, 2]
+    assert counts.tolist() == [2, 1, 1, 1]
+
+    starts_out, ends_out, _, _, counts = merge_events(starts, ends, scores, classes, max_gap=0.5)
+    assert starts_out.tolist() == [0.0, 10.0, 1.5]
+    assert ends_out.tolist() == [3.5, 11.0, 2.5]
+    assert counts.tolist() == [3, 1, 1]
+
+def test_merge_segments_suppresses_overlapping_classes():
+    segments = [
+        {'start_time': 0.0, 'end_time': 2.0, 'score': 0.9, 'category_id': 1},
+        {'start_time': 1.0, 'end_time': 3.0, 'score': 0.8, 'category_id': 1},
+        {'start_time': 0.5, 'end_time': 2.5, 'score': 0.7, 'category_id': 2},
+        {'start_time': 5.0, 'end_time': 7.0, 'score': 0.6, 'category_id': 2}
+    ]
+    events = merge_segments(segments, class_names=['bg', 'vessel', 'marine'])
+    assert [(e['start_time'], e['end_time'], e['category_name'], e['n_segments']) for e in events] == [
+        (0.0, 3.0, 'vessel', 2), (5.0, 7.0, 'marine', 1)]
+    assert merge_segments(segments, nms_iou=None)[1]['category_id'] == 2
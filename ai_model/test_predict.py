@@ -0,0 +1,74 @@
+# ai_model/test_predict.py
+import os
+import json
+import numpy as np
+import pytest
+import soundfile as sf
+
+from ai_model.predict import SoundPredictor, UnderwaterDataLoader
+from ai_model.feature_store import FeatureStore
+from ai_model.training_engine import build_classifier
+
+def write_tone(path, seconds, frequency, sample_rate=22050):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    sf.write(path, (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32), sample_rate)
+    return path
+
+@pytest.fixture(scope='module')
+def model_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('model') / 'model.h5')
+    build_classifier('simple', 5, (128, 87, 1)).save(path)
+    return path
+
+@pytest.mark.parametrize('with_store', [False, True])
+def test_predict_audio_returns_none_for_unreadable_file(tmp_path, model_path, with_store):
+    feature_store = FeatureStore(str(tmp_path / 'store')) if with_store else None
+    predictor = SoundPredictor(model_path, feature_store=feature_store)
+    assert predictor.predict_audio(str(tmp_path / 'missing.wav'), 0.0) is None
+    assert predictor.predict_audio(write_tone(str(tmp_path / 'a.wav'), 3.0, 440.0), 0.0) is not None
+
+def test_failed_file_is_retried_on_next_incremental_run(tmp_path, model_path, monkeypatch):
+    input_dir = str(tmp_path / 'in')
+    paths = [write_tone(os.path.join(input_dir, name), 3.0, frequency)
+             for name, frequency in [('a.wav', 300.0), ('b.wav', 600.0), ('c.wav', 900.0)]]
+    output_file = str(tmp_path / 'out' / 'predictions.json')
+    ledger_path = output_file + '.ledger.jsonl'
+    predictor = SoundPredictor(model_path)
+
+    iter_features = UnderwaterDataLoader.iter_features
+    def flaky(self, audio_path):
+        if audio_path == paths[1]:
+            raise OSError("transient read error")
+        return iter_features(self, audio_path)
+    monkeypatch.setattr(UnderwaterDataLoader, 'iter_features', flaky)
+
+    ledger = predictor.open_ledger(ledger_path, 0.0)
+    summary = predictor.predict_directory(input_dir, output_file, 0.0, ledger=ledger)
+    assert summary['failed'] == 1
+    with open(output_file) as f:
+        audios = {audio['file_path']: audio for audio in json.load(f)['audios']}
+    assert audios[paths[1]]['failed'] is True
+    assert 'failed' not in audios[paths[0]] and 'failed' not in audios[paths[2]]
+    assert predictor.open_ledger(ledger_path, 0.0).pending(paths) == [paths[1]]
+
+    monkeypatch.undo()
+    processed = []
+    predict_audio = SoundPredictor.predict_audio
+    def counting(self, audio_path, confidence_threshold=None):
+        processed.append(audio_path)
+        return predict_audio(self, audio_path, confidence_threshold)
+    monkeypatch.setattr(SoundPredictor, 'predict_audio', counting)
+
+    ledger = predictor.open_ledger(ledger_path, 0.0)
+    summary = predictor.predict_directory(input_dir, output_file, 0.0, ledger=ledger)
+    assert processed == [paths[1]]
+    assert summary['failed'] == 0
+    with open(output_file) as f:
+        document = json.load(f)
+    assert not any(audio.get('failed') for audio in document['audios'])
+    assert [a for a in document['annotations'] if a['file_path'] == paths[1]] == [
+        dict(detection, audio_id=2, file_path=paths[1], file_name='b.wav')
+        for detection in predict_audio(predictor, paths[1], 0.0)
+    ]
+    assert predictor.open_ledger(ledger_path, 0.0).pending(paths) == []
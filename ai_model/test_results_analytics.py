@@ -0,0 +1,92 @@
+# ai_model/test_results_analytics.py
+import io
+import json
+import pytest
+
+from ai_model import results_analytics
+from ai_model.results_analytics import _scan_events, _ijson_events, summarize, main
+from ai_model.annotation_journal import AnnotationJournal, assemble
+
+DOCUMENT = {
+    'info': {'description': 'test', 'confidence_threshold': 0.5},
+    'audios': [{'id': 1, 'file_name': 'a.wav'}, {'id': 2, 'file_name': 'b.wav'}, {'id': 3, 'file_name': 'c.wav'}],
+    'categories': [{'id': 1, 'name': 'vessel'}, {'id': 2, 'name': 'marine_animal'}],
+    'annotations': [
+        {'audio_id': 1, 'category_id': 1, 'score': 0.95, 'start_time': 0.0, 'end_time': 2.5},
+        {'audio_id': 1, 'category_id': 2, 'score': 0.55, 'start_time': 3.0, 'end_time': 1e3},
+        {'audio_id': 3, 'category_id': 1, 'score': 0.72, 'start_time': -1.5e-3, 'end_time': 12345678901234}
+    ],
+    'empty': [],
+    'note': 'unicode é "quoted" \\ text',
+    'flag': None
+}
+
+PER_AUDIO = {
+    'audios': [
+        {'filename': 'x.wav', 'detections': [{'class': 'Vessel', 'confidence': 0.9},
+                                              {'class': 'Vessel', 'confidence': 0.31}]},
+        {'filename': 'y.wav', 'anomalies': [{'class': 'Marine Animal', 'confidence': 1.0}]},
+        {'filename': 'z.wav', 'detections': []}
+    ]
+}
+
+def expected_events(document):
+    for key, value in document.items():
+        if isinstance(value, list):
+            for item in value:
+                yield 'item', key, item
+        else:
+            yield 'value', key, value
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1 << 16])
+@pytest.mark.parametrize('document', [DOCUMENT, PER_AUDIO])
+def test_scan_events_match_json(monkeypatch, document, chunk_size):
+    monkeypatch.setattr(results_analytics, 'CHUNK_SIZE', chunk_size)
+    for text in [json.dumps(document), json.dumps(document, indent=2), json.dumps(document, separators=(',', ':'))]:
+        assert list(_scan_events(io.StringIO(text))) == list(expected_events(document))
+
+@pytest.mark.parametrize('document', [DOCUMENT, PER_AUDIO])
+def test_scan_events_match_ijson(document):
+    pytest.importorskip('ijson')
+    text = json.dumps(document, indent=1)
+    assert list(_ijson_events(io.BytesIO(text.encode('utf-8')))) == list(_scan_events(io.StringIO(text)))
+
+def test_per_audio_schema_summary(tmp_path):
+    path = str(tmp_path / 'results.json')
+    with open(path, 'w') as f:
+        json.dump(PER_AUDIO, f)
+    report = summarize(path, bins=4).as_dict()
+    assert report['schemas'] == ['per-audio detections']
+    assert (report['files'], report['files_with_detections'], report['detections']) == (3, 2, 3)
+    assert report['by_class'] == {'Vessel': 2, 'Marine Animal': 1}
+    assert [entry['count'] for entry in report['confidence_histogram']] == [0, 1, 0, 2]
+
+def test_journal_and_document_summaries_agree(tmp_path):
+    journal_path = str(tmp_path / 'results.jsonl')
+    by_audio = {audio['id']: [] for audio in DOCUMENT['audios']}
+    for annotation in DOCUMENT['annotations']:
+        by_audio[annotation['audio_id']].append(annotation)
+    with AnnotationJournal(journal_path, DOCUMENT['info'], DOCUMENT['categories']) as journal:
+        for audio in DOCUMENT['audios']:
+            journal.write(audio, by_audio[audio['id']])
+    document_path = str(tmp_path / 'results.json')
+    assemble(journal_path, document_path)
+
+    report = summarize(document_path).as_dict()
+    assert report == summarize(journal_path).as_dict()
+    assert report['schemas'] == ['annotations']
+    assert (report['files'], report['files_with_detections'], report['detections']) == (3, 2, 3)
+    assert report['by_class'] == {'vessel': 2, 'marine_animal': 1}
+    assert report['top_files'][0] == {'file': 'a.wav', 'detections': 2}
+
+def test_main_requires_results_paths(tmp_path):
+    with pytest.raises(SystemExit):
+        main([])
+
+    results_path = str(tmp_path / 'results.json')
+    with open(results_path, 'w') as f:
+        json.dump(PER_AUDIO, f)
+    aggregates_path = str(tmp_path / 'aggregates.json')
+    main([results_path, '--json', aggregates_path])
+    with open(aggregates_path) as f:
+        assert json.load(f)[results_path]['detections'] == 3
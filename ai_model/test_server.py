@@ -0,0 +1,106 @@
+# ai_model/test_server.py
+import os
+import time
+import threading
+import numpy as np
+import pytest
+import soundfile as sf
+import tensorflow as tf
+
+from ai_model.server import MicroBatcher, InferenceServer, InferenceClient
+from ai_model.predict import SoundPredictor
+from ai_model.training_engine import build_classifier
+
+class RecordingModel:
+    """Stands in for a model: one output row per input row, recording every batch it is given"""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, batch, batch_size=None, verbose=0):
+        self.batches.append(len(batch))
+        return batch.reshape(len(batch), -1).sum(axis=1, keepdims=True)
+
+def submit_concurrently(batcher, requests):
+    results = [None] * len(requests)
+    def submit(i):
+        results[i] = batcher.submit(requests[i])
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_micro_batcher_coalesces_up_to_max_batch():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch=8, max_latency=0.5)
+    requests = [np.full((2, 3), i, dtype=np.float32) for i in range(6)]
+    try:
+        results = submit_concurrently(batcher, requests)
+    finally:
+        batcher.close()
+
+    # Four requests fill the first batch; the last two wait out max_latency together
+    assert model.batches == [8, 4]
+    assert (batcher.batches_run, batcher.segments_run) == (2, 12)
+    for features, result in zip(requests, results):
+        assert result[:, 0].tolist() == features.sum(axis=1).tolist()
+
+def test_micro_batcher_flushes_at_max_latency():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch=256, max_latency=0.05)
+    try:
+        start = time.monotonic()
+        result = batcher.submit(np.ones((3, 2), dtype=np.float32))
+        elapsed = time.monotonic() - start
+    finally:
+        batcher.close()
+    assert model.batches == [3]
+    assert result[:, 0].tolist() == [2.0, 2.0, 2.0]
+    assert 0.05 <= elapsed < 5.0
+
+@pytest.fixture(scope='module')
+def predictor(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('model') / 'model.h5')
+    tf.keras.utils.set_random_seed(0)
+    model = build_classifier('simple', 5, (128, 87, 1))
+    # Rule out the background class so the comparison has detections in it
+    weights, bias = model.layers[-1].get_weights()
+    model.layers[-1].set_weights([weights, np.array([-20.0, 0.0, 0.0, 0.0, 0.0], dtype=np.float32)])
+    model.save(path)
+    return SoundPredictor(path)
+
+@pytest.fixture
+def client(predictor):
+    server = InferenceServer(predictor, port=0)
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield InferenceClient(server.url, timeout=60)
+    finally:
+        server.httpd.shutdown()
+        server.shutdown()
+        thread.join()
+
+def assert_same_detections(received, expected):
+    assert len(received) == len(expected) > 0
+    for got, want in zip(received, expected):
+        assert {k: v for k, v in got.items() if k != 'score'} == {k: v for k, v in want.items() if k != 'score'}
+        assert got['score'] == pytest.approx(want['score'], abs=1e-5)
+
+def test_predict_round_trip_matches_predict_audio(tmp_path, predictor, client):
+    sample_rate = 22050
+    t = np.arange(7 * sample_rate) / sample_rate
+    y = (0.5 * np.sin(2 * np.pi * 440.0 * t) + 0.05 * np.sin(2 * np.pi * 3000.0 * t)).astype(np.float32)
+    audio_path = str(tmp_path / 'tone.wav')
+    sf.write(audio_path, y, sample_rate, subtype='FLOAT')
+    expected = predictor.predict_audio(audio_path, 0.0)
+
+    assert_same_detections(client.predict_audio(audio_path, 0.0), expected)
+    assert_same_detections(client.predict_pcm(y, sample_rate, 0.0), expected)
+    assert client.health()['segments'] == 2 * len(predictor.data_loader.extract_features(audio_path))
+
+def test_bad_request_raises(client):
+    with pytest.raises(RuntimeError):
+        client._post({'confidence_threshold': 0.5})
@@ -0,0 +1,68 @@
+# ai_model/test_streaming.py
+import numpy as np
+import soundfile as sf
+import pytest
+
+from ai_model.audio_source import load_audio, stream_pcm, pcm_blocks
+from ai_model.mel_frontend import MelFrontend
+from ai_model.predict import UnderwaterDataLoader
+
+def blocks_of(y, block_size):
+    return [y[start:start + block_size] for start in range(0, len(y), block_size)]
+
+def concatenate(batches, like):
+    return np.concatenate(batches) if batches else np.zeros((0,) + like.shape[1:], dtype=np.float32)
+
+@pytest.fixture(scope='module')
+def frontend():
+    return MelFrontend()
+
+@pytest.mark.parametrize('n_samples', [0, 100, 44100, 3 * 44100 + 17, 37 * 22050 + 5])
+@pytest.mark.parametrize('block_size', [1000, 22050, 10 ** 7])
+def test_stream_segment_features_match_whole_file(frontend, n_samples, block_size):
+    y = np.random.default_rng(0).standard_normal(n_samples).astype(np.float32)
+    expected = frontend.segment_features(y)
+    streamed = concatenate(list(frontend.stream_segment_features(blocks_of(y, block_size))), expected)
+    assert streamed.shape == expected.shape
+    np.testing.assert_allclose(streamed, expected, atol=1e-3)
+
+@pytest.mark.parametrize('n_samples', [0, 100, 3 * 44100 + 17, 37 * 22050 + 5])
+@pytest.mark.parametrize('block_size', [1000, 22050, 10 ** 7])
+@pytest.mark.parametrize('hop_seconds', [0.5, 2.0, 3.0])
+def test_stream_overlapping_windows_match_whole_file(frontend, n_samples, block_size, hop_seconds):
+    y = np.random.default_rng(1).standard_normal(n_samples).astype(np.float32)
+    expected = frontend.overlapping_windows(y, hop_seconds)
+    streamed = concatenate(list(frontend.stream_overlapping_windows(blocks_of(y, block_size), hop_seconds)), expected)
+    assert streamed.shape == expected.shape
+    np.testing.assert_allclose(streamed, expected, atol=1e-3)
+
+@pytest.fixture(scope='module')
+def recording(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('audio') / 'recording.wav')
+    t = np.arange(int(16000 * 31.3)) / 16000
+    y = 0.4 * np.sin(2 * np.pi * 300 * t) * (t % 7 < 3) + 0.02 * np.random.default_rng(2).standard_normal(len(t))
+    sf.write(path, y.astype(np.float32), 16000)
+    return path
+
+def test_stream_pcm_matches_whole_file_decode(recording):
+    whole, _ = load_audio(recording)
+    stats = {}
+    streamed = np.concatenate(list(stream_pcm(recording, block_seconds=2.5, stats=stats)))
+    assert len(streamed) == len(whole)
+    np.testing.assert_allclose(streamed, whole, atol=1e-3)
+    assert stats['native_sample_rate'] == 16000
+    assert stats['audio_seconds'] == pytest.approx(len(whole) / 22050)
+
+def test_pcm_blocks_decodes_polyphase_whole(recording):
+    blocks = list(pcm_blocks(recording, block_seconds=2.5, engine='polyphase'))
+    assert len(blocks) == 1
+    np.testing.assert_array_equal(blocks[0], load_audio(recording, engine='polyphase')[0])
+
+@pytest.mark.parametrize('hop_seconds', [None, 0.5])
+def test_loader_block_features_match_whole_file(recording, hop_seconds):
+    data_loader = UnderwaterDataLoader(hop_seconds=hop_seconds, block_seconds=4.0)
+    y, _ = load_audio(recording)
+    expected = data_loader.features_from_signal(y)
+    streamed = data_loader._compute_features(recording)
+    assert streamed.shape == expected.shape
+    np.testing.assert_allclose(streamed, expected, atol=1e-3)
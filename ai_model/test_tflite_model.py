@@ -0,0 +1,35 @@
+# ai_model/test_tflite_model.py
+import numpy as np
+
+from ai_model.feature_store import FeatureStore
+from ai_model.features import clip_feature_params
+from ai_model.tflite_model import calibration_samples
+
+def store_with(tmp_path, arrays):
+    feature_store = FeatureStore(str(tmp_path / 'features'))
+    for i, (params, features) in enumerate(arrays):
+        source = tmp_path / f'source{i}.wav'
+        source.write_bytes(bytes([i]))
+        feature_store.put(str(source), params, features)
+    return feature_store
+
+def test_calibration_uses_clip_shards(tmp_path):
+    clip = np.random.default_rng(0).standard_normal((128, 44, 1)).astype(np.float32)
+    feature_store = store_with(tmp_path, [(clip_feature_params(), clip)])
+
+    samples = list(calibration_samples(feature_store, (128, 44, 1)))
+    assert len(samples) == 1
+    np.testing.assert_array_equal(samples[0][0], clip)
+
+def test_calibration_uses_stacked_windows_of_the_input_shape_only(tmp_path):
+    windows = np.zeros((3, 128, 87, 1), dtype=np.float32)
+    cropped = np.zeros((5, 128, 44, 1), dtype=np.float32)
+    transposed = np.zeros((2, 87, 128, 1), dtype=np.float32)
+    feature_store = store_with(tmp_path, [({'kind': 'segments'}, windows), ({'kind': 'fixed'}, cropped),
+                                          ({'kind': 'transposed'}, transposed)])
+
+    samples = list(calibration_samples(feature_store, (128, 87, 1)))
+    assert len(samples) == 3
+    assert all(sample.shape == (1, 128, 87, 1) for sample in samples)
+    assert len(list(calibration_samples(feature_store, (128, 44, 1), max_samples=4))) == 4
+    assert len(list(calibration_samples(feature_store, (128, None, 1)))) == 8
@@ -0,0 +1,140 @@
+# ai_model/tf_dataset.py
+import functools
+import numpy as np
+import tensorflow as tf
+from sklearn.model_selection import train_test_split
+
+from ai_model.manifest import Manifest
+from ai_model.featurizer import featurize_files, store_features
+
+class SegmentIndex:
+    """Flat index of every training segment as (shard, row, label); the features stay on disk
+
+    Shards are the memory-mapped .npy files of a FeatureStore, so the index costs a few bytes per
+    segment no matter how large the dataset is.
+    """
+
+    def __init__(self, shard_paths, shard_labels, input_shape):
+        self.shard_paths = list(shard_paths)
+        self.input_shape = tuple(input_shape)
+        counts = [np.load(path, mmap_mode="r").shape[0] for path in self.shard_paths]
+        self.shards = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+        self.rows = np.concatenate([np.arange(n, dtype=np.int32) for n in counts]) if counts else np.zeros(0, np.int32)
+        self.labels = np.repeat(np.asarray(shard_labels, dtype=np.int32), counts)
+        self._arrays = {}
+
+    @classmethod
+    def from_loader(cls, data_loader, data_dir=None, manifest=None, label_fn=None, workers=None):
+        """Featurize every labelled file into the loader's feature store and index the shards"""
+        if data_loader.feature_store is None:
+            raise ValueError("Streaming datasets read from feature shards; give the data loader a feature_store")
+        if manifest is None:
+            manifest = Manifest.for_directory(data_dir)
+        label_fn = label_fn or data_loader._get_label_from_path
+
+        file_labels = {}
+        for file_path in manifest.paths():
+            label = label_fn(file_path)
+            if label is not None:
+                file_labels[file_path] = label
+
+        # Workers write shards themselves and send back only (shard path, shape), so no features reach this process
+        shard_paths, shard_labels, input_shape = [], [], None
+        featurize_fn = functools.partial(store_features, data_loader)
+        for file_path, (shard_path, shape) in featurize_files(file_labels, featurize_fn, workers):
+            if shape[0] == 0:
+                continue
+            input_shape = shape[1:]
+            shard_paths.append(shard_path)
+            shard_labels.append(file_labels[file_path])
+
+        if input_shape is None:
+            raise ValueError("No labelled audio files with features found")
+        return cls(shard_paths, shard_labels, input_shape)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def split(self, test_size=0.2, val_size=0.1, random_state=42):
+        """Stratified train/val/test positions into this index; only index arrays are copied"""
+        positions = np.arange(len(self))
+        temp, test = train_test_split(positions, test_size=test_size, random_state=random_state,
+                                      stratify=self.labels)
+        val_size_adjusted = val_size / (1 - test_size)
+        train, val = train_test_split(temp, test_size=val_size_adjusted, random_state=random_state,
+                                      stratify=self.labels[temp])
+        return train, val, test
+
+    def _array(self, shard):
+        # One read-only memmap per shard, opened lazily and reused by every map call
+        if shard not in self._arrays:
+            self._arrays[shard] = np.load(self.shard_paths[shard], mmap_mode="r")
+        return self._arrays[shard]
+
+    def _read_chunk(self, shard, rows):
+        return np.asarray(self._array(int(shard))[rows], dtype=np.float32)
+
+    def _chunks(self, positions, chunk_size):
+        """Group positions by shard and cut them into runs of at most chunk_size rows"""
+        positions = np.asarray(positions)
+        positions = positions[np.lexsort((self.rows[positions], self.shards[positions]))]
+        shards = self.shards[positions]
+        boundaries = np.flatnonzero(np.diff(shards)) + 1
+
+        chunk_shards, chunk_rows, chunk_labels = [], [], []
+        for group in np.split(positions, boundaries):
+            for start in range(0, len(group), chunk_size):
+                chunk = group[start:start + chunk_size]
+                chunk_shards.append(self.shards[chunk[0]])
+                chunk_rows.append(self.rows[chunk])
+                chunk_labels.append(self.labels[chunk])
+        return chunk_shards, chunk_rows, chunk_labels
+
+    def dataset(self, positions, batch_size=32, shuffle=True, shuffle_buffer=2048, chunk_size=64,
+                cycle_length=4, seed=42, augmenter=None):
+        """tf.data pipeline over the given positions: chunked shard reads, interleave, shuffle, batch, prefetch
+
+        An augment.Augmenter transforms each batch as it is read, so no augmented copies are stored.
+        """
+        chunk_shards, chunk_rows, chunk_labels = self._chunks(positions, chunk_size)
+        lengths = np.array([len(rows) for rows in chunk_rows], dtype=np.int32)
+
+        # Ragged chunks padded into one tensor; each map call slices its own chunk back out
+        padded_rows = np.zeros((len(chunk_rows), chunk_size), dtype=np.int32)
+        padded_labels = np.zeros((len(chunk_rows), chunk_size), dtype=np.int32)
+        for i, (rows, labels) in enumerate(zip(chunk_rows, chunk_labels)):
+            padded_rows[i, :len(rows)] = rows
+            padded_labels[i, :len(labels)] = labels
+
+        input_shape = self.input_shape
+
+        def load_chunk(shard, rows, labels, length):
+            features = tf.numpy_function(self._read_chunk, [shard, rows[:length]], tf.float32)
+            features.set_shape((None,) + input_shape)
+            return tf.data.Dataset.from_tensor_slices((features, labels[:length]))
+
+        ds = tf.data.Dataset.from_tensor_slices(
+            (np.asarray(chunk_shards, dtype=np.int32), padded_rows, padded_labels, lengths)
+        )
+        if shuffle:
+            ds = ds.shuffle(len(lengths), seed=seed, reshuffle_each_iteration=True)
+        ds = ds.interleave(load_chunk, cycle_length=cycle_length, num_parallel_calls=tf.data.AUTOTUNE,
+                           deterministic=not shuffle)
+        if shuffle:
+            ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+        ds = ds.batch(batch_size)
+        if augmenter is not None:
+            ds = augmenter.apply(ds)
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+def load_streaming_datasets(data_loader, data_dir=None, test_size=0.2, val_size=0.1, manifest=None,
+                            batch_size=32, label_fn=None, workers=None, augmenter=None):
+    """(train, val, test) tf.data datasets and the segment positions each one reads; only train is augmented"""
+    index = SegmentIndex.from_loader(data_loader, data_dir, manifest, label_fn, workers)
+    train, val, test = index.split(test_size, val_size)
+    datasets = (
+        index.dataset(train, batch_size, augmenter=augmenter),
+        index.dataset(val, batch_size, shuffle=False),
+        index.dataset(test, batch_size, shuffle=False)
+    )
+    return datasets, (train, val, test)
@@ -0,0 +1,151 @@
+# ai_model/tflite_model.py
+import os
+import argparse
+import numpy as np
+
+from ai_model.feature_store import FeatureStore
+
+def _load_interpreter_class():
+    """Prefer a standalone interpreter package so CPU workers never import full TensorFlow"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+def tflite_path_for(model_path):
+    """The .tflite file exported next to a Keras .h5 model"""
+    if model_path.endswith('.tflite'):
+        return model_path
+    return os.path.splitext(model_path)[0] + '.tflite'
+
+def _shape_matches(shape, input_shape):
+    """True if shape equals the model input shape; None (variable) model dimensions match anything"""
+    return len(shape) == len(input_shape) and all(
+        expected is None or int(dim) == expected for dim, expected in zip(shape, input_shape)
+    )
+
+def calibration_samples(feature_store, input_shape, max_samples=500):
+    """Yield cached feature windows matching the model input shape, for int8 calibration
+
+    Shards are either one clip of exactly input_shape (train scripts) or a stack of such windows
+    (segment and window features from the predictors).
+    """
+    input_shape = tuple(input_shape)
+    yielded = 0
+    for entry in feature_store.entries():
+        shape = entry["shape"]
+        if _shape_matches(shape, input_shape):
+            stacked = False
+        elif _shape_matches(shape[1:], input_shape):
+            stacked = True
+        else:
+            continue
+        features = np.load(os.path.join(feature_store.root, entry["shard"]), mmap_mode="r")
+        for row in (features if stacked else [features]):
+            yield np.asarray(row, dtype=np.float32)[np.newaxis]
+            yielded += 1
+            if yielded >= max_samples:
+                return
+
+def export_tflite(model_path, output_path=None, quantize=False, feature_store=None, max_samples=500):
+    """Convert a Keras .h5 model to TFLite, optionally with full-integer post-training quantization"""
+    import tensorflow as tf
+
+    output_path = output_path or tflite_path_for(model_path)
+    model = tf.keras.models.load_model(model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantize:
+        if feature_store is None:
+            raise ValueError("int8 quantization needs a feature store with cached features for calibration")
+        input_shape = model.input_shape[1:]
+        if next(calibration_samples(feature_store, input_shape, 1), None) is None:
+            raise ValueError(f"No cached features in {feature_store.root} match input shape {input_shape}")
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([sample] for sample in
+                                                    calibration_samples(feature_store, input_shape, max_samples))
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    tflite_model = converter.convert()
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+
+    print(f"Exported {model_path} -> {output_path} ({len(tflite_model) / 1024:.0f} KB, "
+          f"{'int8' if quantize else 'float32'})")
+    return output_path
+
+class TFLiteModel:
+    """TFLite interpreter with a Keras-style predict(features, batch_size) for the predictors"""
+
+    def __init__(self, tflite_path, num_threads=None):
+        Interpreter = _load_interpreter_class()
+        self.tflite_path = tflite_path
+        self.interpreter = Interpreter(model_path=tflite_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(self.input_details['shape'][1:])
+        self.batch_capacity = int(self.input_details['shape'][0])
+
+    def _resize(self, batch_size):
+        """Resize the input tensor only when the batch size changes"""
+        if batch_size != self.batch_capacity:
+            self.interpreter.resize_tensor_input(self.input_details['index'], (batch_size,) + self.input_shape)
+            self.interpreter.allocate_tensors()
+            self.input_details = self.interpreter.get_input_details()[0]
+            self.output_details = self.interpreter.get_output_details()[0]
+            self.batch_capacity = batch_size
+
+    def _quantize_input(self, batch):
+        if self.input_details['dtype'] == np.float32:
+            return batch
+        scale, zero_point = self.input_details['quantization']
+        info = np.iinfo(self.input_details['dtype'])
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(self.input_details['dtype'])
+
+    def _dequantize_output(self, output):
+        if self.output_details['dtype'] == np.float32:
+            return output
+        scale, zero_point = self.output_details['quantization']
+        return (output.astype(np.float32) - zero_point) * scale
+
+    def predict(self, features, batch_size=32, verbose=0):
+        """Run the interpreter over features in batches of batch_size"""
+        features = np.asarray(features, dtype=np.float32).reshape((-1,) + self.input_shape)
+        batch_size = batch_size or 32
+        outputs = []
+        for start in range(0, len(features), batch_size):
+            batch = features[start:start + batch_size]
+            self._resize(len(batch))
+            self.interpreter.set_tensor(self.input_details['index'], self._quantize_input(batch))
+            self.interpreter.invoke()
+            outputs.append(self._dequantize_output(self.interpreter.get_tensor(self.output_details['index'])))
+
+        if not outputs:
+            return np.zeros((0,) + tuple(self.output_details['shape'][1:]), dtype=np.float32)
+        return np.concatenate(outputs)
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a trained Keras model to TFLite')
+    parser.add_argument('--model_path', required=True, help='Path to trained .h5 model')
+    parser.add_argument('--output', help='Output .tflite path (default: next to the model)')
+    parser.add_argument('--quantize', action='store_true', help='Post-training int8 quantization')
+    parser.add_argument('--feature_store', default='data/feature_store',
+                        help='Feature store with cached features for int8 calibration')
+    parser.add_argument('--calibration_samples', type=int, default=500, help='Number of calibration windows')
+
+    args = parser.parse_args()
+
+    feature_store = FeatureStore(args.feature_store) if args.quantize else None
+    export_tflite(args.model_path, args.output, args.quantize, feature_store, args.calibration_samples)
+
+if __name__ == "__main__":
+    main()
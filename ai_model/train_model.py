@@ -5,11 +5,20 @@ import numpy as np
 import tensorflow as tf
 from datetime import datetime
 from sklearn.model_selection import train_test_split
-import librosa
 
 # Add the parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from ai_model.manifest import Manifest
+from ai_model.featurizer import featurize_files
+from ai_model.mel_frontend import get_config_frontend
+from ai_model.audio_source import DEFAULT_RESAMPLE_ENGINE, pcm_blocks, describe_resampling
+from ai_model.feature_store import FeatureStore
+from ai_model.synthetic import CORPORA, generate_corpus
+from ai_model.tf_dataset import load_streaming_datasets
+from ai_model.augment import add_augment_arguments, augmenter_from_args
+from ai_model.training_options import TrainingOptions
+
 def create_cnn_model(input_shape, num_classes):
     """Create CNN model for underwater sound classification"""
     model = tf.keras.Sequential([
@@ -38,79 +47,97 @@ def create_cnn_model(input_shape, num_classes):
         tf.keras.layers.Dropout(0.5),
         tf.keras.layers.Dense(128, activation='relu'),
         tf.keras.layers.Dropout(0.5),
-        tf.keras.layers.Dense(num_classes, activation='softmax')
+        tf.keras.layers.Dense(num_classes, activation='softmax', dtype='float32')
     ])
     
     return model
 
-def compile_model(model, learning_rate=0.001):
+def compile_model(model, learning_rate=0.001, options=None):
     """Compile the model with appropriate settings"""
+    options = options or TrainingOptions()
     model.compile(
         optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
         loss='sparse_categorical_crossentropy',
-        metrics=['accuracy', 'precision', 'recall']
+        metrics=['accuracy', 'precision', 'recall'],
+        **options.compile_kwargs()
     )
     return model
 
 class UnderwaterDataLoader:
-    def __init__(self, sample_rate=22050, segment_duration=2.0, n_mels=128):
-        self.sample_rate = sample_rate
-        self.segment_duration = segment_duration
-        self.segment_samples = int(sample_rate * segment_duration)
-        self.n_mels = n_mels
-        self.hop_length = 512
-        self.n_fft = 2048
+    def __init__(self, sample_rate=None, segment_duration=None, n_mels=None, feature_store=None,
+                 resample_engine=DEFAULT_RESAMPLE_ENGINE, report_resampling=False, block_seconds=60.0):
+        # Settings left as None come from model/config.json
+        self.frontend = get_config_frontend(sample_rate=sample_rate, segment_duration=segment_duration, n_mels=n_mels)
+        self.sample_rate = self.frontend.sample_rate
+        self.segment_duration = self.frontend.segment_duration
+        self.segment_samples = self.frontend.segment_samples
+        self.n_mels = self.frontend.n_mels
+        self.hop_length = self.frontend.hop_length
+        self.n_fft = self.frontend.n_fft
+        self.feature_store = feature_store
+        self.resample_engine = resample_engine
+        self.report_resampling = report_resampling
+        self.block_seconds = block_seconds  # audio decoded at a time
         
+    def feature_params(self):
+        """Parameters that identify these features in the feature store"""
+        return {
+            "kind": "segments",
+            "sample_rate": self.sample_rate,
+            "segment_duration": self.segment_duration,
+            "n_fft": self.n_fft,
+            "hop_length": self.hop_length,
+            "n_mels": self.n_mels,
+            "resample_engine": self.resample_engine,
+            "n_frames": None
+        }
+    
     def extract_features(self, audio_path):
-        """Extract mel-spectrogram features from audio file"""
+        """Extract mel-spectrogram features from audio file, through the feature store if configured"""
+        if self.feature_store is None:
+            return self._compute_features(audio_path)
         try:
-            y, sr = librosa.load(audio_path, sr=self.sample_rate)
-            y = librosa.util.normalize(y)
-            
-            # Process in segments
-            features = []
-            for start_idx in range(0, len(y), self.segment_samples):
-                end_idx = min(start_idx + self.segment_samples, len(y))
-                segment = y[start_idx:end_idx]
-                
-                if len(segment) < self.segment_samples:
-                    segment = np.pad(segment, (0, self.segment_samples - len(segment)), 'constant')
-                
-                # Extract mel-spectrogram
-                mel_spec = librosa.feature.melspectrogram(
-                    y=segment, sr=sr, n_fft=self.n_fft,
-                    hop_length=self.hop_length, n_mels=self.n_mels
-                )
-                log_mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
-                
-                # Reshape for CNN (add channel dimension)
-                log_mel_spec = log_mel_spec.reshape(log_mel_spec.shape[0], log_mel_spec.shape[1], 1)
-                features.append(log_mel_spec)
-                
-            return np.array(features)
+            return self.feature_store.get_or_compute(audio_path, self.feature_params(), self._compute_features)
+        except OSError as e:
+            print(f"Error processing {audio_path}: {e}")
+            return None
+    
+    def _compute_features(self, audio_path):
+        try:
+            # Decoded block by block; each block's segments go through one batched STFT and filterbank matmul.
+            # Peak normalization is skipped since every segment is scaled to its own maximum anyway.
+            stats = {}
+            blocks = pcm_blocks(audio_path, self.sample_rate, self.block_seconds, self.resample_engine, stats)
+            batches = list(self.frontend.stream_segment_features(blocks))
+            if self.report_resampling:
+                print(describe_resampling(audio_path, stats))
+            if not batches:
+                return self.frontend.segment_features(np.zeros(0, dtype=np.float32))
+            return np.concatenate(batches)
             
         except Exception as e:
             print(f"Error processing {audio_path}: {e}")
             return None
     
-    def load_dataset(self, data_dir, test_size=0.2, val_size=0.1):
-        """Load and preprocess entire dataset"""
+    def load_dataset(self, data_dir, test_size=0.2, val_size=0.1, manifest=None, workers=None):
+        """Load and preprocess entire dataset, featurizing files in parallel in sorted-path order"""
         features = []
         labels = []
         
-        # Walk through data directory
-        for root, dirs, files in os.walk(data_dir):
-            for file in files:
-                if file.endswith('.wav'):
-                    file_path = os.path.join(root, file)
-                    file_features = self.extract_features(file_path)
-                    
-                    if file_features is not None:
-                        # Determine label from directory structure
-                        label = self._get_label_from_path(file_path)
-                        if label is not None:
-                            features.extend(file_features)
-                            labels.extend([label] * len(file_features))
+        # File list comes from header probing, so empty/corrupt files are skipped before decoding
+        if manifest is None:
+            manifest = Manifest.for_directory(data_dir)
+        
+        # Determine labels from directory structure; unlabelled files are never decoded
+        file_labels = {}
+        for file_path in manifest.paths():
+            label = self._get_label_from_path(file_path)
+            if label is not None:
+                file_labels[file_path] = label
+        
+        for file_path, file_features in featurize_files(file_labels, self.extract_features, workers):
+            features.extend(file_features)
+            labels.extend([file_labels[file_path]] * len(file_features))
         
         features = np.array(features)
         labels = np.array(labels)
@@ -127,6 +154,12 @@ class UnderwaterDataLoader:
         
         return (X_train, y_train), (X_val, y_val), (X_test, y_test)
     
+    def load_streaming_dataset(self, data_dir, test_size=0.2, val_size=0.1, manifest=None, batch_size=32,
+                               workers=None, augmenter=None):
+        """Like load_dataset, but returns tf.data datasets streaming from feature shards instead of arrays"""
+        return load_streaming_datasets(self, data_dir, test_size, val_size, manifest, batch_size, workers=workers,
+                                       augmenter=augmenter)
+    
     def _get_label_from_path(self, file_path):
         """Extract label from file path"""
         path = file_path.lower()
@@ -142,17 +175,19 @@ class UnderwaterDataLoader:
             return 0  # Background/Unknown
 
 class ModelTrainer:
-    def __init__(self, input_shape=(128, 87, 1), num_classes=5):
+    def __init__(self, input_shape=(128, 87, 1), num_classes=5, options=None):
         self.input_shape = input_shape
         self.num_classes = num_classes
+        self.options = options or TrainingOptions()
         self.model = None
         self.history = None
         
     def train(self, X_train, y_train, X_val, y_val, epochs=50, batch_size=32, learning_rate=0.001):
-        """Train the model"""
-        # Create and compile model
+        """Train the model on arrays, or on batched tf.data datasets passed as X_train/X_val with y None"""
+        # Create and compile model; the precision policy must be set before layers are built
+        self.options.apply_policy()
         self.model = create_cnn_model(self.input_shape, self.num_classes)
-        self.model = compile_model(self.model, learning_rate)
+        self.model = compile_model(self.model, learning_rate, self.options)
         
         # Callbacks
         callbacks = [
@@ -161,14 +196,15 @@ class ModelTrainer:
             tf.keras.callbacks.ModelCheckpoint(
                 'models/best_model.h5', save_best_only=True, monitor='val_loss'
             )
-        ]
+        ] + self.options.callbacks('train_model')
         
-        # Train model
+        # Train model; datasets arrive batched and carry their own labels
+        streaming = isinstance(X_train, tf.data.Dataset)
         self.history = self.model.fit(
             X_train, y_train,
-            batch_size=batch_size,
+            batch_size=None if streaming else batch_size,
             epochs=epochs,
-            validation_data=(X_val, y_val),
+            validation_data=X_val if streaming else (X_val, y_val),
             callbacks=callbacks,
             verbose=1
         )
@@ -182,7 +218,7 @@ class ModelTrainer:
             self.model.save(model_path)
             print(f"Model saved to {model_path}")
     
-    def evaluate(self, X_test, y_test):
+    def evaluate(self, X_test, y_test=None):
         """Evaluate model on test set"""
         if self.model:
             results = self.model.evaluate(X_test, y_test, verbose=0)
@@ -196,29 +232,41 @@ class ModelTrainer:
 
 def main():
     """Main training function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Train the underwater sound model')
+    TrainingOptions.add_arguments(parser)
+    parser.add_argument('--workers', type=int, help='Featurizer processes (default: one per CPU)')
+    add_augment_arguments(parser)
+    args = parser.parse_args()
+    options = TrainingOptions.from_args(args)
+    
     print("Starting model training...")
     
-    # Initialize data loader
-    data_loader = UnderwaterDataLoader()
+    # Initialize data loader; features are cached so repeated runs skip featurization
+    data_loader = UnderwaterDataLoader(feature_store=FeatureStore())
     
     # Load dataset (replace with your dataset path)
     dataset_path = "underwater\data\datasets"
     print(f"Loading dataset from: {dataset_path}")
     
     try:
-        (X_train, y_train), (X_val, y_val), (X_test, y_test) = data_loader.load_dataset(dataset_path)
+        # Segments stream from the feature shards; only index arrays are held in memory
+        (train_ds, val_ds, test_ds), (train_idx, val_idx, test_idx) = data_loader.load_streaming_dataset(
+            dataset_path, workers=args.workers, augmenter=augmenter_from_args(args)
+        )
         
         print(f"Dataset loaded:")
-        print(f"Train: {X_train.shape[0]} samples")
-        print(f"Validation: {X_val.shape[0]} samples") 
-        print(f"Test: {X_test.shape[0]} samples")
+        print(f"Train: {len(train_idx)} samples")
+        print(f"Validation: {len(val_idx)} samples") 
+        print(f"Test: {len(test_idx)} samples")
         
         # Train model
-        trainer = ModelTrainer()
-        history = trainer.train(X_train, y_train, X_val, y_val, epochs=30)
+        trainer = ModelTrainer(options=options)
+        history = trainer.train(train_ds, None, val_ds, None, epochs=30)
         
         # Evaluate model
-        metrics = trainer.evaluate(X_test, y_test)
+        metrics = trainer.evaluate(test_ds)
         print("\nModel Evaluation:")
         for metric, value in metrics.items():
             print(f"{metric}: {value:.4f}")
@@ -239,38 +287,8 @@ def create_sample_data():
     print("Creating sample training data...")
     os.makedirs("data/sample_train", exist_ok=True)
     
-    # Create sample WAV files for training
-    sample_rate = 22050
-    for i in range(20):
-        duration = 3
-        t = np.linspace(0, duration, sample_rate * duration)
-        
-        # Create different types of sounds
-        if i < 5:
-            audio = 0.7 * np.sin(2 * np.pi * 100 * t)  # Vessel
-            label = "vessel"
-        elif i < 10:
-            audio = 0.6 * np.sin(2 * np.pi * 8000 * t)  # Marine animal
-            label = "marine"
-        elif i < 15:
-            audio = 0.5 * np.sin(2 * np.pi * 0.5 * t)   # Natural sound
-            label = "natural"
-        else:
-            audio = 0.8 * np.sin(2 * np.pi * 300 * t)   # Anthropogenic
-            label = "anthropogenic"
-        
-        audio += 0.1 * np.random.normal(0, 1, len(t))
-        audio = audio / np.max(np.abs(audio))
-        audio_int16 = (audio * 32767).astype(np.int16)
-        
-        filename = f"data/sample_train/{label}_{i}.wav"
-        with open(filename, 'wb') as f:
-            import wave
-            with wave.open(filename, 'w') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(sample_rate)
-                wf.writeframes(audio_int16.tobytes())
+    # Sample WAV files for training: 5 each of vessel, marine, natural and anthropogenic tones
+    generate_corpus(CORPORA['sample'], "data/sample_train", workers=1)
     
     print("Sample data created at: data/sample_train/")
     print("Run training again to use sample data")
@@ -0,0 +1,446 @@
+# ai_model/training_engine.py
+import os
+import sys
+import argparse
+import functools
+import numpy as np
+import tensorflow as tf
+from datetime import datetime
+from sklearn.model_selection import train_test_split
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_model.manifest import Manifest
+from ai_model.feature_store import FeatureStore
+from ai_model.features import load_clip_features
+from ai_model.featurizer import featurize_files
+from ai_model.synthetic import SHARD_INDEX, load_feature_shards
+from ai_model.training_options import TrainingOptions
+from ai_model.augment import add_augment_arguments, augmenter_from_args
+
+CLIP_SHAPE = (128, 44, 1)
+
+def _conv_block(filters, **kwargs):
+    return [
+        tf.keras.layers.Conv2D(filters, (3, 3), activation='relu', **kwargs),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.MaxPooling2D((2, 2)),
+        tf.keras.layers.Dropout(0.3)
+    ]
+
+def _deep_layers(input_shape, num_classes):
+    """Three conv blocks, global pooling and a 256-128 head (DeepShip, train_fixed)"""
+    return _conv_block(32, input_shape=input_shape) + _conv_block(64) + _conv_block(128) + [
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(256, activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.5),
+        tf.keras.layers.Dense(128, activation='relu'),
+        tf.keras.layers.Dropout(0.5)
+    ]
+
+def _whale_layers(input_shape, num_classes):
+    """Three conv blocks, global pooling and a single 128 head (humpback)"""
+    return _conv_block(32, input_shape=input_shape) + _conv_block(64) + _conv_block(128) + [
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(128, activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.5)
+    ]
+
+def _compact_layers(input_shape, num_classes):
+    """Two conv blocks flattened into a 128 head (DOSITS, synthetic whales)"""
+    return _conv_block(32, input_shape=input_shape) + _conv_block(64) + [
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(128, activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.5)
+    ]
+
+def _simple_layers(input_shape, num_classes):
+    """Small unnormalized CNN that trains on anything (smoke tests, unlabelled data)"""
+    return [
+        tf.keras.layers.Conv2D(16, (3, 3), activation='relu', input_shape=input_shape),
+        tf.keras.layers.MaxPooling2D((2, 2)),
+        tf.keras.layers.Conv2D(32, (3, 3), activation='relu'),
+        tf.keras.layers.MaxPooling2D((2, 2)),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(64, activation='relu'),
+        tf.keras.layers.Dropout(0.5)
+    ]
+
+ARCHITECTURES = {
+    'deep': _deep_layers,
+    'whale': _whale_layers,
+    'compact': _compact_layers,
+    'simple': _simple_layers
+}
+
+def build_classifier(architecture, num_classes, input_shape=CLIP_SHAPE, options=None):
+    """Compiled classifier from one of ARCHITECTURES under the given training options"""
+    if architecture not in ARCHITECTURES:
+        raise ValueError(f"Unknown architecture '{architecture}', expected one of {', '.join(ARCHITECTURES)}")
+
+    # Precision policy has to be in place before any layer is built
+    options = options or TrainingOptions()
+    options.apply_policy()
+
+    model = tf.keras.Sequential(ARCHITECTURES[architecture](input_shape, num_classes) + [
+        tf.keras.layers.Dense(num_classes, activation='softmax', dtype='float32')
+    ])
+
+    model.compile(
+        optimizer='adam',
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy'],
+        **options.compile_kwargs()
+    )
+
+    return model
+
+class DatasetAdapter:
+    """Maps one dataset layout on disk to {path: label}; subclasses implement labelled_files"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def exists(self):
+        return os.path.exists(self.root)
+
+    def labelled_files(self):
+        raise NotImplementedError
+
+    def extra_samples(self, num_files, input_shape):
+        """Samples that do not come from files (e.g. synthetic background); none by default"""
+        return np.zeros((0,) + tuple(input_shape), dtype=np.float32), np.zeros(0, dtype=int)
+
+class FolderAdapter(DatasetAdapter):
+    """Class label from the sub-folder a file sits in directly, e.g. DeepShip's Cargo/ or DOSITS's fish/"""
+
+    def __init__(self, root, class_mapping):
+        super().__init__(root)
+        self.class_mapping = class_mapping
+
+    def labelled_files(self):
+        manifest = Manifest.for_directory(self.root)
+        file_labels = {}
+        for folder, class_id in self.class_mapping.items():
+            folder_path = os.path.join(self.root, folder)
+            if os.path.exists(folder_path):
+                files = [p for p in manifest.paths() if os.path.dirname(p) == folder_path]
+                print(f"  {folder}: {len(files)} files")
+                file_labels.update((file_path, class_id) for file_path in files)
+        return file_labels
+
+class HumpbackAdapter(DatasetAdapter):
+    """Every file is one positive class; background comes from background_path or, without one,
+    synthetic noise clips (one per positive file)"""
+
+    def __init__(self, root, label=2, background_path=None, background_label=0, recursive=True):
+        super().__init__(root)
+        self.label = label
+        self.background_path = background_path
+        self.background_label = background_label
+        self.recursive = recursive
+
+    def exists(self):
+        return os.path.exists(self.root) and (self.background_path is None or os.path.exists(self.background_path))
+
+    def labelled_files(self):
+        file_labels = {p: self.label for p in Manifest.for_directory(self.root, recursive=self.recursive).paths()}
+        print(f"Found {len(file_labels)} sound files in {self.root}")
+        if self.background_path is not None:
+            background = Manifest.for_directory(self.background_path, recursive=self.recursive).paths()
+            print(f"Found {len(background)} background files in {self.background_path}")
+            file_labels.update((p, self.background_label) for p in background)
+        return file_labels
+
+    def extra_samples(self, num_files, input_shape):
+        if self.background_path is not None:
+            return super().extra_samples(num_files, input_shape)
+        print("Creating synthetic background noise...")
+        noise = 0.1 * np.random.normal(0, 1, (num_files,) + tuple(input_shape))
+        return noise, np.full(num_files, self.background_label)
+
+# Checked in order; the first keyword found anywhere in the lower-cased path wins
+PATH_KEYWORDS = [
+    (('cargo', 'tanker', 'passenger', 'vessel'), 1),        # Vessel
+    (('marine', 'whale', 'dolphin', 'fish'), 2),            # Marine Animal
+    (('natural', 'wave', 'rain'), 3),                       # Natural Sound
+    (('anthropogenic', 'sonar', 'engine'), 4)               # Other Anthropogenic
+]
+
+class KeywordAdapter(DatasetAdapter):
+    """Class label from keywords in the file path, default_label when none match"""
+
+    def __init__(self, root, default_label=0):
+        super().__init__(root)
+        self.default_label = default_label
+
+    def label_for(self, file_path):
+        path = file_path.lower()
+        for keywords, class_id in PATH_KEYWORDS:
+            if any(keyword in path for keyword in keywords):
+                return class_id
+        return self.default_label
+
+    def labelled_files(self):
+        file_labels = {}
+        for file_path in Manifest.for_directory(self.root).paths():
+            label = self.label_for(file_path)
+            if label is not None:
+                file_labels[file_path] = label
+        print(f"Found {len(file_labels)} labelled files in {self.root}")
+        return file_labels
+
+def _stratify(labels):
+    """labels if every class present has at least two samples (required to stratify), else None"""
+    counts = np.bincount(labels)
+    return labels if len(labels) and counts[counts > 0].min() >= 2 else None
+
+class ShardAdapter(DatasetAdapter):
+    """Synthetic corpus written as clip-feature shards (ai_model.synthetic --features); no audio to decode"""
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.root, SHARD_INDEX))
+
+    def labelled_files(self):
+        return {}
+
+    def extra_samples(self, num_files, input_shape):
+        X, y = load_feature_shards(self.root)
+        print(f"Loaded {len(X)} synthetic clips from feature shards in {self.root}")
+        return X, y
+
+class TrainingRun:
+    """One model to train: which adapter feeds it, its architecture and its fit/save settings"""
+
+    def __init__(self, name, adapter, architecture, num_classes, epochs=20, batch_size=32, patience=5,
+                 checkpoint_path=None, model_prefix=None, test_size=0.2, val_size=0.1):
+        self.name = name
+        self.adapter = adapter
+        self.architecture = architecture
+        self.num_classes = num_classes
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.patience = patience
+        self.checkpoint_path = checkpoint_path
+        self.model_prefix = model_prefix or f"{name}_model"
+        self.test_size = test_size
+        self.val_size = val_size
+
+class TrainingEngine:
+    """Trains any number of runs over one featurization cache
+
+    Clip features live in the on-disk FeatureStore across processes and in an in-memory map for
+    this run, so adapters that share files (or several models on one dataset) never decode a WAV twice.
+    With an augment.Augmenter, training batches are augmented as they are fed instead of stored.
+    """
+
+    def __init__(self, feature_store=None, n_frames=CLIP_SHAPE[1], workers=None, options=None, augmenter=None):
+        self.feature_store = feature_store if feature_store is not None else FeatureStore("data/feature_store")
+        self.n_frames = n_frames
+        self.workers = workers
+        self.options = options or TrainingOptions()
+        self.augmenter = augmenter
+        self._features = {}
+
+    def features_for(self, file_paths):
+        """{path: clip features}; only files not seen earlier in this run are featurized"""
+        missing = [p for p in file_paths if p not in self._features]
+        if missing:
+            featurize_fn = functools.partial(load_clip_features, feature_store=self.feature_store, n_frames=self.n_frames)
+            self._features.update(featurize_files(missing, featurize_fn, self.workers))
+        return {p: self._features[p] for p in file_paths if p in self._features}
+
+    def load(self, adapter):
+        """(X, y) for an adapter, file samples in sorted-path order followed by its extra samples"""
+        file_labels = adapter.labelled_files()
+        features = self.features_for(file_labels)
+        paths = sorted(features)
+        input_shape = CLIP_SHAPE[:1] + (self.n_frames,) + CLIP_SHAPE[2:]
+
+        X_extra, y_extra = adapter.extra_samples(len(paths), input_shape)
+        X = np.concatenate([np.array([features[p] for p in paths]).reshape((-1,) + input_shape), X_extra])
+        y = np.concatenate([np.array([file_labels[p] for p in paths], dtype=int), y_extra]).astype(int)
+        return X, y
+
+    @staticmethod
+    def split(X, y, test_size=0.2, val_size=0.1):
+        """Train/val/test split with random_state=42; val_size is a fraction of the non-test part"""
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size, random_state=42, stratify=_stratify(y)
+        )
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_train, y_train, test_size=val_size, random_state=42, stratify=_stratify(y_train)
+        )
+        return (X_train, y_train), (X_val, y_val), (X_test, y_test)
+
+    def augmented_dataset(self, X, y, batch_size, seed=42):
+        """Shuffled batches of (X, y) gathered by index and augmented per batch; X itself is never copied"""
+        def gather(index):
+            features, labels = tf.numpy_function(lambda i: (X[i], y[i]), [index], (X.dtype, y.dtype))
+            features.set_shape((None,) + X.shape[1:])
+            labels.set_shape((None,))
+            return features, labels
+
+        ds = (tf.data.Dataset.range(len(X))
+              .shuffle(len(X), seed=seed, reshuffle_each_iteration=True)
+              .batch(batch_size)
+              .map(gather, num_parallel_calls=tf.data.AUTOTUNE))
+        return self.augmenter.apply(ds).prefetch(tf.data.AUTOTUNE)
+
+    def train(self, run):
+        """Load, split, fit, evaluate and save one run; returns a summary dict or None if there is no data"""
+        print(f"\n=== {run.name} ===")
+        if not run.adapter.exists():
+            print(f"❌ Dataset not found at {run.adapter.root}")
+            return None
+
+        X, y = self.load(run.adapter)
+        if len(X) == 0:
+            print("❌ No features could be extracted!")
+            return None
+
+        print(f"✅ Loaded {len(X)} samples")
+        print(f"Class distribution: {np.bincount(y)}")
+
+        (X_train, y_train), (X_val, y_val), (X_test, y_test) = self.split(X, y, run.test_size, run.val_size)
+        print(f"Train: {X_train.shape[0]} samples")
+        print(f"Validation: {X_val.shape[0]} samples")
+        print(f"Test: {X_test.shape[0]} samples")
+
+        model = build_classifier(run.architecture, run.num_classes, X.shape[1:], self.options)
+
+        os.makedirs('models', exist_ok=True)
+        callbacks = []
+        if run.patience:
+            callbacks.append(tf.keras.callbacks.EarlyStopping(patience=run.patience, restore_best_weights=True))
+        if run.checkpoint_path:
+            callbacks.append(tf.keras.callbacks.ModelCheckpoint(run.checkpoint_path, save_best_only=True, monitor='val_loss'))
+
+        print(f"Training {run.name} model...")
+        if self.augmenter is not None:
+            train_data = {'x': self.augmented_dataset(X_train, y_train, run.batch_size)}
+        else:
+            train_data = {'x': X_train, 'y': y_train, 'batch_size': run.batch_size}
+        history = model.fit(
+            **train_data,
+            epochs=run.epochs,
+            validation_data=(X_val, y_val),
+            verbose=1,
+            callbacks=callbacks + self.options.callbacks(run.name)
+        )
+
+        # Evaluate
+        test_loss, test_acc = model.evaluate(X_test, y_test, verbose=0)
+        print(f"\n📊 Test accuracy: {test_acc:.4f}")
+        print(f"📊 Test loss: {test_loss:.4f}")
+
+        # Save final model
+        final_model_path = f"models/{run.model_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.h5"
+        model.save(final_model_path)
+
+        print(f"\n✅ {run.name} training completed!")
+        print(f"📍 Model saved to: {final_model_path}")
+        if run.checkpoint_path:
+            print(f"📍 Best model saved to: {run.checkpoint_path}")
+
+        return {
+            'model': model,
+            'history': history,
+            'model_path': final_model_path,
+            'test_accuracy': test_acc,
+            'test_loss': test_loss
+        }
+
+    def train_all(self, runs):
+        """Train runs one after another, sharing features between them"""
+        return {run.name: self.train(run) for run in runs}
+
+DEEPSHIP_CLASSES = {
+    'Cargo': 1,      # Vessel
+    'Passenger': 1,  # Vessel
+    'Tanker': 1,     # Vessel
+    'Tug': 1         # Vessel
+}
+
+DOSITS_CLASSES = {
+    'marine_mammals': 2,  # Marine Animal
+    'fish': 2,            # Marine Animal
+    'natural_sounds': 3,  # Natural Sound
+    'anthropogenic': 4,   # Anthropogenic
+    'invertebrates': 2,   # Marine Animal
+    'background': 0       # Background
+}
+
+def deepship_run(data_path="data/datasets/deepship"):
+    return TrainingRun('deepship', FolderAdapter(data_path, DEEPSHIP_CLASSES), 'deep', num_classes=2,
+                       epochs=20, batch_size=32, patience=5,
+                       checkpoint_path='models/deepship_best_model.h5', model_prefix='deepship_model')
+
+def humpback_run(data_path="data/datasets/dosits"):
+    return TrainingRun('humpback', HumpbackAdapter(data_path), 'whale', num_classes=3,
+                       epochs=15, batch_size=16, patience=3,
+                       checkpoint_path='models/whale_model.h5', model_prefix='humpback_model')
+
+def complete_dosits_run(data_path="data/dosits_synthetic"):
+    return TrainingRun('complete_dosits', FolderAdapter(data_path, DOSITS_CLASSES), 'compact', num_classes=5,
+                       epochs=15, batch_size=32, patience=5,
+                       checkpoint_path='models/dosits_complete_model.h5', model_prefix='dosits_complete')
+
+def dosits_shards_run(data_path="data/dosits_synthetic"):
+    return TrainingRun('dosits_shards', ShardAdapter(data_path), 'compact', num_classes=5,
+                       epochs=15, batch_size=32, patience=5,
+                       checkpoint_path='models/dosits_complete_model.h5', model_prefix='dosits_complete')
+
+def synthetic_whales_run(whale_path="data/synthetic_whales", background_path="data/synthetic_background"):
+    adapter = HumpbackAdapter(whale_path, background_path=background_path, recursive=False)
+    return TrainingRun('synthetic_whales', adapter, 'compact', num_classes=3,
+                       epochs=20, batch_size=16, patience=5,
+                       checkpoint_path='models/whale_detector.h5', model_prefix='whale_detector')
+
+def keyword_run(data_path="data/datasets"):
+    return TrainingRun('keywords', KeywordAdapter(data_path), 'simple', num_classes=5,
+                       epochs=10, batch_size=16, patience=None, model_prefix='trained_model',
+                       test_size=0.15, val_size=0.15 / 0.85)
+
+PRESETS = {
+    'deepship': deepship_run,
+    'humpback': humpback_run,
+    'complete_dosits': complete_dosits_run,
+    'dosits_shards': dosits_shards_run,
+    'synthetic_whales': synthetic_whales_run,
+    'keywords': keyword_run
+}
+
+def add_engine_arguments(parser):
+    """--workers, --feature_store, the augmentation and the TrainingOptions flags, shared by every training script"""
+    TrainingOptions.add_arguments(parser)
+    parser.add_argument('--workers', type=int, help='Featurizer processes (default: one per CPU)')
+    parser.add_argument('--feature_store', default='data/feature_store', help='Feature cache directory')
+    add_augment_arguments(parser)
+
+def engine_from_args(args):
+    return TrainingEngine(FeatureStore(args.feature_store), workers=args.workers,
+                          options=TrainingOptions.from_args(args), augmenter=augmenter_from_args(args))
+
+def main():
+    parser = argparse.ArgumentParser(description='Train one or more models in one run over a shared feature cache')
+    parser.add_argument('datasets', nargs='+', choices=sorted(PRESETS), help='Preset runs to train, in order')
+    add_engine_arguments(parser)
+    args = parser.parse_args()
+
+    engine = engine_from_args(args)
+    results = engine.train_all([PRESETS[name]() for name in args.datasets])
+
+    print("\n=== SUMMARY ===")
+    for name, result in results.items():
+        if result is None:
+            print(f"  {name}: skipped")
+        else:
+            print(f"  {name}: test accuracy {result['test_accuracy']:.4f} -> {result['model_path']}")
+
+if __name__ == "__main__":
+    main()
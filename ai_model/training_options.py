@@ -0,0 +1,108 @@
+# ai_model/training_options.py
+import os
+import json
+import time
+import resource
+from datetime import datetime
+import tensorflow as tf
+
+PRECISIONS = ('float32', 'mixed_float16', 'mixed_bfloat16')
+DEFAULT_PERF_LOG = 'logs/training_perf.jsonl'
+
+def current_rss_mb():
+    """Resident set size of this process right now, falling back to the peak where /proc is missing"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class TrainingOptions:
+    """Precision policy, XLA and steps-per-execution settings shared by every training script"""
+
+    def __init__(self, precision='float32', jit_compile=False, steps_per_execution=1, perf_log=DEFAULT_PERF_LOG):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {', '.join(PRECISIONS)}")
+        self.precision = precision
+        self.jit_compile = jit_compile
+        self.steps_per_execution = steps_per_execution
+        self.perf_log = perf_log
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument('--precision', default='float32', choices=PRECISIONS,
+                            help='Keras dtype policy (mixed policies keep variables and the output layer in float32)')
+        parser.add_argument('--jit_compile', action='store_true', help='Compile train steps with XLA')
+        parser.add_argument('--steps_per_execution', type=int, default=1,
+                            help='Train steps run per tf.function call')
+        parser.add_argument('--perf_log', default=DEFAULT_PERF_LOG, help='JSONL file for per-epoch time and memory')
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.precision, args.jit_compile, args.steps_per_execution, args.perf_log)
+
+    def label(self):
+        """Short name of this configuration for logs, e.g. mixed_bfloat16+xla+spe8"""
+        parts = [self.precision]
+        if self.jit_compile:
+            parts.append('xla')
+        if self.steps_per_execution > 1:
+            parts.append(f'spe{self.steps_per_execution}')
+        return '+'.join(parts)
+
+    def apply_policy(self):
+        """Set the global dtype policy; must run before the model is built"""
+        tf.keras.mixed_precision.set_global_policy(self.precision)
+
+    def compile_kwargs(self):
+        return {'jit_compile': self.jit_compile, 'steps_per_execution': self.steps_per_execution}
+
+    def callbacks(self, run_name):
+        return [EpochStatsLogger(run_name, self.label(), self.perf_log)]
+
+class EpochStatsLogger(tf.keras.callbacks.Callback):
+    """Prints and appends one JSONL record per epoch with wall time and memory for the active configuration"""
+
+    def __init__(self, run_name, config_label, log_path=DEFAULT_PERF_LOG):
+        super().__init__()
+        self.run_name = run_name
+        self.config_label = config_label
+        self.log_path = log_path
+        self.epoch_seconds = []
+        self._epoch_start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._epoch_start
+        self.epoch_seconds.append(seconds)
+        logs = logs or {}
+        record = {
+            'run': self.run_name,
+            'config': self.config_label,
+            'epoch': epoch + 1,
+            'seconds': round(seconds, 3),
+            'rss_mb': round(current_rss_mb(), 1),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'loss': float(logs['loss']) if 'loss' in logs else None,
+            'val_loss': float(logs['val_loss']) if 'val_loss' in logs else None,
+            'timestamp': datetime.now().isoformat()
+        }
+        print(f"[{self.config_label}] epoch {record['epoch']}: {seconds:.1f}s, "
+              f"RSS {record['rss_mb']:.0f} MB (peak {record['peak_rss_mb']:.0f} MB)")
+
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def on_train_end(self, logs=None):
+        # The first epoch includes tracing/XLA compilation, so steady-state time excludes it
+        if len(self.epoch_seconds) > 1:
+            steady = sum(self.epoch_seconds[1:]) / (len(self.epoch_seconds) - 1)
+            print(f"[{self.config_label}] first epoch {self.epoch_seconds[0]:.1f}s, "
+                  f"steady-state {steady:.1f}s/epoch, peak RSS {peak_rss_mb():.0f} MB")
@@ -1,29 +1,55 @@
 ﻿import numpy as np
-import librosa
-import tensorflow as tf
-from tensorflow import keras
-import json
 import os
 from datetime import datetime
 import argparse
+import soundfile as sf
+
+from ai_model.audio_source import (
+    AudioSource, stream_pcm, describe_resampling, DEFAULT_RESAMPLE_ENGINE, RESAMPLE_ENGINES
+)
+from ai_model.manifest import Manifest
+from ai_model.mel_frontend import get_config_frontend
+from ai_model.backends import BACKENDS, DEFAULT_BACKEND, load_model
+from ai_model.postprocess import merge_segments
+from ai_model.annotation_journal import AnnotationJournal, journal_path_for, assemble
+from ai_model.detection_store import DetectionStore
 
 class UnderwaterSoundAnalyzer:
-    def __init__(self, model_path=None, confidence_threshold=0.7):
-        self.sample_rate = 22050
-        self.fft_size = 2048
-        self.hop_length = 512
-        self.n_mels = 128
-        self.segment_duration = 2.0
-        self.segment_samples = int(self.sample_rate * self.segment_duration)
+    def __init__(self, model_path=None, confidence_threshold=0.7, batched=False, batch_size=32,
+                 streaming=False, block_seconds=60.0, resample_engine=DEFAULT_RESAMPLE_ENGINE,
+                 report_resampling=False, backend=DEFAULT_BACKEND, hop_seconds=None, merge_events=False,
+                 merge_gap=0.0, nms_iou=0.5):
+        # Feature settings come from model/config.json, the same file the loaders use
+        self.frontend = get_config_frontend()
+        self.sample_rate = self.frontend.sample_rate
+        self.fft_size = self.frontend.n_fft
+        self.hop_length = self.frontend.hop_length
+        self.n_mels = self.frontend.n_mels
+        self.segment_duration = self.frontend.segment_duration
+        self.segment_samples = self.frontend.segment_samples
+        self.segment_frames = self.frontend.segment_frames  # 87 frames per 2 s segment
         self.confidence_threshold = confidence_threshold
+        self.batched = batched
+        self.batch_size = batch_size
+        self.streaming = streaming
+        self.block_seconds = block_seconds
+        self.resample_engine = resample_engine
+        self.report_resampling = report_resampling
+        self.hop_seconds = hop_seconds
+        self.merge_events = merge_events
+        self.merge_gap = merge_gap
+        self.nms_iou = nms_iou
         
         if model_path and os.path.exists(model_path):
-            self.model = tf.keras.models.load_model(model_path)
+            self.model = load_model(model_path, backend)
         else:
+            if backend != 'keras':
+                print(f"No model file for the {backend} backend, using an untrained Keras model")
             self.model = self.build_model()
     
     def build_model(self):
-        input_shape = (self.n_mels, 87, 1)  # Fixed shape for 2-second segments
+        from tensorflow import keras
+        input_shape = (self.n_mels, self.segment_frames, 1)  # 87 frames for 2-second segments
         model = keras.Sequential([
             keras.layers.Conv2D(16, (3, 3), activation='relu', input_shape=input_shape),
             keras.layers.MaxPooling2D((2, 2)),
@@ -37,31 +63,57 @@ class UnderwaterSoundAnalyzer:
         return model
     
     def preprocess_audio(self, audio_path):
-        try:
-            y, sr = librosa.load(audio_path, sr=self.sample_rate)
-            y = librosa.util.normalize(y)
-            return y, sr
-        except Exception as e:
-            print(f'Error loading audio: {e}')
+        # Accept an already-open AudioSource so callers can share one decode across stages
+        if isinstance(audio_path, AudioSource):
+            source = audio_path
+        else:
+            source = AudioSource(audio_path, self.sample_rate, resample_engine=self.resample_engine)
+        
+        y = source.load()
+        if y is None:
             return None, None
+        return y, source.sample_rate
     
     def extract_features(self, audio_segment):
-        mel_spec = librosa.feature.melspectrogram(
-            y=audio_segment, sr=self.sample_rate,
-            n_fft=self.fft_size, hop_length=self.hop_length, n_mels=self.n_mels
-        )
-        log_mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
+        log_mel_spec = self.frontend.log_mel(audio_segment)
         return log_mel_spec.reshape(log_mel_spec.shape[0], log_mel_spec.shape[1], 1)
     
+    def extract_features_batch(self, y):
+        """(N, n_mels, frames, 1) features of every zero-padded segment from one batched STFT and filterbank matmul
+        
+        Each segment is framed on its own, exactly as extract_features frames it. Windows cut from a
+        whole-file spectrogram would start on the nearest frame, up to half a hop from the segment, and
+        their edge frames and per-window maximum would see the neighbouring segments.
+        """
+        return self.frontend.segment_features(y)
+    
+    def _make_segment(self, start_idx, end_idx, sr, class_id, confidence):
+        start_time = start_idx / sr
+        end_time = end_idx / sr
+        # Keep sub-second precision when segments are merged into events later
+        digits = 3 if self.merge_events else None
+        return {
+            'start_time': round(start_time, digits),
+            'end_time': round(end_time, digits),
+            'duration': round(end_time - start_time, digits),
+            'category_id': int(class_id),
+            'score': float(confidence)
+        }
+    
     def detect_anomalies(self, audio_path):
         y, sr = self.preprocess_audio(audio_path)
         if y is None:
             return []
         
+        if self.hop_seconds is not None:
+            return self._detect_anomalies_overlapping(y)
+        if self.batched:
+            return self._detect_anomalies_batched(y, sr)
+        
         segments = []
         
         # Process audio in segments
-        for start_idx in range(0, len(y), self.segment_samples):
+        for segment_index, start_idx in enumerate(range(0, len(y), self.segment_samples)):
             end_idx = min(start_idx + self.segment_samples, len(y))
             segment = y[start_idx:end_idx]
             
@@ -71,105 +123,206 @@ class UnderwaterSoundAnalyzer:
             features = self.extract_features(segment)
             features = np.expand_dims(features, axis=0)
             
-            # Predict (using mock predictions for demo)
-            prediction = np.array([[0.1, 0.7, 0.1, 0.05, 0.05]])  # Mock: class 1 (vessel) with 70% confidence
-            class_id = np.argmax(prediction)
-            confidence = prediction[0][class_id]
-            
-            if confidence > self.confidence_threshold and class_id != 0:
-                start_time = start_idx / sr
-                end_time = end_idx / sr
-                
-                segments.append({
-                    'start_time': round(start_time),
-                    'end_time': round(end_time),
-                    'duration': round(end_time - start_time),
-                    'category_id': int(class_id),
-                    'score': float(confidence)
-                })
+            # Same model call and thresholding as the batched, streaming and hop paths
+            segments.extend(self._predict_segments(features, segment_index, len(y)))
         
         return segments
     
-    def generate_output_json(self, audio_files, output_path):
-        output_data = {
-            'info': {
-                'description': 'Grand Challenge UDA',
-                'version': '1.0',
-                'year': 2025,
-                'generated_on': datetime.now().isoformat()
-            },
-            'audios': [],
-            'categories': [
-                {'id': 1, 'name': 'vessel'},
-                {'id': 2, 'name': 'marine_animal'},
-                {'id': 3, 'name': 'natural_sound'},
-                {'id': 4, 'name': 'other_anthropogenic'}
-            ],
-            'annotations': []
+    def _detect_anomalies_batched(self, y, sr):
+        """Featurize the whole file at once and run a single model.predict over all segments"""
+        features = self.extract_features_batch(y)
+        if len(features) == 0:
+            return []
+        return self._predict_segments(features, 0, len(y))
+    
+    def _detect_anomalies_overlapping(self, y):
+        """Predict overlapping windows every hop_seconds, all sliced from one whole-file spectrogram"""
+        features = self.frontend.overlapping_windows(y, self.hop_seconds)
+        if len(features) == 0:
+            return []
+        step_samples = self.frontend.window_hop_frames(self.hop_seconds) * self.hop_length
+        return self._predict_segments(features, 0, len(y), step_samples)
+    
+    def _predict_segments(self, features, first_segment, n_samples, step_samples=None):
+        """Run the model on consecutive segment windows and keep confident non-background ones"""
+        predictions = self.model.predict(features, batch_size=self.batch_size, verbose=0)
+        class_ids = np.argmax(predictions, axis=1)
+        confidences = predictions[np.arange(len(predictions)), class_ids]
+        
+        segments = []
+        for i in np.flatnonzero((confidences > self.confidence_threshold) & (class_ids != 0)):
+            start_idx = (first_segment + i) * (step_samples or self.segment_samples)
+            end_idx = min(start_idx + self.segment_samples, n_samples)
+            segments.append(self._make_segment(start_idx, end_idx, self.sample_rate, class_ids[i], confidences[i]))
+        
+        return segments
+    
+    def stream_detections(self, audio_path):
+        """Yield detections block by block so peak memory depends on block_seconds, not file length
+        
+        Features match extract_features_batch: samples short of a whole segment are carried into the next block.
+        Peak normalization is skipped since the per-segment ref=np.max scaling makes features gain-invariant.
+        """
+        n_samples = 0
+        
+        def blocks():
+            nonlocal n_samples
+            for block in stream_pcm(audio_path, self.sample_rate, self.block_seconds, self.resample_engine):
+                n_samples += len(block)
+                yield block
+        
+        first_segment = 0
+        for features in self.frontend.stream_segment_features(blocks()):
+            for seg in self._predict_segments(features, first_segment, n_samples):
+                yield seg
+            first_segment += len(features)
+    
+    def generate_output_json(self, audio_files, output_path, store=None):
+        """Journal each file's annotations as it finishes (and store them), then assemble the compact output JSON"""
+        info = {
+            'description': 'Grand Challenge UDA',
+            'version': '1.0',
+            'year': 2025,
+            'generated_on': datetime.now().isoformat()
         }
+        categories = [
+            {'id': 1, 'name': 'vessel'},
+            {'id': 2, 'name': 'marine_animal'},
+            {'id': 3, 'name': 'natural_sound'},
+            {'id': 4, 'name': 'other_anthropogenic'}
+        ]
+        journal = AnnotationJournal(journal_path_for(output_path), info, categories, store)
+        
+        with journal:
+            self._journal_files(journal, audio_files)
         
+        return assemble(journal.path, output_path)
+    
+    def _journal_files(self, journal, audio_files):
         annotation_id = 1
         
         for audio_id, audio_path in enumerate(audio_files, 1):
-            y, sr = self.preprocess_audio(audio_path)
-            if y is None:
+            if self.streaming:
+                # Duration from the header; samples never sit in memory all at once
+                try:
+                    info = sf.info(audio_path)
+                    duration = info.frames / info.samplerate
+                    segments = list(self.stream_detections(audio_path))
+                except Exception as e:
+                    print(f'Error loading audio: {e}')
+                    continue
+                
+                audio = {
+                    'id': audio_id,
+                    'file_name': os.path.basename(audio_path),
+                    'file_path': audio_path,
+                    'duration': duration
+                }
+                annotations = self._annotations(audio_id, segments, annotation_id)
+                journal.write(audio, annotations)
+                annotation_id += len(annotations)
                 continue
+            
+            # Decode once; duration and detection share the buffer, freed when the block exits
+            with AudioSource(audio_path, self.sample_rate, resample_engine=self.resample_engine) as source:
+                if source.load() is None:
+                    continue
+                if self.report_resampling:
+                    print(describe_resampling(audio_path, source.resample_stats))
+                
+                duration = source.duration
+                file_name = os.path.basename(audio_path)
                 
-            duration = len(y) / sr
-            file_name = os.path.basename(audio_path)
+                audio = {
+                    'id': audio_id,
+                    'file_name': file_name,
+                    'file_path': audio_path,
+                    'duration': duration
+                }
+                
+                # Detect anomalies
+                segments = self.detect_anomalies(source)
             
-            output_data['audios'].append({
-                'id': audio_id,
-                'file_name': file_name,
-                'file_path': audio_path,
-                'duration': duration
+            annotations = self._annotations(audio_id, segments, annotation_id)
+            journal.write(audio, annotations)
+            annotation_id += len(annotations)
+    
+    def _annotations(self, audio_id, segments, annotation_id):
+        if self.merge_events:
+            segments = merge_segments(segments, self.merge_gap, self.nms_iou)
+        annotations = []
+        for seg in segments:
+            annotations.append({
+                'id': annotation_id,
+                'audio_id': audio_id,
+                'category_id': seg['category_id'],
+                'start_time': seg['start_time'],
+                'end_time': seg['end_time'],
+                'duration': seg['duration'],
+                'score': seg['score']
             })
-            
-            # Detect anomalies
-            segments = self.detect_anomalies(audio_path)
-            
-            for seg in segments:
-                output_data['annotations'].append({
-                    'id': annotation_id,
-                    'audio_id': audio_id,
-                    'category_id': seg['category_id'],
-                    'start_time': seg['start_time'],
-                    'end_time': seg['end_time'],
-                    'duration': seg['duration'],
-                    'score': seg['score']
-                })
-                annotation_id += 1
-        
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w') as f:
-            json.dump(output_data, f, indent=2)
-        
-        return output_data
+            annotation_id += 1
+        return annotations
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Underwater Sound Detection')
     parser.add_argument('--input_dir', type=str, required=True, help='Input directory with audio files')
     parser.add_argument('--output_file', type=str, default='results.json', help='Output JSON file')
     parser.add_argument('--model_path', type=str, help='Path to model')
+    parser.add_argument('--manifest', type=str, help='Corpus manifest (default: <input_dir>/manifest.json if present)')
     parser.add_argument('--confidence', type=float, default=0.7, help='Confidence threshold')
+    parser.add_argument('--batched', action='store_true', help='Featurize each file once and predict all segments in one call')
+    parser.add_argument('--batch_size', type=int, default=32, help='Batch size for batched prediction')
+    parser.add_argument('--streaming', action='store_true', help='Read and featurize files block by block (bounded memory)')
+    parser.add_argument('--resample_engine', default=DEFAULT_RESAMPLE_ENGINE, choices=sorted(RESAMPLE_ENGINES),
+                        help='Resampler for files not already at 22050 Hz')
+    parser.add_argument('--report_resampling', action='store_true', help='Print resampling speed per file')
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, choices=BACKENDS,
+                        help='Inference backend (tflite expects a .tflite exported next to the model)')
+    parser.add_argument('--hop_seconds', '--hop-seconds', type=float,
+                        help='Overlapping windows every HOP seconds, sliced from one spectrogram per file')
+    parser.add_argument('--merge_events', action='store_true',
+                        help='Merge adjacent same-class segments into events and apply temporal NMS across classes')
+    parser.add_argument('--merge_gap', type=float, default=0.0, help='Largest gap in seconds bridged when merging')
+    parser.add_argument('--nms_iou', type=float, default=0.5, help='IoU above which overlapping events are suppressed')
+    parser.add_argument('--block_seconds', type=float, default=60.0, help='Audio read per block in streaming mode')
+    parser.add_argument('--detection_db', type=str, help='Also write detections to this SQLite detection store')
     
     args = parser.parse_args()
+    if args.streaming and args.hop_seconds is not None:
+        parser.error('--hop_seconds is not supported together with --streaming')
     
     analyzer = UnderwaterSoundAnalyzer(
         model_path=args.model_path,
-        confidence_threshold=args.confidence
+        confidence_threshold=args.confidence,
+        batched=args.batched,
+        batch_size=args.batch_size,
+        streaming=args.streaming,
+        block_seconds=args.block_seconds,
+        resample_engine=args.resample_engine,
+        report_resampling=args.report_resampling,
+        backend=args.backend,
+        hop_seconds=args.hop_seconds,
+        merge_events=args.merge_events,
+        merge_gap=args.merge_gap,
+        nms_iou=args.nms_iou
     )
     
-    audio_files = []
-    for file in os.listdir(args.input_dir):
-        if file.lower().endswith('.wav'):
-            audio_files.append(os.path.join(args.input_dir, file))
+    # Header-only listing; empty or unreadable files are dropped before any decoding
+    manifest = Manifest.for_directory(args.input_dir, manifest_path=args.manifest, recursive=False)
+    audio_files = manifest.paths()
+    for entry in manifest.unreadable():
+        print(f'Skipping {entry["path"]}: {entry["error"] or "no audio frames"}')
     
     if not audio_files:
         print('No WAV files found!')
         exit(1)
     
     print(f'Processing {len(audio_files)} audio files...')
-    results = analyzer.generate_output_json(audio_files, args.output_file)
+    store = DetectionStore(args.detection_db) if args.detection_db else None
+    results = analyzer.generate_output_json(audio_files, args.output_file, store)
+    if store is not None:
+        store.close()
+        print(f'Detections stored in {args.detection_db}')
     print(f'Detection complete! Results saved to {args.output_file}')
-    print(f'Found {len(results["annotations"])} anomalies')
+    print(f'Found {results["annotations"]} anomalies')
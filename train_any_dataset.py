@@ -1,75 +1,23 @@
 # train_any_dataset.py
 import os
-import numpy as np
-import tensorflow as tf
-from datetime import datetime
-import librosa
-from sklearn.model_selection import train_test_split
+import argparse
+import shutil
 
-print("=== UNIVERSAL DATASET TRAINER ===")
+from ai_model.manifest import Manifest
+from ai_model.training_engine import add_engine_arguments, engine_from_args, keyword_run
 
 def find_any_wav_files(dataset_path):
-    """Find all WAV files in any dataset structure"""
-    wav_files = []
-    for root, dirs, files in os.walk(dataset_path):
-        for file in files:
-            if file.endswith('.wav'):
-                wav_files.append(os.path.join(root, file))
-    return wav_files
-
-def extract_features_from_file(file_path, target_shape=(128, 44, 1)):
-    """Extract features from a single WAV file"""
-    try:
-        y, sr = librosa.load(file_path, sr=22050)
-        y = librosa.util.normalize(y)
-        
-        # Create mel-spectrogram
-        mel_spec = librosa.feature.melspectrogram(
-            y=y, sr=sr, n_mels=target_shape[0], 
-            n_fft=2048, hop_length=512
-        )
-        log_mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
-        
-        # Reshape to target shape
-        log_mel_spec = log_mel_spec.reshape(target_shape[0], -1, 1)
-        if log_mel_spec.shape[1] > target_shape[1]:
-            log_mel_spec = log_mel_spec[:, :target_shape[1], :]
-        elif log_mel_spec.shape[1] < target_shape[1]:
-            log_mel_spec = np.pad(
-                log_mel_spec, 
-                ((0, 0), (0, target_shape[1] - log_mel_spec.shape[1]), (0, 0)), 
-                'constant'
-            )
-        
-        return log_mel_spec
-        
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}")
-        return None
-
-def create_simple_model(input_shape=(128, 44, 1), num_classes=5):
-    """Create a simple guaranteed-working model"""
-    model = tf.keras.Sequential([
-        tf.keras.layers.Conv2D(16, (3, 3), activation='relu', input_shape=input_shape),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Conv2D(32, (3, 3), activation='relu'),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Flatten(),
-        tf.keras.layers.Dense(64, activation='relu'),
-        tf.keras.layers.Dropout(0.5),
-        tf.keras.layers.Dense(num_classes, activation='softmax')
-    ])
-    
-    model.compile(
-        optimizer='adam',
-        loss='sparse_categorical_crossentropy',
-        metrics=['accuracy']
-    )
-    
-    return model
+    """Find all readable WAV files in any dataset structure (uses <dataset>/manifest.json when present)"""
+    return Manifest.for_directory(dataset_path).paths()
 
 def main():
     """Main training function - works with ANY dataset"""
+    print("=== UNIVERSAL DATASET TRAINER ===")
+    
+    parser = argparse.ArgumentParser(description='Train on the first dataset found, labelled by path keywords')
+    add_engine_arguments(parser)
+    args = parser.parse_args()
+    
     # Try different dataset paths
     dataset_paths = [
         "data/datasets/deepship",
@@ -95,72 +43,14 @@ def main():
             print(f"  - {path}")
         return
     
-    # Load dataset
-    print("Loading and processing audio files...")
-    wav_files = find_any_wav_files(dataset_path)
-    
-    features = []
-    labels = []  # We'll use dummy labels since we don't have real annotations
-    
-    for i, file_path in enumerate(wav_files):
-        features_array = extract_features_from_file(file_path)
-        if features_array is not None:
-            features.append(features_array)
-            # Use dummy labels (all same class for now)
-            labels.append(1)  # Default to "vessel" class
-            
-        if (i + 1) % 10 == 0:
-            print(f"Processed {i + 1}/{len(wav_files)} files...")
-    
-    if not features:
-        print("❌ No features could be extracted from the files!")
+    result = engine_from_args(args).train(keyword_run(dataset_path))
+    if result is None:
         return
     
-    X = np.array(features)
-    y = np.array(labels)
-    
-    print(f"✅ Successfully loaded {X.shape[0]} samples")
-    
-    # Split dataset
-    X_train, X_temp, y_train, y_temp = train_test_split(
-        X, y, test_size=0.3, random_state=42
-    )
-    X_val, X_test, y_val, y_test = train_test_split(
-        X_temp, y_temp, test_size=0.5, random_state=42
-    )
-    
-    print(f"Train: {X_train.shape[0]} samples")
-    print(f"Validation: {X_val.shape[0]} samples")
-    print(f"Test: {X_test.shape[0]} samples")
-    
-    # Create and train model
-    model = create_simple_model()
-    
-    print("Training model (10 epochs)...")
-    history = model.fit(
-        X_train, y_train,
-        epochs=10,
-        batch_size=16,  # Smaller batch size for stability
-        validation_data=(X_val, y_val),
-        verbose=1
-    )
-    
-    # Evaluate
-    test_loss, test_acc = model.evaluate(X_test, y_test, verbose=0)
-    print(f"\n📊 Test accuracy: {test_acc:.4f}")
-    
-    # Save model
-    os.makedirs('models', exist_ok=True)
-    model_path = f"models/trained_model_{datetime.now().strftime('%Y%m%d_%H%M%S')}.h5"
     best_model_path = "models/best_model.h5"
-    
-    model.save(model_path)
-    model.save(best_model_path)
-    
-    print(f"\n✅ Training completed successfully!")
-    print(f"📍 Model saved to: {model_path}")
+    shutil.copyfile(result['model_path'], best_model_path)
     print(f"📍 Best model saved to: {best_model_path}")
-    print(f"📊 Final accuracy: {test_acc:.4f}")
+    print(f"📊 Final accuracy: {result['test_accuracy']:.4f}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,9 +1,13 @@
 # train_fixed.py
 import os
+import argparse
 import numpy as np
-import tensorflow as tf
 from datetime import datetime
-import librosa
+
+from ai_model.synthetic import CORPORA, generate_corpus
+from ai_model.synthetic_stream import SyntheticStream, StreamMonitor
+from ai_model.training_engine import build_classifier
+from ai_model.augment import add_augment_arguments, augmenter_from_args
 
 print("=== UNDERWATER SOUND MODEL TRAINING ===")
 
@@ -17,57 +21,43 @@ def create_synthetic_dataset():
     
     sample_rate = 22050
     segment_duration = 2.0
-    segment_samples = int(sample_rate * segment_duration)
     n_mels = 128
-    n_fft = 2048
     hop_length = 512
     
     # Calculate feature shape
     n_frames = int(segment_duration * sample_rate / hop_length) + 1
     input_shape = (n_mels, n_frames, 1)
     
-    # Create synthetic data for 4 classes + background
-    X_train, y_train = [], []
-    
-    for class_id in range(5):  # 0-4 (0=background, 1-4=actual classes)
-        num_samples = 100 if class_id == 0 else 200  # More samples for actual classes
-        
-        for i in range(num_samples):
-            # Create synthetic audio segment
-            if class_id == 0:  # Background noise
-                audio = 0.1 * np.random.normal(0, 1, segment_samples)
-            elif class_id == 1:  # Vessel (low frequency)
-                t = np.linspace(0, segment_duration, segment_samples)
-                audio = 0.7 * np.sin(2 * np.pi * 100 * t) + 0.3 * np.sin(2 * np.pi * 200 * t)
-                audio += 0.1 * np.random.normal(0, 1, segment_samples)
-            elif class_id == 2:  # Marine animal (high frequency)
-                t = np.linspace(0, segment_duration, segment_samples)
-                audio = 0.6 * np.sin(2 * np.pi * 8000 * t) + 0.2 * np.sin(2 * np.pi * 12000 * t)
-                audio += 0.1 * np.random.normal(0, 1, segment_samples)
-            elif class_id == 3:  # Natural sound (very low frequency)
-                t = np.linspace(0, segment_duration, segment_samples)
-                audio = 0.5 * np.sin(2 * np.pi * 0.5 * t) + 0.3 * np.sin(2 * np.pi * 2 * t)
-                audio += 0.1 * np.random.normal(0, 1, segment_samples)
-            else:  # Other anthropogenic (medium frequency)
-                t = np.linspace(0, segment_duration, segment_samples)
-                audio = 0.8 * np.sin(2 * np.pi * 300 * t) + 0.4 * np.sin(2 * np.pi * 600 * t)
-                audio += 0.1 * np.random.normal(0, 1, segment_samples)
-            
-            # Normalize
-            audio = audio / np.max(np.abs(audio))
-            
-            # Create mel-spectrogram
-            mel_spec = librosa.feature.melspectrogram(
-                y=audio, sr=sample_rate, n_fft=n_fft,
-                hop_length=hop_length, n_mels=n_mels
-            )
-            log_mel_spec = librosa.power_to_db(mel_spec, ref=np.max)
-            log_mel_spec = log_mel_spec.reshape(n_mels, n_frames, 1)
-            
-            X_train.append(log_mel_spec)
-            y_train.append(class_id)
-    
-    return np.array(X_train), np.array(y_train), input_shape
+    # 4 classes + background (100 background, 200 of each class), synthesized in batches
+    X_train, y_train = generate_corpus(CORPORA['classes'], output='memory', n_frames=n_frames, sample_rate=sample_rate)
+    
+    return X_train, y_train, input_shape
+
+def create_and_train_streaming_model(steps_per_epoch=22, validation_steps=5, reseed=True, parallel_calls=None,
+                                     augmenter=None):
+    """Create and train the model on clips generated on the fly, fresh ones every epoch"""
+    print("Creating and training model on the synthetic stream...")
+    
+    # Same 2 s clips and class mix as create_synthetic_dataset, but nothing is held in memory
+    n_frames = int(2.0 * 22050 / 512) + 1
+    stream = SyntheticStream(CORPORA['classes'], n_frames=n_frames, batch_size=32, num_parallel_calls=parallel_calls,
+                             augmenter=augmenter)
+    
+    # Create model (same architecture as the DeepShip run of the training engine)
+    model = build_classifier('deep', stream.num_classes, stream.input_shape)
+    
+    # Train model
+    print("Training model...")
+    history = model.fit(
+        stream.dataset(steps_per_epoch, reseed=reseed),
+        epochs=15,
+        steps_per_epoch=steps_per_epoch,
+        validation_data=stream.validation_dataset(validation_steps),
+        verbose=1,
+        callbacks=[StreamMonitor(stream, steps_per_epoch)]
+    )
+    
+    return model, history
 
 def create_and_train_model():
     """Create and train the model"""
@@ -87,37 +77,8 @@ def create_and_train_model():
         X_train, y_train, test_size=0.2, random_state=42, stratify=y_train
     )
     
-    # Create model
-    model = tf.keras.Sequential([
-        tf.keras.layers.Conv2D(32, (3, 3), activation='relu', input_shape=input_shape),
-        tf.keras.layers.BatchNormalization(),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Dropout(0.3),
-        
-        tf.keras.layers.Conv2D(64, (3, 3), activation='relu'),
-        tf.keras.layers.BatchNormalization(),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Dropout(0.3),
-        
-        tf.keras.layers.Conv2D(128, (3, 3), activation='relu'),
-        tf.keras.layers.BatchNormalization(),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Dropout(0.3),
-        
-        tf.keras.layers.GlobalAveragePooling2D(),
-        tf.keras.layers.Dense(256, activation='relu'),
-        tf.keras.layers.BatchNormalization(),
-        tf.keras.layers.Dropout(0.5),
-        tf.keras.layers.Dense(128, activation='relu'),
-        tf.keras.layers.Dropout(0.5),
-        tf.keras.layers.Dense(num_classes, activation='softmax')
-    ])
-    
-    model.compile(
-        optimizer='adam',
-        loss='sparse_categorical_crossentropy',
-        metrics=['accuracy', 'precision', 'recall']
-    )
+    # Create model (same architecture as the DeepShip run of the training engine)
+    model = build_classifier('deep', num_classes, input_shape)
     
     # Train model
     print("Training model...")
@@ -133,8 +94,23 @@ def create_and_train_model():
 
 def main():
     """Main training function"""
+    parser = argparse.ArgumentParser(description='Train the underwater sound model on synthetic data')
+    parser.add_argument('--precomputed', action='store_true',
+                        help='Precompute 900 spectrograms in memory instead of streaming fresh clips')
+    parser.add_argument('--steps_per_epoch', type=int, default=22, help='Streamed batches per epoch')
+    parser.add_argument('--no_reseed', action='store_true', help='Replay the same streamed clips every epoch')
+    parser.add_argument('--parallel_calls', type=int, help='Generator map calls (default: one per CPU)')
+    add_augment_arguments(parser)
+    args = parser.parse_args()
+    
     # Train model
-    model, history = create_and_train_model()
+    if args.precomputed:
+        model, history = create_and_train_model()
+    else:
+        model, history = create_and_train_streaming_model(
+            args.steps_per_epoch, reseed=not args.no_reseed, parallel_calls=args.parallel_calls,
+            augmenter=augmenter_from_args(args)
+        )
     
     # Save model
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
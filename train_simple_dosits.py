@@ -1,33 +1,15 @@
 # train_simple_dosits.py
 import os
 import numpy as np
-import tensorflow as tf
 from datetime import datetime
 
+from ai_model.training_engine import build_classifier
+
 print("=== SIMPLE DOSITS MODEL TRAINING ===")
 
 def create_simple_dosits_model():
     """Create a simple model that will definitely work"""
-    input_shape = (128, 44, 1)
-    
-    model = tf.keras.Sequential([
-        tf.keras.layers.Conv2D(16, (3, 3), activation='relu', input_shape=input_shape),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Conv2D(32, (3, 3), activation='relu'),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Flatten(),
-        tf.keras.layers.Dense(64, activation='relu'),
-        tf.keras.layers.Dropout(0.5),
-        tf.keras.layers.Dense(5, activation='softmax')  # 5 classes
-    ])
-    
-    model.compile(
-        optimizer='adam',
-        loss='sparse_categorical_crossentropy',
-        metrics=['accuracy']
-    )
-    
-    return model
+    return build_classifier('simple', 5)  # 5 classes
 
 def main():
     """Simple training that will definitely work"""
@@ -1,9 +1,10 @@
 # train_simple_working.py
 import os
 import numpy as np
-import tensorflow as tf
 from datetime import datetime
 
+from ai_model.training_engine import build_classifier
+
 print("=== SIMPLE WORKING MODEL TRAINING ===")
 
 # Create directories
@@ -17,26 +18,8 @@ def create_simple_model():
     input_shape = (128, 44, 1)  # Fixed compatible shape
     num_classes = 5
     
-    # Very simple model architecture
-    model = tf.keras.Sequential([
-        tf.keras.layers.Conv2D(16, (3, 3), activation='relu', input_shape=input_shape),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Conv2D(32, (3, 3), activation='relu'),
-        tf.keras.layers.MaxPooling2D((2, 2)),
-        tf.keras.layers.Flatten(),
-        tf.keras.layers.Dense(64, activation='relu'),
-        tf.keras.layers.Dropout(0.5),
-        tf.keras.layers.Dense(num_classes, activation='softmax')
-    ])
-    
-    # Simple compile without problematic metrics
-    model.compile(
-        optimizer='adam',
-        loss='sparse_categorical_crossentropy',
-        metrics=['accuracy']  # Only accuracy to avoid shape issues
-    )
-    
-    return model, input_shape
+    # Very simple model architecture, compiled with accuracy only
+    return build_classifier('simple', num_classes, input_shape), input_shape
 
 def create_simple_data(input_shape):
     """Create simple synthetic data"""